@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Synthetic data for the benchmarks.
+"""
+
+EXTRA_COMPONENTS = ' '.join(f'extra{number}' for number in range(40))
+
+LINES = {
+    'small': 'deb http://example.com/ubuntu focal main',
+    'typical': (
+        'deb [arch=amd64] http://apt.pop-os.org/proprietary focal main'
+    ),
+    'huge': (
+        'deb [arch=amd64,i386,arm64 lang=en,de target=Contents-deb pdiffs=no '
+        'by-hash=yes] http://mirror.example.com/ubuntu/ports focal-security '
+        f'main restricted universe multiverse {EXTRA_COMPONENTS}'
+    ),
+}
+
+def make_line(number, corpus='typical', disabled=False, source_code=False):
+    """ Make a unique deb line based on one of the corpus lines.
+
+    Arguments:
+        number (int): A number to make the URI unique.
+        corpus (str): The name of the line in LINES to base the line on.
+        disabled (bool): Whether to comment the line out.
+        source_code (bool): Whether to make a deb-src line.
+
+    Returns:
+        str: The deb line.
+    """
+    line = LINES[corpus].replace('.com/', f'.com/repo{number}/', 1)
+    if source_code:
+        line = line.replace('deb ', 'deb-src ', 1)
+    if disabled:
+        line = f'# {line}'
+    return line
+
+def make_stanza(number, corpus='typical', disabled=False, name=None):
+    """ Make a unique DEB822 stanza based on one of the corpus lines.
+
+    Arguments:
+        number (int): A number to make the URI unique.
+        corpus (str): The name of the line in LINES to base the stanza on.
+        disabled (bool): Whether to disable the source.
+        name (str): The name of the source. Default is based on number.
+
+    Returns:
+        str: The stanza, ending with a newline.
+    """
+    # Imported here so the corpus can be built without loading the library.
+    # pylint: disable=import-outside-toplevel
+    from repolib.deb import DebLine
+    stanza = DebLine(make_line(number, corpus))
+    stanza.name = name or f'Repository {number}'
+    stanza.enabled = not disabled
+    return stanza.dump()
+
+# A PPA archive as returned by the Launchpad API, which PPALine keeps as
+# ppa_info.
+PPA_INFO = '''{
+    "self_link": "https://api.launchpad.net/devel/~system76/+archive/ubuntu/pop",
+    "web_link": "https://launchpad.net/~system76/+archive/ubuntu/pop",
+    "resource_type_link": "https://api.launchpad.net/devel/#archive",
+    "owner_link": "https://api.launchpad.net/devel/~system76",
+    "name": "pop",
+    "displayname": "Pop!_OS PPA",
+    "reference": "~system76/ubuntu/pop",
+    "distribution_link": "https://api.launchpad.net/devel/ubuntu",
+    "private": false,
+    "suppress_subscription_notifications": false,
+    "dependencies_collection_link": "https://api.launchpad.net/devel/~system76/+archive/ubuntu/pop/dependencies",
+    "description": "This PPA contains the packages and updates for Pop!_OS, System76's operating system built on Ubuntu. It also contains drivers and firmware for System76 hardware.",
+    "signing_key_fingerprint": "E6AC4C23E3B6BD8CA3C79E4F204DD8AEC33A7AFF",
+    "require_virtualized": true,
+    "build_debug_symbols": false,
+    "publish_debug_symbols": false,
+    "permit_obsolete_series_uploads": false,
+    "authorized_size": 8192,
+    "status": "Active",
+    "external_dependencies": null,
+    "processors_collection_link": "https://api.launchpad.net/devel/~system76/+archive/ubuntu/pop/processors",
+    "enabled_restricted_processors_collection_link": "https://api.launchpad.net/devel/~system76/+archive/ubuntu/pop/enabled_restricted_processors",
+    "http_etag": "\\"a5e6c1f0b7d2c9e8f3a4b6d1c0e9f8a7b6c5d4e3-9f8e7d6c5b4a3928170f6e5d4c3b2a1908f7e6d5\\""
+}'''
@@ -0,0 +1,226 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Memory footprint of each kind of source object.
+
+Creates many instances of each source class and reports the memory each one
+holds on to, measured with tracemalloc, as JSON. Run it from the top of the
+source tree::
+
+    python3 -m benchmarks.memory --output memory.json
+
+The budgets in BUDGETS are checked by memory_test.py as part of the test
+suite.
+"""
+
+import argparse
+import gc
+import json
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from repolib import util
+from repolib.deb import DebLine
+from repolib.legacy_deb import LegacyDebSource
+from repolib.ppa import PPALine
+from repolib.source import Source
+from repolib.system import SystemSource
+
+from . import corpus
+
+COUNTS = [1, 1000, 100000]
+
+# The maximum bytes held by each object.
+BUDGETS = {
+    'Source': 3500,
+    'DebLine': 3500,
+    'PPALine': 7500,
+    'SystemSource': 3500,
+    'LegacyDebSource': 6500,
+}
+
+SYSTEM_SOURCE = (
+    'X-Repolib-Name: Pop_OS System Sources\n'
+    'Enabled: yes\n'
+    'Types: deb deb-src\n'
+    'URIs: http://apt.pop-os.org/ubuntu\n'
+    'Suites: focal focal-security focal-updates focal-backports\n'
+    'Components: main restricted universe multiverse\n'
+)
+
+# pylint: disable=missing-function-docstring
+# Each of these makes the number-th instance of an object to measure.
+
+def make_source(number):
+    source = Source()
+    source.load_from_dict(DebLine(corpus.make_line(number)).make_dict())
+    return source
+
+def make_debline(number):
+    return DebLine(corpus.make_line(number))
+
+def make_ppaline(number):
+    ppa = PPALine(f'ppa:owner{number}/ppa', fetch_data=False)
+    ppa.ppa_info = json.loads(corpus.PPA_INFO)
+    return ppa
+
+def make_system_source(number):
+    # pylint: disable=unused-argument
+    return SystemSource()
+
+def make_legacy_source(number):
+    legacy = LegacyDebSource()
+    legacy.sources.append(make_debline(number))
+    legacy.sources.append(legacy.sources[0].copy())
+    legacy.make_names()
+    return legacy
+
+FACTORIES = {
+    'Source': make_source,
+    'DebLine': make_debline,
+    'PPALine': make_ppaline,
+    'SystemSource': make_system_source,
+    'LegacyDebSource': make_legacy_source,
+}
+
+# pylint: enable=missing-function-docstring
+
+def bytes_per_object(factory, count):
+    """ Measure the memory held by each object made by factory.
+
+    Arguments:
+        factory (callable): Makes the number-th object when called with it.
+        count (int): The number of objects to make.
+
+    Returns:
+        float: The average bytes held by each object.
+    """
+    # Make one first, so that memory used once (e.g. caches and compiled
+    # regular expressions) isn't counted.
+    factory(count)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory(number) for number in range(count)]
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before - sys.getsizeof(objects)) / count
+
+def write_system_source(sources_dir):
+    """ Write the system source for SystemSource to load.
+
+    Arguments:
+        sources_dir (pathlib.Path): The sources dir to write it to.
+    """
+    with open(sources_dir / 'system.sources', mode='w') as system_file:
+        system_file.write(SYSTEM_SOURCE)
+
+def run(names=None, counts=None):
+    """ Measure the memory held by each kind of source object.
+
+    Arguments:
+        names ([str]): The classes to measure. Default is all of them.
+        counts ([int]): The numbers of instances to measure with.
+
+    Returns:
+        dict: The results, and a list of the budgets which were exceeded.
+    """
+    root = Path(tempfile.mkdtemp(prefix='repolib-memory-'))
+    sources_dir = util.SOURCES_DIR
+    util.SOURCES_DIR = str(root)
+    try:
+        write_system_source(root)
+        results = []
+        exceeded = []
+        for name in names or FACTORIES:
+            for count in counts or COUNTS:
+                size = bytes_per_object(FACTORIES[name], count)
+                results.append({
+                    'class': name,
+                    'instances': count,
+                    'bytes_per_object': round(size, 1),
+                })
+                if size > BUDGETS[name]:
+                    exceeded.append(
+                        f'{name} uses {size:.0f} bytes with {count} instances '
+                        f'(budget {BUDGETS[name]})'
+                    )
+    finally:
+        util.SOURCES_DIR = sources_dir
+        shutil.rmtree(root)
+    return {'results': results, 'exceeded': exceeded}
+
+def main(argv=None):
+    """ Run the benchmark from the command line. """
+    parser = argparse.ArgumentParser(
+        prog='python3 -m benchmarks.memory',
+        description='Measure the memory held by each source object.'
+    )
+    parser.add_argument(
+        '-c',
+        '--class',
+        dest='names',
+        action='append',
+        choices=list(FACTORIES),
+        help='Measure only this class. May be given more than once.'
+    )
+    parser.add_argument(
+        '-n',
+        '--count',
+        action='append',
+        type=int,
+        help='Measure with this many instances. May be given more than once.'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='Write the results to this file instead of stdout.'
+    )
+    args = parser.parse_args(argv)
+
+    report = run(args.names, args.count)
+    if args.output:
+        with open(args.output, mode='w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    for failure in report['exceeded']:
+        print(f'Budget exceeded: {failure}', file=sys.stderr)
+    if report['exceeded']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
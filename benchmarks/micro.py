@@ -0,0 +1,229 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Microbenchmarks for parsing and serializing sources.
+
+Each benchmark is run against each line in the synthetic corpus, and reports
+the operations per second along with the memory allocated by each operation,
+as JSON. Run it from the top of the source tree::
+
+    python3 -m benchmarks.micro --output micro.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+
+from repolib import VERSION
+from repolib.deb import DebLine
+from repolib.legacy_deb import LegacyDebSource
+
+from . import corpus
+
+# pylint: disable=missing-function-docstring
+# Each of these sets up a source and returns the operation to benchmark.
+
+def bench_parse(line):
+    return lambda: DebLine(line)
+
+def bench_dump(line):
+    source = DebLine(line)
+    return source.dump
+
+def bench_make_debline(line):
+    source = DebLine(line)
+    return source.make_debline
+
+def bench_make_deblines(line):
+    legacy = LegacyDebSource()
+    legacy.sources.append(DebLine(line))
+    legacy.sources.append(legacy.sources[0].copy())
+    return legacy.make_deblines
+
+def bench_make_name(line):
+    source = DebLine(line)
+    return source.make_name
+
+def bench_copy(line):
+    source = DebLine(line)
+    return source.copy
+
+def bench_properties(line):
+    source = DebLine(line)
+    return lambda: (
+        source.name,
+        source.enabled,
+        source.types,
+        source.uris,
+        source.suites,
+        source.components,
+        source.options,
+    )
+
+BENCHMARKS = {
+    'DebLine.parse': bench_parse,
+    'Source.dump': bench_dump,
+    'Source.make_debline': bench_make_debline,
+    'LegacyDebSource.make_deblines': bench_make_deblines,
+    'Source.make_name': bench_make_name,
+    'Source.copy': bench_copy,
+    'Source.properties': bench_properties,
+}
+
+# pylint: enable=missing-function-docstring
+
+def time_ops(func, min_time=0.2, repeat=3):
+    """ Find how many times per second func can be called.
+
+    Arguments:
+        func (callable): The operation to time.
+        min_time (float): The minimum time for each timing run, in seconds.
+        repeat (int): The number of timing runs. The fastest is used.
+
+    Returns:
+        float: The operations per second.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = min([elapsed] + timer.repeat(repeat - 1, number))
+    return number / best
+
+def measure_allocations(func, number=100):
+    """ Measure the memory allocated by calling func.
+
+    The results of each call are kept alive until the end, so the retained
+    figures show what each result holds on to.
+
+    Arguments:
+        func (callable): The operation to measure.
+        number (int): The number of times to call func.
+
+    Returns:
+        dict: The 'blocks_per_op' and 'bytes_per_op' retained, and the
+        'peak_bytes_per_op' allocated at the highest point.
+    """
+    results = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(number):
+            results.append(func())
+        peak = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    return {
+        'blocks_per_op': sum(stat.count_diff for stat in stats) / number,
+        'bytes_per_op': sum(stat.size_diff for stat in stats) / number,
+        'peak_bytes_per_op': (peak - baseline) / number,
+    }
+
+def run(names=None, corpora=None, min_time=0.2):
+    """ Run the benchmarks.
+
+    Arguments:
+        names ([str]): The benchmarks to run. Default is all of them.
+        corpora ([str]): The corpus lines to run them on. Default is all of
+            them.
+        min_time (float): The minimum time for each timing run, in seconds.
+
+    Returns:
+        dict: The results, with details about the environment.
+    """
+    results = []
+    for name in names or BENCHMARKS:
+        for corpus_name in corpora or corpus.LINES:
+            func = BENCHMARKS[name](corpus.LINES[corpus_name])
+            result = {
+                'benchmark': name,
+                'corpus': corpus_name,
+                'ops_per_sec': round(time_ops(func, min_time=min_time), 1),
+            }
+            result.update(measure_allocations(func))
+            results.append(result)
+
+    return {
+        'repolib': VERSION,
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+def main(argv=None):
+    """ Run the benchmarks from the command line. """
+    parser = argparse.ArgumentParser(
+        prog='python3 -m benchmarks.micro',
+        description='Time parsing and serializing sources.'
+    )
+    parser.add_argument(
+        '-b',
+        '--benchmark',
+        action='append',
+        choices=list(BENCHMARKS),
+        help='Run only this benchmark. May be given more than once.'
+    )
+    parser.add_argument(
+        '-c',
+        '--corpus',
+        action='append',
+        choices=list(corpus.LINES),
+        help='Run only on this corpus line. May be given more than once.'
+    )
+    parser.add_argument(
+        '--min-time',
+        type=float,
+        default=0.2,
+        help='The minimum time for each timing run, in seconds.'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='Write the results to this file instead of stdout.'
+    )
+    args = parser.parse_args(argv)
+
+    report = run(args.benchmark, args.corpus, min_time=args.min_time)
+    if args.output:
+        with open(args.output, mode='w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Benchmark for matching URIs against prefix rewrite rules.
+
+Synthetic sets of rules (hosts with a few path levels, like proxy and
+mirror rules) and source URIs are generated, and rewriting every URI is
+timed with the URITrie, and with checking each rule against each URI in
+turn, for comparison. The results are reported as JSON. Run it from the top
+of the source tree::
+
+    python3 -m benchmarks.rewrite --output rewrite.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from repolib import VERSION, util
+from repolib.uritrie import URITrie
+
+RULE_COUNTS = [10, 100, 1000]
+URI_COUNTS = [1000, 10000]
+
+def make_rules(count, seed=0):
+    """ Generate prefix rules.
+
+    Arguments:
+        count (int): The number of rules.
+        seed (int): The seed for the random choices.
+
+    Returns:
+        dict: The replacement for each prefix.
+    """
+    rng = random.Random(seed)
+    rules = {}
+    while len(rules) < count:
+        host = f'http://mirror{rng.randrange(count)}.example.com'
+        path = '/'.join(f'p{rng.randrange(4)}' for _ in range(rng.randrange(3)))
+        prefix = f'{host}/{path}' if path else host
+        rules[prefix] = f'http://apt-cache.local/{len(rules)}'
+    return rules
+
+def make_uris(count, rule_count, seed=1):
+    """ Generate source URIs, some of which match a rule.
+
+    Arguments:
+        count (int): The number of URIs.
+        rule_count (int): The number of rules they were generated for.
+        seed (int): The seed for the random choices.
+
+    Returns:
+        [str]: The URIs.
+    """
+    rng = random.Random(seed)
+    return [
+        f'http://mirror{rng.randrange(rule_count * 2)}.example.com/'
+        + '/'.join(f'p{rng.randrange(4)}' for _ in range(rng.randrange(1, 5)))
+        for _ in range(count)
+    ]
+
+def rewrite_linear(uri, rules):
+    """ Rewrite a URI by checking every rule in turn.
+
+    Arguments:
+        uri (str): The URI to rewrite.
+        rules (dict): The normalized prefixes and their replacements.
+
+    Returns:
+        str: The rewritten URI.
+    """
+    normalized = util.normalize_uri(uri)
+    best = None
+    for prefix in rules:
+        if normalized == prefix or normalized.startswith(prefix + '/'):
+            if best is None or len(prefix) > len(best):
+                best = prefix
+    if best is None:
+        return uri
+    return rules[best].rstrip('/') + normalized[len(best):]
+
+def run(rule_counts=None, uri_counts=None):
+    """ Run the benchmark.
+
+    Arguments:
+        rule_counts ([int]): The numbers of rules. Default is RULE_COUNTS.
+        uri_counts ([int]): The numbers of URIs. Default is URI_COUNTS.
+
+    Returns:
+        dict: The results, with details about the environment.
+    """
+    results = []
+    for rule_count in rule_counts or RULE_COUNTS:
+        rules = make_rules(rule_count)
+        normalized = {util.normalize_uri(prefix): new for prefix, new in rules.items()}
+        start = time.perf_counter()
+        trie = URITrie(rules)
+        build = time.perf_counter() - start
+        for uri_count in uri_counts or URI_COUNTS:
+            uris = make_uris(uri_count, rule_count)
+
+            start = time.perf_counter()
+            expected = [rewrite_linear(uri, normalized) for uri in uris]
+            linear = time.perf_counter() - start
+
+            start = time.perf_counter()
+            rewritten = [trie.rewrite(uri) for uri in uris]
+            trie_time = time.perf_counter() - start
+
+            if rewritten != expected:
+                raise AssertionError('The trie and linear rewrites differ')
+            results.append({
+                'rules': rule_count,
+                'uris': uri_count,
+                'matched': sum(
+                    1 for uri, new in zip(uris, rewritten) if uri != new
+                ),
+                'trie_build_seconds': round(build, 6),
+                'trie_seconds': round(trie_time, 6),
+                'linear_seconds': round(linear, 6),
+                'speedup': round(linear / trie_time, 1),
+            })
+
+    return {
+        'repolib': VERSION,
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+def main(argv=None):
+    """ Run the benchmark from the command line. """
+    parser = argparse.ArgumentParser(
+        prog='python3 -m benchmarks.rewrite',
+        description='Time matching URIs against prefix rewrite rules.'
+    )
+    parser.add_argument(
+        '-r',
+        '--rules',
+        action='append',
+        type=int,
+        help='Use this many rules. May be given more than once.'
+    )
+    parser.add_argument(
+        '-u',
+        '--uris',
+        action='append',
+        type=int,
+        help='Rewrite this many URIs. May be given more than once.'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='Write the results to this file instead of stdout.'
+    )
+    args = parser.parse_args(argv)
+
+    report = run(args.rules, args.uris)
+    if args.output:
+        with open(args.output, mode='w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == '__main__':
+    main()
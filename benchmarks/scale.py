@@ -0,0 +1,279 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Scale benchmark, with synthetic sources dirs of up to 10,000 files.
+
+For each size, a sources dir is generated in a temporary directory with a
+mix of DEB822 and legacy files, multi-stanza files and disabled sources. Each
+flow is then run in a fresh process, the way apt-manage would be, and its
+latency and the peak RSS of the process are reported as JSON. Run it from the
+top of the source tree::
+
+    python3 -m benchmarks.scale --output scale.json
+
+If any flow exceeds its budget, the exit status is 1.
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from . import corpus
+
+SIZES = [100, 1000, 10000]
+FLOWS = ['scan', 'list', 'add', 'modify', 'remove']
+
+# The maximum latency of each flow in seconds, at any size.
+BUDGETS = {
+    'scan': 10.0,
+    'list': 10.0,
+    'add': 5.0,
+    'modify': 5.0,
+    'remove': 5.0,
+}
+MAX_RSS_MIB = 256
+
+def generate(sources_dir, size):
+    """ Generate a synthetic sources dir.
+
+    Two thirds of the files are DEB822 .sources files and one third are legacy
+    .list files with a deb-src line. Every fourth file has three sources, and
+    every fifth file is disabled.
+
+    Arguments:
+        sources_dir (pathlib.Path): The directory to generate files in.
+        size (int): The number of files to generate.
+    """
+    for number in range(size):
+        disabled = number % 5 == 0
+        stanzas = 3 if number % 4 == 0 else 1
+        if number % 3 == 2:
+            lines = ['## Added/managed by repolib ##', '#']
+            lines.append(f'## X-Repolib-Name: Repository {number}')
+            for stanza in range(stanzas):
+                unique = number * 10 + stanza
+                lines.append(corpus.make_line(unique, disabled=disabled))
+                lines.append(corpus.make_line(
+                    unique, disabled=True, source_code=True
+                ))
+            contents = '\n'.join(lines) + '\n'
+            filename = f'repo-{number:05}.list'
+        else:
+            contents = '\n'.join(
+                corpus.make_stanza(
+                    number * 10 + stanza,
+                    disabled=disabled,
+                    name=f'Repository {number}' + (f' {stanza}' if stanza else '')
+                )
+                for stanza in range(stanzas)
+            )
+            filename = f'repo-{number:05}.sources'
+        with open(sources_dir / filename, mode='w') as source_file:
+            source_file.write(contents)
+
+def run_flow(flow, sources_dir, cache_dir, size):
+    """ Run a single flow against a sources dir.
+
+    This is run in a fresh process, so that the peak RSS is only for this
+    flow.
+
+    Arguments:
+        flow (str): The name of the flow to run.
+        sources_dir (str): The sources dir to use.
+        cache_dir (str): The cache dir to use.
+        size (int): The number of files in the sources dir.
+
+    Returns:
+        dict: The 'seconds' taken and the 'peak_rss_mib' of the process.
+    """
+    # pylint: disable=import-outside-toplevel
+    # The library is imported in the worker, so it is loaded fresh each time.
+    import logging
+    from repolib import util
+    from repolib.command.add import build_source
+    from repolib.command.listall import iter_records
+    from repolib.command.modify import modify_repository
+    from repolib.command.remove import remove_repository
+    from repolib.index import SourcesIndex
+    from repolib.transaction import update_caches
+
+    util.SOURCES_DIR = sources_dir
+    util.CACHE_DIR = cache_dir
+    new_line = corpus.make_line(size * 10 + 1)
+
+    start = time.perf_counter()
+    if flow == 'scan':
+        for _ in SourcesIndex().sources():
+            pass
+    elif flow == 'list':
+        index = SourcesIndex()
+        log = logging.getLogger('benchmark')
+        for _ in iter_records(log, index, index.entries()):
+            pass
+    elif flow == 'add':
+        build_source(new_line).save_to_disk()
+        update_caches()
+    elif flow == 'modify':
+        args = argparse.Namespace(
+            enable=False, disable=False,
+            add_suite=None, remove_suite=None,
+            add_component='benchmark', remove_component=None,
+            add_uri=None, remove_uri=None,
+            add_option=None, remove_option=None,
+        )
+        modify_repository(f'Repository {size // 2}', args).commit()
+    elif flow == 'remove':
+        remove_repository(build_source(new_line).name).commit()
+    seconds = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'seconds': round(seconds, 4), 'peak_rss_mib': round(peak_rss / 1024, 1)}
+
+def run(sizes=None, flows=None, budgets=None, max_rss=MAX_RSS_MIB):
+    """ Run the benchmark.
+
+    Arguments:
+        sizes ([int]): The numbers of files to benchmark with.
+        flows ([str]): The flows to run. They are run in order against the
+            same sources dir, so remove should follow add.
+        budgets (dict): The maximum latency of each flow, in seconds.
+        max_rss (float): The maximum peak RSS of any flow, in MiB.
+
+    Returns:
+        dict: The results, and a list of the budgets which were exceeded.
+    """
+    budgets = budgets or BUDGETS
+    context = multiprocessing.get_context('spawn')
+    results = []
+    exceeded = []
+    for size in sizes or SIZES:
+        root = Path(tempfile.mkdtemp(prefix='repolib-scale-'))
+        try:
+            sources_dir = root / 'sources.list.d'
+            cache_dir = root / 'cache'
+            sources_dir.mkdir()
+            cache_dir.mkdir()
+            generate(sources_dir, size)
+            with context.Pool(1, maxtasksperchild=1) as pool:
+                for flow in flows or FLOWS:
+                    result = pool.apply(
+                        run_flow, (flow, str(sources_dir), str(cache_dir), size)
+                    )
+                    result.update({'flow': flow, 'files': size})
+                    results.append(result)
+                    if result['seconds'] > budgets.get(flow, float('inf')):
+                        exceeded.append(
+                            f'{flow} with {size} files took '
+                            f'{result["seconds"]}s (budget {budgets[flow]}s)'
+                        )
+                    if result['peak_rss_mib'] > max_rss:
+                        exceeded.append(
+                            f'{flow} with {size} files used '
+                            f'{result["peak_rss_mib"]} MiB (budget {max_rss} MiB)'
+                        )
+        finally:
+            shutil.rmtree(root)
+
+    return {'results': results, 'exceeded': exceeded}
+
+def parse_budget(budget):
+    """ Parse a FLOW=SECONDS budget from the command line. """
+    flow, _, seconds = budget.partition('=')
+    if flow not in FLOWS:
+        raise argparse.ArgumentTypeError(f'Unknown flow: {flow}')
+    try:
+        return flow, float(seconds)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f'Invalid budget: {budget}') from err
+
+def main(argv=None):
+    """ Run the benchmark from the command line. """
+    parser = argparse.ArgumentParser(
+        prog='python3 -m benchmarks.scale',
+        description='Time apt-manage flows against large sources dirs.'
+    )
+    parser.add_argument(
+        '-s',
+        '--size',
+        action='append',
+        type=int,
+        help='Benchmark with this many files. May be given more than once.'
+    )
+    parser.add_argument(
+        '-f',
+        '--flow',
+        action='append',
+        choices=FLOWS,
+        help='Run only this flow. May be given more than once.'
+    )
+    parser.add_argument(
+        '-b',
+        '--budget',
+        action='append',
+        type=parse_budget,
+        default=[],
+        metavar='FLOW=SECONDS',
+        help='Set the maximum latency for a flow. May be given more than once.'
+    )
+    parser.add_argument(
+        '--max-rss',
+        type=float,
+        default=MAX_RSS_MIB,
+        metavar='MIB',
+        help=f'Set the maximum peak RSS for any flow. Default {MAX_RSS_MIB}.'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='Write the results to this file instead of stdout.'
+    )
+    args = parser.parse_args(argv)
+
+    budgets = dict(BUDGETS)
+    budgets.update(args.budget)
+    report = run(args.size, args.flow, budgets, args.max_rss)
+    if args.output:
+        with open(args.output, mode='w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    for failure in report['exceeded']:
+        print(f'Budget exceeded: {failure}', file=sys.stderr)
+    if report['exceeded']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
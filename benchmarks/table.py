@@ -0,0 +1,301 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Benchmark for querying many hosts' sources with the columnar SourceTable.
+
+A synthetic fleet inventory is generated, as output by apt-manage inventory,
+and a typical fleet query (the hosts using a suite with a component), a
+count of the indexes configured for each suite, and finding the distinct
+indexes enabled across the fleet are timed over the SourceTable, and over
+the parsed records kept as a list of dicts, for comparison. The memory each takes up is
+measured with tracemalloc. The results are reported as JSON. Run it from the
+top of the source tree::
+
+    python3 -m benchmarks.table --output table.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from repolib import VERSION
+from repolib.table import SourceTable
+
+HOST_COUNTS = [1000, 10000]
+SUITES = ['focal', 'jammy', 'noble']
+POCKETS = ['', '-updates', '-security', '-backports']
+COMPONENTS = ['main', 'restricted', 'universe', 'multiverse']
+
+def make_inventory(host_count, seed=0):
+    """ Generate the lines of a fleet inventory.
+
+    Each host has the archive, with a few pockets of one release, and a few
+    third-party repositories.
+
+    Arguments:
+        host_count (int): The number of hosts.
+        seed (int): The seed for the random choices.
+
+    Returns:
+        [str]: The NDJSON lines.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for host_number in range(host_count):
+        host = f'host{host_number}.example.com'
+        suite = rng.choice(SUITES)
+        lines.append(json.dumps({
+            'host': host,
+            'file': 'sources.list',
+            'name': 'archive',
+            'enabled': True,
+            'types': ['deb'],
+            'uris': ['http://archive.ubuntu.com/ubuntu'],
+            'suites': [suite + pocket for pocket in POCKETS[:rng.randrange(1, 5)]],
+            'components': COMPONENTS[:rng.randrange(1, 5)],
+        }))
+        for repo in rng.sample(range(50), 3):
+            lines.append(json.dumps({
+                'host': host,
+                'file': f'sources.list.d/repo{repo}.sources',
+                'name': f'Repo {repo}',
+                'enabled': rng.random() > 0.2,
+                'types': ['deb'],
+                'uris': [f'http://repo{repo}.example.com/apt'],
+                'suites': [suite],
+                'components': ['main'],
+            }))
+    return lines
+
+def parse_records(lines):
+    """ Parse the lines of an inventory into a list of records.
+
+    Arguments:
+        lines ([str]): The lines of the inventory.
+
+    Returns:
+        [dict]: The records.
+    """
+    return [json.loads(line) for line in lines]
+
+def query_records(records, suite, component):
+    """ Find the hosts using a suite with a component in a list of records.
+
+    Arguments:
+        records ([dict]): The records.
+        suite (str): The suite.
+        component (str): The component.
+
+    Returns:
+        set: The hosts.
+    """
+    return {
+        record['host'] for record in records
+        if suite in record['suites'] and component in record['components']
+    }
+
+def count_records(records):
+    """ Count the indexes configured for each suite in a list of records.
+
+    Arguments:
+        records ([dict]): The records.
+
+    Returns:
+        collections.Counter: The number of indexes (combinations of type,
+        URI and component) configured for each suite.
+    """
+    counts = Counter()
+    for record in records:
+        indexes = (
+            len(record['types']) * len(record['uris'])
+            * len(record['components'])
+        )
+        for suite in record['suites']:
+            counts[suite] += indexes
+    return counts
+
+def dedupe_records(records):
+    """ Find the distinct enabled indexes in a list of records.
+
+    Arguments:
+        records ([dict]): The records.
+
+    Returns:
+        set: The type, URI, suite and component of each index.
+    """
+    return {
+        (source_type, uri, suite, component)
+        for record in records if record['enabled']
+        for source_type in record['types']
+        for uri in record['uris']
+        for suite in record['suites']
+        for component in record['components']
+    }
+
+def query_table(table, suite, component):
+    """ Find the hosts using a suite with a component in a table.
+
+    Arguments:
+        table (SourceTable): The table.
+        suite (str): The suite.
+        component (str): The component.
+
+    Returns:
+        set: The hosts.
+    """
+    return set(table.filter(suite=suite, component=component).unique('host'))
+
+def dedupe_table(table):
+    """ Find the distinct enabled indexes in a table.
+
+    Arguments:
+        table (SourceTable): The table.
+
+    Returns:
+        SourceTable: The first row of each index.
+    """
+    return table.filter(True).dedupe('type', 'uri', 'suite', 'component')
+
+def measure(function, *args):
+    """ Time a function, and measure the memory its result holds.
+
+    Arguments:
+        function: The function to call.
+        args: The arguments to call it with.
+
+    Returns:
+        (object, float, int): The result, the seconds taken, and the bytes
+        it holds.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, size
+
+def time_call(function, *args):
+    """ Time a function.
+
+    Returns:
+        (object, float): The result and the seconds taken.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def run(host_counts=None):
+    """ Run the benchmark.
+
+    Arguments:
+        host_counts ([int]): The numbers of hosts. Default is HOST_COUNTS.
+
+    Returns:
+        dict: The results, with details about the environment.
+    """
+    results = []
+    for host_count in host_counts or HOST_COUNTS:
+        lines = make_inventory(host_count)
+        records, _, records_bytes = measure(parse_records, lines)
+        table, load_time, table_bytes = measure(SourceTable.from_ndjson, lines)
+
+        expected, records_query = time_call(
+            query_records, records, 'focal', 'universe'
+        )
+        hosts, table_query = time_call(
+            query_table, table, 'focal', 'universe'
+        )
+        if hosts != expected:
+            raise AssertionError('The table and record queries differ')
+
+        expected, records_count = time_call(count_records, records)
+        counts, table_count = time_call(table.count, 'suite')
+        if counts != expected:
+            raise AssertionError('The table and record counts differ')
+
+        expected, records_dedupe = time_call(dedupe_records, records)
+        indexes, table_dedupe = time_call(dedupe_table, table)
+        if len(indexes) != len(expected):
+            raise AssertionError('The table and record dedupes differ')
+
+        results.append({
+            'hosts': host_count,
+            'records': len(records),
+            'rows': len(table),
+            'load_seconds': round(load_time, 6),
+            'records_bytes': records_bytes,
+            'table_bytes': table_bytes,
+            'records_query_seconds': round(records_query, 6),
+            'table_query_seconds': round(table_query, 6),
+            'records_count_seconds': round(records_count, 6),
+            'table_count_seconds': round(table_count, 6),
+            'records_dedupe_seconds': round(records_dedupe, 6),
+            'table_dedupe_seconds': round(table_dedupe, 6),
+        })
+
+    return {
+        'repolib': VERSION,
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+def main(argv=None):
+    """ Run the benchmark from the command line. """
+    parser = argparse.ArgumentParser(
+        prog='python3 -m benchmarks.table',
+        description="Time querying many hosts' sources with a SourceTable."
+    )
+    parser.add_argument(
+        '-H',
+        '--hosts',
+        action='append',
+        type=int,
+        help='Use an inventory of this many hosts. May be given more than once.'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='Write the results to this file instead of stdout.'
+    )
+    args = parser.parse_args(argv)
+
+    report = run(args.hosts)
+    if args.output:
+        with open(args.output, mode='w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -26,13 +26,17 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
-from .source import Source
-from .system import SystemSource
-from .legacy_deb import LegacyDebSource
-from .deb import DebLine
-from .ppa import PPALine
-from .util import AptSourceEnabled, AptSourceType, RepoError
-from . import util
-from . import __version__
+from . import timing
+
+with timing.span('import', always=True):
+    from .source import Source
+    from .system import SystemSource
+    from .legacy_deb import LegacyDebSource
+    from .deb import DebLine
+    from .ppa import PPALine
+    from .util import AptSourceEnabled, AptSourceType, RepoError
+    from . import metrics
+    from . import util
+    from . import __version__
 
 VERSION = __version__.__version__
@@ -30,8 +30,39 @@ repolib. apt-manage uses this library.
 """
 
 from . import add
+from . import apply
 from . import argparser
+from . import daemon
+from . import duplicates
+from . import estimate
+from . import fingerprint
+from . import inventory
+from . import listall
+from . import mirror
+from . import modify
+from . import orphans
+from . import probe
+from . import query
+from . import remove
+from . import rewrite
+from . import source
 
 add = add.add
+apply = apply.apply
+duplicates = duplicates.duplicates
+estimate = estimate.estimate
+fingerprint = fingerprint.fingerprint
+forward = daemon.forward
+inventory = inventory.inventory
+listall = listall.listall
+mirror = mirror.mirror
+modify = modify.modify
+orphans = orphans.orphans
+probe = probe.probe
+query = query.query
+remove = remove.remove
+rewrite = rewrite.rewrite
+serve = daemon.serve
+source = source.source
 
 parser = argparser.get_argparser()
@@ -31,23 +31,30 @@ Module for adding repos to the system in CLI applications.
 import os
 import sys
 
+from .. import lists
+from .. import timing
 from ..deb import DebLine
 from ..legacy_deb import LegacyDebSource
 from ..ppa import PPALine
+from ..transaction import Transaction, update_caches
+from ..util import RepoError
+from .apply import commit_changes, print_summary
+from .modify import log_problems
 
 def add(log, args, parser):
     """ Add subcommand. 
     
     The add command is used for adding new software sources to the system. It
-    requires root. 
+    requires root, unless --dry-run is given.
 
     Options:
         --disable, -d
         --source-code, -s
         --expand, -e
+        --dry-run, -n
     """
 
-    if os.geteuid() != 0:
+    if not args.dry_run and os.geteuid() != 0:
         parser.print_usage()
         log.error('You need to root, or use sudo.')
         sys.exit(1)
@@ -59,7 +66,7 @@ def add(log, args, parser):
     expand = args.expand
 
     debline = ' '.join(args.deb_line)
-    if args.deb_line == '822styledeb':
+    if not debline:
         parser.print_usage()
         log.error('A repository is required.')
         sys.exit(1)
@@ -67,43 +74,26 @@ def add(log, args, parser):
     if debline.startswith('http'):
         debline = f'deb {debline}'
 
-    new_source = LegacyDebSource()
-    if debline.startswith('ppa:'):
-        add_source = PPALine(debline, verbose=verbose)
-    
-    elif debline.startswith('deb'):
-        expand = False
-        add_source = DebLine(debline)
-    
-    else:
+    try:
+        with timing.span('build'):
+            new_source = build_source(
+                debline,
+                source_code=args.source_code,
+                disable=args.disable,
+                verbose=verbose
+            )
+    except RepoError:
         log.critical(
             'The line "%s" is malformed. Double-check the spelling.',
             debline
         )
         sys.exit(1)
-    
-    new_source.sources.append(add_source)
-
-    if not debline.startswith('deb-src'):
-        src_source = add_source.copy()
-        src_source.enabled = False
-    else:
-        src_source = add_source
-    
-    if args.source_code:
-        src_source.enabled = True
+    add_source = new_source.sources[0]
+    log_problems(log, lists.validate(add_source))
 
-    if not debline.startswith('deb-src'):
-        new_source.sources.append(src_source)
+    if not debline.startswith('ppa:'):
+        expand = False
 
-    new_source.sources[0].enabled = True
-    
-    if args.disable:
-        for repo in new_source.sources:
-            repo.enabled = False
-    
-    new_source.make_names()
-    
     if args.debug > 0:
         log.info('Debug mode set, not saving.')
         for src in new_source.sources:
@@ -111,7 +101,14 @@ def add(log, args, parser):
         log.info('Filename to save: %s', new_source.filename)
         print(f'{new_source.make_deblines()}')
         
-    
+
+    if args.dry_run:
+        changes = Transaction()
+        changes.write(new_source.filename, new_source.make_deblines())
+        summary = commit_changes(changes, dry_run=True)
+        print_summary(summary, dry_run=True)
+        return
+
     if expand:
         print(new_source.sources[0].make_source_string())
         print(f'{add_source.ppa_info["description"]}\n')
@@ -119,6 +116,57 @@ def add(log, args, parser):
         input()
     
     if args.debug == 0:
-        new_source.save_to_disk()
+        with timing.span('save'):
+            new_source.save_to_disk()
+        update_caches()
     else:
-        sys.exit(2)
\ No newline at end of file
+        sys.exit(2)
+
+def build_source(debline, source_code=False, disable=False, verbose=False):
+    """ Build a new source from a deb line or ppa: shortcut.
+
+    Unless the line is a deb-src line, a disabled deb-src entry is added
+    alongside the binary entry, so source code can be enabled later.
+
+    Arguments:
+        debline (str): The deb line or ppa: shortcut for the repository.
+        source_code (bool): Whether to enable source code packages.
+        disable (bool): Whether to add the repository disabled.
+        verbose (bool): Whether to print the information fetched for PPAs.
+
+    Returns:
+        LegacyDebSource: The new source, ready to be saved.
+
+    Raises:
+        RepoError: If the line is malformed.
+    """
+    new_source = LegacyDebSource()
+    if debline.startswith('ppa:'):
+        add_source = PPALine(debline, verbose=verbose)
+    elif debline.startswith('deb'):
+        add_source = DebLine(debline)
+    else:
+        raise RepoError(f'The line "{debline}" is malformed.')
+
+    new_source.sources.append(add_source)
+
+    if not debline.startswith('deb-src'):
+        src_source = add_source.copy()
+        src_source.enabled = False
+    else:
+        src_source = add_source
+
+    if source_code:
+        src_source.enabled = True
+
+    if not debline.startswith('deb-src'):
+        new_source.sources.append(src_source)
+
+    new_source.sources[0].enabled = True
+
+    if disable:
+        for repo in new_source.sources:
+            repo.enabled = False
+
+    new_source.make_names()
+    return new_source
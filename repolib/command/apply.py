@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Module for applying a manifest of sources in CLI applications.
+"""
+
+import os
+import sys
+
+from .. import manifest
+from .. import transaction
+
+SYMBOLS = {
+    transaction.ADDED: '+',
+    transaction.MODIFIED: '~',
+    transaction.REMOVED: '-',
+}
+
+def apply(log, args, parser):
+    """ Apply subcommand.
+
+    The apply command makes the sources dir match a manifest of desired
+    sources. The differences are worked out in a single pass, then all of the
+    changes are committed together. It requires root, unless --dry-run is
+    given.
+
+    Options:
+        --dry-run, -n
+        --prune, -p
+    """
+
+    if not args.dry_run and os.geteuid() != 0:
+        parser.print_usage()
+        log.error('You need to root, or use sudo.')
+        sys.exit(1)
+
+    try:
+        with open(args.manifest, mode='r') as manifest_file:
+            desired = manifest.load_manifest(manifest_file)
+        changes = manifest.plan(desired, prune=args.prune)
+        summary = commit_changes(changes, dry_run=args.dry_run)
+    except OSError as err:
+        log.error('Could not read the manifest %s: %s', args.manifest, err)
+        sys.exit(1)
+    except (manifest.ManifestError, transaction.TransactionError) as err:
+        log.error(err)
+        sys.exit(err.code)
+
+    print_summary(summary, dry_run=args.dry_run)
+
+def commit_changes(changes, dry_run=False):
+    """ Commit a transaction, or show what it would change.
+
+    Arguments:
+        changes (transaction.Transaction): The changes to make.
+        dry_run (bool): If True, print a unified diff of the changes instead
+            of making them. Nothing is written to disk.
+
+    Returns:
+        [(str, str)]: The changes, as returned by
+        transaction.Transaction.changes().
+    """
+    if dry_run:
+        sys.stdout.write(changes.diff())
+        return changes.changes()
+    return changes.commit()
+
+def print_summary(summary, dry_run=False):
+    """ Print a compact summary of the changes in a transaction.
+
+    Arguments:
+        summary ([(str, str)]): The changes, as returned by
+            transaction.Transaction.changes().
+        dry_run (bool): Whether the changes were not actually made.
+    """
+    counts = {change: 0 for change in SYMBOLS}
+    unchanged = 0
+    for change, filename in summary:
+        if change == transaction.UNCHANGED:
+            unchanged += 1
+            continue
+        counts[change] += 1
+        print(f'{SYMBOLS[change]} {filename}')
+
+    print(
+        f'{sum(counts.values())} changes '
+        f'({counts[transaction.ADDED]} added, '
+        f'{counts[transaction.MODIFIED]} modified, '
+        f'{counts[transaction.REMOVED]} removed), '
+        f'{unchanged} unchanged'
+        f'{" (dry run)" if dry_run else ""}'
+    )
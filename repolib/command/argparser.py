@@ -30,6 +30,9 @@ Module for getting an argparser. Used by apt-manage
 
 import argparse
 from .. import __version__
+from .. import probe
+from .. import table
+from .. import util
 
 def get_argparser():
     """ Get an argument parser with our arguments.
@@ -49,6 +52,36 @@ def get_argparser():
         action='count',
         help=argparse.SUPPRESS
     )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help=(
+            'Run as a persistent server, answering list, add, modify and '
+            'remove commands over a UNIX socket. While the server is running, '
+            'these commands are forwarded to it.'
+        )
+    )
+    parser.add_argument(
+        '--socket',
+        default=util.SOCKET_PATH,
+        help=f'The socket used by the server (default: {util.SOCKET_PATH})'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help=(
+            'Print how long each phase of the command took to stderr. This '
+            'can also be enabled by setting REPOLIB_PROFILE=1.'
+        )
+    )
+    parser.add_argument(
+        '--profile-output',
+        metavar='FILE',
+        help=(
+            'With --profile, also profile the command with cProfile and '
+            'write the stats to FILE.'
+        )
+    )
 
     subparsers = parser.add_subparsers(
         help='...',
@@ -63,7 +96,7 @@ def get_argparser():
     parser_add.add_argument(
         'deb_line',
         nargs='*',
-        default='822styledeb',
+        default=[],
         help='The deb line of the repository to add'
     )
     parser_add.add_argument(
@@ -84,6 +117,12 @@ def get_argparser():
         action='store_true',
         help='Display expanded details about the repository before adding it.'
     )
+    parser_add.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        help='Show the changes which would be made without making them.'
+    )
 
     # remove subcommand
     parser_remove = subparsers.add_parser(
@@ -94,6 +133,12 @@ def get_argparser():
         'repository',
         help='The name of the repository to remove. See LIST'
     )
+    parser_remove.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        help='Show the changes which would be made without making them.'
+    )
 
     # modify subcommand
     parser_modify = subparsers.add_parser(
@@ -104,7 +149,47 @@ def get_argparser():
         'repository',
         nargs='*',
         default='system',
-        help='The repository to modify. Default is the system repository.'
+        help=(
+            'The repository to modify. Default is the system repository, '
+            'unless any selectors are given.'
+        )
+    )
+
+    # Selectors
+    modify_select = parser_modify.add_argument_group(
+        'selectors',
+        (
+            'Modify every repository matching all of the given selectors, '
+            'instead of a single repository.'
+        )
+    )
+    modify_select.add_argument(
+        '--match-name',
+        metavar='GLOB',
+        help='Select repositories whose name matches the shell-style GLOB.'
+    )
+    modify_select.add_argument(
+        '--match-uri',
+        metavar='PREFIX',
+        help='Select sources with a URI starting with PREFIX.'
+    )
+    modify_select.add_argument(
+        '--match-suite',
+        metavar='SUITE',
+        help='Select sources which include SUITE.'
+    )
+    modify_select.add_argument(
+        '--match-component',
+        metavar='COMPONENT',
+        help='Select sources which include COMPONENT.'
+    )
+    modify_select.add_argument(
+        '--match-type',
+        choices=['sources', 'list'],
+        help=(
+            'Select only DEB822 (sources) or legacy one-line (list) format '
+            'repositories.'
+        )
     )
 
     modify_enable = parser_modify.add_mutually_exclusive_group(
@@ -202,6 +287,12 @@ def get_argparser():
             'Multiple option-value pairs should be separated with commas.'
         )
     )
+    parser_modify.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        help='Show the changes which would be made without making them.'
+    )
 
 
     # list subcommand
@@ -225,6 +316,379 @@ def get_argparser():
         action='store_true',
         help='Display details of all configured repositories.'
     )
+    parser_list.add_argument(
+        '-f',
+        '--format',
+        choices=['text', 'json', 'ndjson'],
+        default='text',
+        help=(
+            'The output format. json and ndjson output a record for each '
+            'configured source, written as each file is read.'
+        )
+    )
+
+    # apply subcommand
+    parser_apply = subparsers.add_parser(
+        'apply',
+        help='Make the configured repositories match a manifest.'
+    )
+    parser_apply.add_argument(
+        'manifest',
+        help=(
+            'A JSON or DEB822 file listing the desired repositories. The JSON '
+            'format is the same as the output of list --format json.'
+        )
+    )
+    parser_apply.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        help='Show the changes which would be made without making them.'
+    )
+    parser_apply.add_argument(
+        '-p',
+        '--prune',
+        action='store_true',
+        help=(
+            'Also remove repositories which are not in the manifest. The '
+            'system repository is never removed.'
+        )
+    )
+
+    # duplicates subcommand
+    parser_duplicates = subparsers.add_parser(
+        'duplicates',
+        help=(
+            'Find sources which configure the same indexes as another source, '
+            'and explain which to drop.'
+        )
+    )
+    parser_duplicates.add_argument(
+        '-f',
+        '--format',
+        choices=['text', 'json', 'ndjson'],
+        default='text',
+        help=(
+            'The output format. json and ndjson output a record for each '
+            'overlap.'
+        )
+    )
+
+    # estimate subcommand
+    parser_estimate = subparsers.add_parser(
+        'estimate',
+        help=(
+            'Estimate how many index files apt update fetches for each '
+            'source, and recommend ways to reduce them.'
+        )
+    )
+    parser_estimate.add_argument(
+        '--architectures',
+        metavar='ARCH[,ARCH]',
+        help=(
+            'Estimate for these architectures, instead of the ones dpkg is '
+            'configured for. The first is the native architecture.'
+        )
+    )
+    parser_estimate.add_argument(
+        '--languages',
+        metavar='LANG[,LANG]',
+        help=(
+            'Estimate for these translation languages, instead of the ones '
+            'from the environment.'
+        )
+    )
+    parser_estimate.add_argument(
+        '-f',
+        '--format',
+        choices=['text', 'json', 'ndjson'],
+        default='text',
+        help=(
+            'The output format. json and ndjson output a record for each '
+            'source.'
+        )
+    )
+
+    # gc subcommand
+    parser_gc = subparsers.add_parser(
+        'gc',
+        help=(
+            'List downloaded package lists and keyrings which no configured '
+            'repository uses.'
+        )
+    )
+    parser_gc.add_argument(
+        '--delete',
+        action='store_true',
+        help='Delete the orphaned files. This requires root.'
+    )
+
+    # probe subcommand
+    parser_probe = subparsers.add_parser(
+        'probe',
+        help=(
+            'Check the latency and health of the mirrors used by the '
+            'configured repositories.'
+        )
+    )
+    parser_probe.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=probe.DEFAULT_WORKERS,
+        help=(
+            'The most mirrors to request at once '
+            f'(default: {probe.DEFAULT_WORKERS}).'
+        )
+    )
+    parser_probe.add_argument(
+        '-t',
+        '--timeout',
+        type=float,
+        default=probe.DEFAULT_TIMEOUT,
+        help=(
+            'The seconds to wait for each mirror to respond '
+            f'(default: {probe.DEFAULT_TIMEOUT}).'
+        )
+    )
+    parser_probe.add_argument(
+        '-f',
+        '--format',
+        choices=['text', 'json', 'ndjson'],
+        default='text',
+        help=(
+            'The output format. json and ndjson output a record for each '
+            'URI and suite.'
+        )
+    )
+
+    # mirror subcommand
+    parser_mirror = subparsers.add_parser(
+        'mirror',
+        help=(
+            'Switch every repository using one of several mirrors to the '
+            'fastest of them.'
+        )
+    )
+    parser_mirror.add_argument(
+        'candidates',
+        nargs='+',
+        metavar='URI',
+        help='The URIs of the mirrors of the same archive to choose from.'
+    )
+    parser_mirror.add_argument(
+        '--suite',
+        help=(
+            'The suite to request from each mirror (default: the suite of '
+            'the running system).'
+        )
+    )
+    parser_mirror.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=probe.DEFAULT_WORKERS,
+        help=(
+            'The most mirrors to request at once '
+            f'(default: {probe.DEFAULT_WORKERS}).'
+        )
+    )
+    parser_mirror.add_argument(
+        '-t',
+        '--timeout',
+        type=float,
+        default=probe.DEFAULT_TIMEOUT,
+        help=(
+            'The seconds to wait for each mirror to respond '
+            f'(default: {probe.DEFAULT_TIMEOUT}).'
+        )
+    )
+    parser_mirror.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        help='Show the changes which would be made without making them.'
+    )
+
+    # rewrite subcommand
+    parser_rewrite = subparsers.add_parser(
+        'rewrite',
+        help='Rewrite the URIs of repositories using prefix rules.'
+    )
+    parser_rewrite.add_argument(
+        'rules',
+        help=(
+            'A file of rules, one per line: a URI prefix and the URI to '
+            'replace it with.'
+        )
+    )
+    parser_rewrite.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        help='Show the changes which would be made without making them.'
+    )
+
+    # fingerprint subcommand
+    parser_fingerprint = subparsers.add_parser(
+        'fingerprint',
+        help=(
+            'Print a hash of the configured sources, to compare with other '
+            'hosts.'
+        )
+    )
+    parser_fingerprint.add_argument(
+        '-v',
+        '--verbose',
+        action='store_true',
+        help='Also print the hash and normalized sources of each file.'
+    )
+    fingerprint_output = parser_fingerprint.add_mutually_exclusive_group()
+    fingerprint_output.add_argument(
+        '-f',
+        '--format',
+        choices=['text', 'json'],
+        default='text',
+        help=(
+            'The output format. json outputs the whole tree of hashes, which '
+            'can be compared against with --compare.'
+        )
+    )
+    fingerprint_output.add_argument(
+        '--compare',
+        metavar='FILE',
+        help=(
+            "Show the differences from another host's fingerprint, saved with "
+            '--format json.'
+        )
+    )
+
+    # inventory subcommand
+    parser_inventory = subparsers.add_parser(
+        'inventory',
+        help=(
+            'List the sources configured on many hosts, from tar archives of '
+            'their /etc/apt directories.'
+        )
+    )
+    parser_inventory.add_argument(
+        'archives',
+        nargs='+',
+        metavar='ARCHIVE',
+        help=(
+            'The archives to read, each named after its host (e.g. '
+            'host1.tar.gz).'
+        )
+    )
+    parser_inventory.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        help='The most archives to read at once (default: the number of CPUs).'
+    )
+    parser_inventory.add_argument(
+        '-o',
+        '--output',
+        metavar='FILE',
+        help='Write the records to FILE instead of the standard output.'
+    )
+
+    # query subcommand
+    parser_query = subparsers.add_parser(
+        'query',
+        help='Find the sources in an inventory made by the inventory command.'
+    )
+    parser_query.add_argument(
+        'inventory',
+        help='The inventory to read, or - to read the standard input.'
+    )
+    query_select = parser_query.add_argument_group(
+        'selectors',
+        'Only use the sources matching all of these.'
+    )
+    query_select.add_argument(
+        '--match-host',
+        metavar='GLOB',
+        help='Select hosts whose name matches the shell-style GLOB.'
+    )
+    query_select.add_argument(
+        '--match-name',
+        metavar='GLOB',
+        help='Select sources whose name matches the shell-style GLOB.'
+    )
+    query_select.add_argument(
+        '--match-type',
+        choices=['deb', 'deb-src'],
+        help='Select only binary (deb) or source code (deb-src) sources.'
+    )
+    query_select.add_argument(
+        '--match-uri',
+        metavar='PREFIX',
+        help='Select sources with a URI starting with PREFIX.'
+    )
+    query_select.add_argument(
+        '--match-suite',
+        metavar='SUITE',
+        help=(
+            'Select sources which include SUITE (or one of several, '
+            'comma-separated).'
+        )
+    )
+    query_select.add_argument(
+        '--match-component',
+        metavar='COMPONENT',
+        help=(
+            'Select sources which include COMPONENT (or one of several, '
+            'comma-separated).'
+        )
+    )
+    query_enable = query_select.add_mutually_exclusive_group()
+    query_enable.add_argument(
+        '--enabled',
+        dest='enabled',
+        action='store_const',
+        const=True,
+        help='Select only enabled sources.'
+    )
+    query_enable.add_argument(
+        '--disabled',
+        dest='enabled',
+        action='store_const',
+        const=False,
+        help='Select only disabled sources.'
+    )
+    query_output = parser_query.add_mutually_exclusive_group()
+    query_output.add_argument(
+        '--count',
+        metavar='COLUMNS',
+        help=(
+            'Count the sources for each combination of values in these '
+            'comma-separated columns (host, file, name, type, uri, suite, '
+            'component).'
+        )
+    )
+    query_output.add_argument(
+        '--unique',
+        metavar='COLUMN',
+        choices=list(table.COLUMNS),
+        help='List the distinct values of a column, such as host.'
+    )
+    parser_query.add_argument(
+        '--dedupe',
+        metavar='COLUMNS',
+        help=(
+            'Only keep the first source with each combination of values in '
+            'these comma-separated columns, e.g. host,suite to count each '
+            'host once per suite.'
+        )
+    )
+    parser_query.add_argument(
+        '-f',
+        '--format',
+        choices=['text', 'json', 'ndjson'],
+        default='text',
+        help='The output format.'
+    )
 
     # source subcommand
     parser_source = subparsers.add_parser(
@@ -258,5 +722,11 @@ def get_argparser():
         dest='source_disable',
         help='Disable source code for the repository'
     )
+    parser_source.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        help='Show the changes which would be made without making them.'
+    )
 
     return parser
\ No newline at end of file
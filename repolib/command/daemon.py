@@ -0,0 +1,488 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+A persistent apt-manage server, and a client which forwards commands to it.
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+
+from .. import metrics
+from .. import util
+from ..deb import DebLineSourceException
+from ..index import SourcesIndex, SourcesIndexError
+from ..source import Source, SourceError
+from ..system import SystemSourceException
+from ..transaction import UNCHANGED, TransactionError, update_caches
+from .add import build_source
+from .listall import ALL_SOURCES, iter_records, print_records
+from .modify import modify_repository
+from .remove import remove_repository
+
+FORWARDED_COMMANDS = ['list', 'add', 'modify', 'remove']
+WRITE_COMMANDS = ['add', 'modify', 'remove']
+MODIFY_OPTIONS = [
+    'enable', 'disable',
+    'add_suite', 'remove_suite',
+    'add_component', 'remove_component',
+    'add_uri', 'remove_uri',
+    'add_option', 'remove_option',
+]
+MODIFY_FLAGS = ['enable', 'disable']
+# The type of each argument of each command.
+REQUEST_FIELDS = {
+    'list': {'repository': str},
+    'add': {'line': str, 'source_code': bool, 'disable': bool},
+    'modify': {'repository': str, 'changes': dict},
+    'remove': {'repository': str},
+}
+
+ERRORS = (
+    DebLineSourceException,
+    SourceError,
+    SourcesIndexError,
+    SystemSourceException,
+    TransactionError,
+    util.RepoError,
+)
+
+class DaemonError(Exception):
+    """ Exceptions from the apt-manage daemon. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception with the apt-manage daemon
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+def check_request(command, request):
+    """ Make sure the arguments of a request have the right types.
+
+    Arguments:
+        command (str): The name of the command.
+        request (dict): The request.
+
+    Raises:
+        DaemonError: If an argument has the wrong type.
+    """
+    for field, field_type in REQUEST_FIELDS[command].items():
+        value = request.get(field)
+        if value is not None and not isinstance(value, field_type):
+            raise DaemonError(
+                f'The {field} argument must be a {field_type.__name__}.'
+            )
+    for option, value in (request.get('changes') or {}).items():
+        if option not in MODIFY_OPTIONS:
+            raise DaemonError(f'Unknown change: {option}')
+        option_type = bool if option in MODIFY_FLAGS else str
+        if value is not None and not isinstance(value, option_type):
+            raise DaemonError(
+                f'The {option} change must be a {option_type.__name__}.'
+            )
+
+class Registry:
+    """ A warm, in-memory registry of the configured sources.
+
+    The registry keeps the records for each file in the sources dir. Before
+    each request, the directory is scanned and only files which were added or
+    changed since the last request are read again. Requests which change the
+    sources are run one at a time.
+
+    Only the users in allowed_uids (by default, only root) may change sources.
+    """
+
+    allowed_uids = [0]
+
+    def __init__(self):
+        self.index = SourcesIndex()
+        self.files = {}
+        self.lock = threading.Lock()
+        self.log = logging.getLogger('apt-manage')
+
+    def refresh(self):
+        """ Bring the registry up to date with the sources dir. """
+        current = {}
+        for entry in self.index.entries():
+            cached = self.files.get(entry.filename)
+            if cached and cached[0] == entry.mtime:
+                current[entry.filename] = cached
+                continue
+            try:
+                records = []
+                for number, stanza in enumerate(self.index.stanzas(entry)):
+                    record = stanza.make_dict()
+                    record['repository'] = entry.name
+                    record['filename'] = entry.filename
+                    record['stanza'] = number
+                    records.append(record)
+            except (DebLineSourceException, SourceError, ValueError) as err:
+                self.log.warning('Could not read %s: %s', entry.filename, err)
+                records = []
+            current[entry.filename] = (entry.mtime, entry.name, records)
+        self.files = current
+
+    def list(self, repository=ALL_SOURCES):
+        """ Get the records for the configured sources.
+
+        Repositories are found by name the same way as the list command
+        finds them, so a source's name selects only that source.
+
+        Arguments:
+            repository (str): The repository to list, or all of them.
+
+        Returns:
+            [dict]: The records for each source.
+        """
+        with self.lock:
+            if repository != ALL_SOURCES:
+                entry = self.index.get_entry(repository)
+                records = list(iter_records(self.log, self.index, [entry]))
+            else:
+                self.refresh()
+                records = []
+                for _, _, file_records in self.files.values():
+                    records += file_records
+        if repository != ALL_SOURCES and not records:
+            raise SourcesIndexError(
+                f'The repository {repository} could not be found.'
+            )
+        return records
+
+    def add(self, line, source_code=False, disable=False):
+        """ Add a new repository.
+
+        Arguments:
+            line (str): The deb line or ppa: shortcut for the repository.
+            source_code (bool): Whether to enable source code packages.
+            disable (bool): Whether to add the repository disabled.
+
+        Returns:
+            str: The filename of the new repository.
+        """
+        if line.startswith('http'):
+            line = f'deb {line}'
+        new_source = build_source(
+            line, source_code=source_code, disable=disable
+        )
+        with self.lock:
+            new_source.save_to_disk()
+            update_caches()
+        return new_source.filename
+
+    def modify(self, repository, changes):
+        """ Modify a repository.
+
+        Arguments:
+            repository (str): The name of the repository.
+            changes (dict): The changes to make, with the same names as the
+                options for apt-manage modify (e.g. {"add_suite": "focal"}).
+
+        Returns:
+            [str]: The files which were changed.
+        """
+        args = argparse.Namespace(
+            **{option: changes.get(option) for option in MODIFY_OPTIONS}
+        )
+        with self.lock:
+            committed = modify_repository(repository, args).commit()
+        return [filename for change, filename in committed if change != UNCHANGED]
+
+    def remove(self, repository):
+        """ Remove a repository.
+
+        Arguments:
+            repository (str): The name of the repository.
+
+        Returns:
+            [str]: The files which were changed or removed.
+        """
+        with self.lock:
+            committed = remove_repository(repository).commit()
+        return [filename for change, filename in committed if change != UNCHANGED]
+
+    def handle(self, request, uid=0):
+        """ Handle a single request.
+
+        Arguments:
+            request (dict): The request, with the name of the command in its
+                "command" key and the arguments in the other keys.
+            uid (int): The user ID of the client making the request.
+
+        Returns:
+            dict: The response, with "ok" set to True and the "result" of the
+            command, or "ok" set to False and an "error" message.
+        """
+        command = request.get('command')
+        try:
+            if command not in FORWARDED_COMMANDS:
+                raise DaemonError(f'Unknown command: {command}')
+            if command in WRITE_COMMANDS and uid not in self.allowed_uids:
+                raise DaemonError('You need to root, or use sudo.')
+            check_request(command, request)
+
+            if command == 'list':
+                result = self.list(request.get('repository', ALL_SOURCES))
+            elif command == 'add':
+                result = self.add(
+                    request['line'],
+                    source_code=request.get('source_code', False),
+                    disable=request.get('disable', False)
+                )
+            elif command == 'modify':
+                result = self.modify(
+                    request['repository'], request.get('changes', {})
+                )
+            else:
+                result = self.remove(request['repository'])
+        except KeyError as err:
+            return {'ok': False, 'error': f'Missing argument: {err}', 'code': 1}
+        except ERRORS + (DaemonError,) as err:
+            return {'ok': False, 'error': str(err), 'code': err.code}
+        except (AttributeError, IndexError, TypeError, ValueError) as err:
+            return {'ok': False, 'error': f'Invalid request: {err}', 'code': 1}
+        if command in WRITE_COMMANDS:
+            # The server runs indefinitely, so don't wait for it to exit.
+            metrics.flush()
+        return {'ok': True, 'result': result}
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """ Handle JSON-lines requests from a single client connection. """
+
+    def handle(self):
+        uid = get_peer_uid(self.connection)
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('Requests must be JSON objects')
+            except ValueError as err:
+                response = {'ok': False, 'error': str(err), 'code': 1}
+            else:
+                response = self.server.registry.handle(request, uid=uid)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ A server answering requests for a Registry over a UNIX socket.
+
+    Arguments:
+        path (str): The path of the socket to listen on.
+        registry (Registry): The registry to answer requests with.
+    """
+    daemon_threads = True
+
+    def __init__(self, path=util.SOCKET_PATH, registry=None):
+        self.path = path
+        self.registry = registry or Registry()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, RequestHandler)
+        # Anyone may list sources; changes are checked against the client's
+        # credentials in Registry.handle().
+        os.chmod(path, 0o666)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+class Client:
+    """ A client for a running apt-manage server.
+
+    Arguments:
+        path (str): The path of the server's socket.
+        timeout (float): How long to wait for the server to respond.
+    """
+
+    def __init__(self, path=util.SOCKET_PATH, timeout=30):
+        self.path = path
+        self.timeout = timeout
+
+    def is_running(self):
+        """ bool: Whether a server is listening on the socket. """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with self._connect():
+                return True
+        except OSError:
+            return False
+
+    def request(self, command, **arguments):
+        """ Send a request to the server.
+
+        Arguments:
+            command (str): The command to run.
+            arguments: The arguments for the command.
+
+        Returns:
+            The result of the command.
+
+        Raises:
+            DaemonError: If the command failed.
+        """
+        request = dict(arguments, command=command)
+        with self._connect() as client_socket:
+            client_socket.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with client_socket.makefile('rb') as response_file:
+                line = response_file.readline()
+
+        if not line:
+            raise DaemonError(f'The server on {self.path} did not respond.')
+        response = json.loads(line)
+
+        if not response['ok']:
+            raise DaemonError(response['error'], code=response.get('code', 1))
+        return response['result']
+
+    def _connect(self):
+        client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client_socket.settimeout(self.timeout)
+        try:
+            client_socket.connect(self.path)
+        except OSError:
+            client_socket.close()
+            raise
+        return client_socket
+
+def get_peer_uid(connection):
+    """ Get the user ID of the process on the other end of a UNIX socket.
+
+    Arguments:
+        connection (socket.socket): The connected socket.
+
+    Returns:
+        int: The user ID, or None if it can't be determined.
+    """
+    try:
+        creds = connection.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')
+        )
+    except (AttributeError, OSError):
+        return None
+    return struct.unpack('3i', creds)[1]
+
+def serve(log, args, parser):
+    """ Serve subcommand.
+
+    Runs apt-manage as a persistent server, answering list, add, modify and
+    remove requests from clients over a UNIX socket until interrupted.
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    server = Server(args.socket)
+    log.info('Listening on %s', args.socket)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+def forward(log, args, parser):
+    """ Forward a command to a running apt-manage server, if there is one.
+
+    Returns:
+        bool: True if the command was handled by the server, otherwise False
+        (and the command should be run locally).
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    if args.action not in FORWARDED_COMMANDS or args.debug:
+        return False
+    if getattr(args, 'dry_run', False):
+        return False
+    if args.action == 'add' and (args.expand or not args.deb_line):
+        return False
+    if args.action == 'modify' and any(
+            getattr(args, f'match_{selector}')
+            for selector in ('name', 'uri', 'suite', 'component', 'type')):
+        return False
+
+    client = Client(args.socket)
+    if not client.is_running():
+        return False
+    log.debug('Forwarding %s to the server on %s', args.action, args.socket)
+
+    try:
+        if args.action == 'list':
+            list_remote(client, args)
+        elif args.action == 'add':
+            client.request(
+                'add',
+                line=' '.join(args.deb_line),
+                source_code=args.source_code,
+                disable=args.disable
+            )
+        elif args.action == 'modify':
+            repository = args.repository
+            if isinstance(repository, list):
+                repository = ' '.join(repository)
+            client.request(
+                'modify',
+                repository=repository,
+                changes={option: getattr(args, option) for option in MODIFY_OPTIONS}
+            )
+        else:
+            client.request('remove', repository=args.repository)
+    except DaemonError as err:
+        log.error(err)
+        sys.exit(err.code)
+    return True
+
+def list_remote(client, args):
+    """ Print the sources listed by a server, like the list command does. """
+    repository = args.repository
+    if isinstance(repository, list):
+        repository = ' '.join(repository)
+    records = client.request('list', repository=repository)
+
+    if args.format != 'text':
+        print_records(records, args.format)
+    elif args.verbose or repository != ALL_SOURCES:
+        for record in records:
+            source = Source()
+            source.load_from_dict(record)
+            print(source.make_source_string())
+    else:
+        print('Current repositories:\n')
+        names = []
+        for record in records:
+            if record['repository'] not in names:
+                names.append(record['repository'])
+                print(record['repository'])
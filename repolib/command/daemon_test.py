@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from . import daemon
+from .. import util
+
+class DaemonTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'example.sources', mode='w') as source_file:
+            source_file.write(
+                'X-Repolib-Name: Example\n'
+                'Enabled: yes\n'
+                'Types: deb\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal\n'
+                'Components: main\n'
+            )
+
+        self.temp_dir = tempfile.mkdtemp()
+        socket_path = os.path.join(self.temp_dir, 'apt-manage.sock')
+        registry = daemon.Registry()
+        registry.allowed_uids = [os.getuid()]
+        self.server = daemon.Server(socket_path, registry)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.client = daemon.Client(socket_path, timeout=5)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.temp_dir)
+
+    def test_is_running(self):
+        self.assertTrue(self.client.is_running())
+        stopped = daemon.Client(os.path.join(self.temp_dir, 'missing.sock'))
+        self.assertFalse(stopped.is_running())
+
+    def test_list(self):
+        records = self.client.request('list')
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['repository'], 'example')
+        self.assertEqual(records[0]['suites'], ['focal'])
+
+        with self.assertRaises(daemon.DaemonError):
+            self.client.request('list', repository='missing')
+
+    def test_list_by_name(self):
+        with open(self.sources_dir / 'bar.sources', mode='w') as source_file:
+            source_file.write(
+                'X-Repolib-Name: Bar One\n'
+                'Types: deb\n'
+                'URIs: http://example.com/one\n'
+                'Suites: focal\n'
+                'Components: main\n'
+                '\n'
+                'X-Repolib-Name: Bar Two\n'
+                'Types: deb\n'
+                'URIs: http://example.com/two\n'
+                'Suites: focal\n'
+                'Components: main\n'
+            )
+        records = self.client.request('list', repository='Bar Two')
+        self.assertEqual(
+            [(record['name'], record['stanza']) for record in records],
+            [('Bar Two', 1)]
+        )
+        self.assertEqual(len(self.client.request('list', repository='bar')), 2)
+        self.assertEqual(len(self.client.request('list', repository='Example')), 1)
+
+    def test_list_refresh(self):
+        self.client.request('list')
+        with open(self.sources_dir / 'other.list', mode='w') as list_file:
+            list_file.write('deb http://example.com/other focal main\n')
+        records = self.client.request('list')
+        self.assertEqual(
+            [record['repository'] for record in records], ['example', 'other']
+        )
+
+    def test_add_modify_remove(self):
+        filename = self.client.request(
+            'add', line='deb http://example.com/new focal main'
+        )
+        self.assertEqual(filename, 'example-com-new.list')
+        self.assertTrue((self.sources_dir / filename).exists())
+
+        changed = self.client.request(
+            'modify', repository='example', changes={'add_suite': 'focal-updates'}
+        )
+        self.assertEqual(changed, ['example.sources'])
+        records = self.client.request('list', repository='example')
+        self.assertEqual(records[0]['suites'], ['focal', 'focal-updates'])
+
+        removed = self.client.request('remove', repository='example-com-new')
+        self.assertEqual(removed, [filename])
+        self.assertFalse((self.sources_dir / filename).exists())
+
+    def test_permissions(self):
+        self.server.registry.allowed_uids = []
+        with self.assertRaises(daemon.DaemonError):
+            self.client.request('remove', repository='example')
+        self.assertTrue((self.sources_dir / 'example.sources').exists())
+        self.assertEqual(len(self.client.request('list')), 1)
+
+    def test_malformed_requests(self):
+        for command, arguments in (
+                ('modify', {'repository': 'example', 'changes': {'add_option': 'foo'}}),
+                ('modify', {'repository': 'example', 'changes': {'add_suite': 5}}),
+                ('modify', {'repository': 'example', 'changes': {'frob': 'x'}}),
+                ('modify', {'repository': 'example', 'changes': ['add_suite']}),
+                ('list', {'repository': ['example']}),
+                ('add', {'line': 'ppa:'}),
+                ('add', {'line': 5}),
+                ('remove', {'repository': None})):
+            with self.subTest(command=command, arguments=arguments):
+                with self.assertRaises(daemon.DaemonError) as context:
+                    self.client.request(command, **arguments)
+                self.assertNotIn('did not respond', str(context.exception))
+        # The server is still answering.
+        self.assertEqual(len(self.client.request('list')), 1)
+
+    def test_unknown_command(self):
+        with self.assertRaises(daemon.DaemonError):
+            self.client.request('frobnicate')
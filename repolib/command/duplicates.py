@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Module for finding duplicated repos on the system in CLI applications.
+"""
+
+from ..duplicates import find_overlaps
+from .listall import print_records
+
+def duplicates(log, args, parser):
+    """ Duplicates subcommand.
+
+    The duplicates command finds enabled sources which configure the same
+    indexes (the same type, URI, suite, component and architecture) as
+    another source, in any file and format, and explains which to drop. It
+    doesn't change anything, so it doesn't require root.
+
+    Options:
+        --format text|json|ndjson
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    overlaps = find_overlaps()
+    if args.format != 'text':
+        print_records(
+            (overlap.make_dict() for overlap in overlaps), args.format
+        )
+        return
+
+    if not overlaps:
+        print('No duplicated sources found.')
+        return
+    for overlap in overlaps:
+        print(overlap.explain())
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Module for estimating the cost of apt update in CLI applications.
+"""
+
+from .. import lists
+from ..targets import estimate as estimate_targets
+from .listall import print_records
+from .modify import split_arg
+
+def estimate(log, args, parser):
+    """ Estimate subcommand.
+
+    The estimate command lists how many index files apt update fetches for
+    each enabled source, and recommends changes which would reduce them, along
+    with the space the files apt has already downloaded for each source take
+    up. It works entirely offline, and doesn't require root.
+
+    Options:
+        --architectures ARCH[,ARCH]
+        --languages LANG[,LANG]
+        --format text|json|ndjson
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    estimates, total = estimate_targets(
+        architectures=split_arg(args.architectures),
+        languages=split_arg(args.languages)
+    )
+    files = lists.scan()
+    records = []
+    for source_estimate in estimates:
+        record = source_estimate.make_dict()
+        record['size'] = lists.get_size(source_estimate.targets, files)
+        records.append(record)
+    if args.format != 'text':
+        print_records(records, args.format)
+        return
+
+    for record in records:
+        title = f'{record["filename"]} stanza {record["stanza"]}'
+        if record['name']:
+            title += f' ({record["name"]})'
+        print(
+            f'{title}: {record["files"]} file(s), '
+            f'{record["size"] / 1024 / 1024:.1f} MiB on disk'
+        )
+        print('    ' + ', '.join(
+            f'{target}: {count}' for target, count in record['targets'].items()
+        ))
+        for recommendation in record['recommendations']:
+            print(f'    - {recommendation}')
+    print(f'Total: {total} distinct file(s) for {len(estimates)} source(s).')
@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Module for fingerprinting the configured repos in CLI applications.
+"""
+
+import json
+import sys
+
+from ..fingerprint import (
+    Fingerprint,
+    FingerprintError,
+    compare,
+    compare_file,
+    describe,
+    fingerprint as make_fingerprint
+)
+
+def fingerprint(log, args, parser):
+    """ Fingerprint subcommand.
+
+    The fingerprint command prints a hash of the configured sources, which
+    doesn't depend on how they are formatted or ordered, so the hashes of
+    two hosts only differ if their sources do. With --compare, it compares
+    the sources with another host's fingerprint, saved with --format json,
+    and shows the stanzas which differ. It doesn't require root.
+
+    Options:
+        --verbose, -v
+        --format text|json
+        --compare FILE
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    try:
+        local = make_fingerprint()
+    except FingerprintError as err:
+        log.error('Could not make the fingerprint: %s', err)
+        sys.exit(err.code)
+
+    if args.compare:
+        try:
+            with open(args.compare, mode='r') as remote_file:
+                remote = Fingerprint.from_dict(json.load(remote_file))
+        except (OSError, ValueError) as err:
+            log.error('Could not read %s: %s', args.compare, err)
+            sys.exit(1)
+        except FingerprintError as err:
+            log.error('Could not read %s: %s', args.compare, err)
+            sys.exit(err.code)
+
+    if args.compare:
+        if not print_differences(log, local, remote):
+            sys.exit(1)
+        return
+
+    if args.format == 'json':
+        print(json.dumps(local.make_dict(), indent=2))
+        return
+
+    print(local.root)
+    if args.verbose:
+        for key in sorted(local.files):
+            file = local.files[key]
+            print(f'\n{file.hash}  {key}')
+            for form in sorted(file.stanzas.values()):
+                print(f'    {describe(form)}')
+
+def print_differences(log, local, remote):
+    """ Print the stanzas which differ between two fingerprints.
+
+    Arguments:
+        log (logging.Logger): The log to report the number of comparisons
+            to.
+        local (Fingerprint): The local fingerprint.
+        remote (Fingerprint): The other fingerprint.
+
+    Returns:
+        bool: True if the fingerprints are the same.
+    """
+    keys, requests = compare(local, remote)
+    log.debug('Compared the fingerprints in %d requests.', requests)
+    if not keys:
+        print('The sources are the same.')
+        return True
+    for key in keys:
+        ours, theirs = compare_file(local.get_file(key), remote.get_file(key))
+        print(key)
+        for form in ours:
+            print(f'  - {describe(form)}')
+        for form in theirs:
+            print(f'  + {describe(form)}')
+    return False
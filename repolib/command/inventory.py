@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Module for building an inventory of many hosts' repos in CLI applications.
+"""
+
+import sys
+
+from ..inventory import ingest
+
+def inventory(log, args, parser):
+    """ Inventory subcommand.
+
+    The inventory command reads tar archives of the /etc/apt directories of
+    many hosts, without extracting them, and prints an NDJSON record for each
+    source configured on each host. Archives are read in parallel, and
+    records are printed as each archive is finished, so memory use doesn't
+    grow with the number of hosts. It doesn't require root.
+
+    Options:
+        --jobs, -j N
+        --output, -o FILE
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    output = sys.stdout
+    if args.output:
+        try:
+            output = open(args.output, mode='w')
+        except OSError as err:
+            log.error('Could not open %s: %s', args.output, err)
+            sys.exit(1)
+
+    hosts = 0
+    failed = 0
+    try:
+        for _host, records, errors in ingest(args.archives, args.jobs):
+            hosts += 1
+            for record in records:
+                output.write(record)
+                output.write('\n')
+            for error in errors:
+                log.warning(error)
+            failed += bool(errors)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    log.info('Read %d hosts, %d with errors.', hosts, failed)
+    if failed:
+        sys.exit(1)
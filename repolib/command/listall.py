@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Module for listing repos on the system in CLI applications.
+"""
+
+import json
+import sys
+
+from ..deb import DebLineSourceException
+from ..index import SourcesIndex, SourcesIndexError
+from ..source import SourceError
+
+ALL_SOURCES = 'x-repolib-all-sources'
+
+def listall(log, args, parser):
+    """ List subcommand.
+
+    The list command lists the configured repositories. If a repository is
+    given, it shows details about that repository instead. Output is written
+    as each file is read, so listing many repositories uses constant memory.
+
+    Options:
+        --verbose, -v
+        --format text|json|ndjson
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    index = SourcesIndex()
+    name = args.repository
+    if isinstance(name, list):
+        name = ' '.join(name)
+
+    if name == ALL_SOURCES:
+        entries = index.entries()
+    else:
+        try:
+            entries = [index.get_entry(name)]
+        except SourcesIndexError as err:
+            log.error(err)
+            sys.exit(err.code)
+
+    if args.format == 'text':
+        list_text(log, index, entries, args.verbose or name != ALL_SOURCES)
+        return
+
+    print_records(iter_records(log, index, entries), args.format)
+
+def print_records(records, output_format='json'):
+    """ Print machine-readable records, one at a time as they are produced.
+
+    Arguments:
+        records (iterable of dict): The records to print.
+        output_format (str): Either 'json' (a single JSON list) or 'ndjson'
+            (one JSON object per line).
+    """
+    if output_format == 'ndjson':
+        for record in records:
+            print(json.dumps(record))
+        return
+
+    sys.stdout.write('[')
+    separator = '\n'
+    for record in records:
+        sys.stdout.write(separator)
+        sys.stdout.write(json.dumps(record))
+        separator = ',\n'
+    sys.stdout.write('\n]\n')
+
+def iter_records(log, index, entries):
+    """ Iterate over a machine-readable record for each configured source.
+
+    Arguments:
+        log (logging.Logger): The log to report unreadable files to.
+        index (SourcesIndex): The index to read from.
+        entries (iterable of IndexEntry): The files to read.
+
+    Yields:
+        dict: The data for each stanza (or line) in each file, or only for
+        the source an entry was found by, if it was found by name.
+    """
+    for entry in entries:
+        try:
+            for number, stanza in iter_stanzas(index, entry):
+                record = stanza.make_dict()
+                record['repository'] = entry.name
+                record['filename'] = entry.filename
+                record['stanza'] = number
+                yield record
+        except (
+                DebLineSourceException,
+                SourceError,
+                SourcesIndexError,
+                ValueError) as err:
+            log.warning('Could not read %s: %s', entry.filename, err)
+
+def iter_stanzas(index, entry):
+    """ Iterate over the sources an entry refers to.
+
+    Arguments:
+        index (SourcesIndex): The index to read from.
+        entry (IndexEntry): The entry to read.
+
+    Yields:
+        (int, Source): The position and source of every stanza in the file,
+        or only the source the entry was found by, if it was found by name.
+
+    Raises:
+        SourcesIndexError: If the source the entry was found by is no longer
+            in the file.
+    """
+    if entry.stanza is None:
+        yield from enumerate(index.stanzas(entry))
+        return
+    stanzas = list(index.stanzas(entry))
+    position = index.find_stanza(entry, stanzas)
+    yield position, stanzas[position]
+
+def list_text(log, index, entries, verbose=False):
+    """ Print a human-readable listing of the configured sources.
+
+    Arguments:
+        log (logging.Logger): The log to report unreadable files to.
+        index (SourcesIndex): The index to read from.
+        entries (iterable of IndexEntry): The files to list.
+        verbose (bool): Whether to print the details of each source.
+    """
+    if not verbose:
+        print('Current repositories:\n')
+        for entry in entries:
+            print(entry.name)
+        return
+
+    for entry in entries:
+        try:
+            if entry.legacy:
+                print(index.load(entry).make_deblines())
+                continue
+            for _, stanza in iter_stanzas(index, entry):
+                print(stanza.make_source_string())
+        except (
+                DebLineSourceException,
+                SourceError,
+                SourcesIndexError,
+                ValueError) as err:
+            log.warning('Could not read %s: %s', entry.filename, err)
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Module for switching repos to the fastest mirror in CLI applications.
+"""
+
+import os
+import sys
+
+from .. import mirrors
+from .. import util
+from ..source import SourceError
+from ..transaction import TransactionError
+from .apply import commit_changes, print_summary
+from .probe import format_result
+
+def mirror(log, args, parser):
+    """ Mirror subcommand.
+
+    The mirror command measures several mirrors of the same archive
+    concurrently, picks the fastest one which is up to date, and changes every
+    source using any of the other mirrors to use it instead. All of the
+    changed files are committed together. It requires root, unless --dry-run
+    is given.
+
+    Options:
+        --suite
+        --jobs, -j
+        --timeout, -t
+        --dry-run, -n
+    """
+
+    if not args.dry_run and os.geteuid() != 0:
+        parser.print_usage()
+        log.error('You need to root, or use sudo.')
+        sys.exit(1)
+
+    suite = args.suite or util.DISTRO_CODENAME
+    try:
+        winner, results = mirrors.select_fastest(
+            args.candidates, suite, workers=args.jobs, timeout=args.timeout
+        )
+    except mirrors.MirrorError as err:
+        log.error(err)
+        sys.exit(err.code)
+    for result in results:
+        print(format_result(result))
+    print(f'Fastest mirror: {winner}')
+
+    rules = {
+        candidate: winner
+        for candidate in args.candidates
+        if util.normalize_uri(candidate) != winner
+    }
+    try:
+        changes = mirrors.rewrite_sources(rules)
+        summary = commit_changes(changes, dry_run=args.dry_run)
+    except (SourceError, TransactionError) as err:
+        log.error('Could not switch to %s: %s', winner, err)
+        sys.exit(err.code)
+    print_summary(summary, dry_run=args.dry_run)
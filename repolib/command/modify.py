@@ -0,0 +1,356 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Module for modifying repos on the system in CLI applications.
+"""
+
+import os
+import sys
+
+from .. import lists
+from .. import util
+from ..index import SourcesIndex, SourcesIndexError
+from ..manifest import render
+from ..source import Source, SourceError
+from ..system import SystemSource, SystemSourceException
+from ..transaction import Transaction, TransactionError
+from .apply import commit_changes, print_summary
+
+def modify(log, args, parser):
+    """ Modify subcommand.
+
+    The modify command makes changes to a configured repository. It requires
+    root, unless --dry-run is given. All of the requested changes are applied
+    in memory and then saved to disk once.
+
+    Options:
+        --enable, -e
+        --disable, -d
+        --add-suite
+        --remove-suite
+        --add-component
+        --remove-component
+        --add-uri
+        --remove-uri
+        --add-option
+        --remove-option
+        --match-name, --match-uri, --match-suite, --match-component,
+        --match-type
+        --dry-run, -n
+    """
+
+    if not args.dry_run and os.geteuid() != 0:
+        parser.print_usage()
+        log.error('You need to root, or use sudo.')
+        sys.exit(1)
+
+    name = args.repository
+    if isinstance(name, list):
+        name = ' '.join(name)
+
+    selectors = {
+        'name': args.match_name,
+        'uri': args.match_uri,
+        'suite': args.match_suite,
+        'component': args.match_component,
+        'file_type': args.match_type,
+    }
+    if any(selectors.values()):
+        if isinstance(args.repository, list) and not selectors['name']:
+            selectors['name'] = name
+        problems = []
+        skipped = []
+        try:
+            changes = modify_selected(
+                args, problems, errors=skipped, **selectors
+            )
+            for error in skipped:
+                log.warning('%s Skipping it.', error)
+            log_problems(log, problems)
+            summary = commit_changes(changes, dry_run=args.dry_run)
+        except (
+                SourcesIndexError,
+                SourceError,
+                SystemSourceException,
+                TransactionError,
+                ValueError) as err:
+            log.error('Could not modify the selected repositories: %s', err)
+            sys.exit(getattr(err, 'code', 1))
+        print_summary(summary, dry_run=args.dry_run)
+        return
+
+    problems = []
+    try:
+        changes = modify_repository(name, args, problems)
+        log_problems(log, problems)
+        summary = commit_changes(changes, dry_run=args.dry_run)
+    except (
+            SourcesIndexError,
+            SourceError,
+            SystemSourceException,
+            TransactionError) as err:
+        log.error('Could not modify %s: %s', name, err)
+        sys.exit(err.code)
+    if args.dry_run:
+        print_summary(summary, dry_run=True)
+
+def modify_selected(args, problems=None, **selectors):
+    """ Apply the requested changes to every source matching the selectors.
+
+    The sources dir is read in a single pass, and the new contents of each
+    changed file are recorded in a transaction, so they can be committed
+    together.
+
+    Arguments:
+        args (argparse.Namespace): The parsed modify arguments.
+        problems (list): If given, any suites or components added which
+            aren't in apt's lists are described in it.
+        selectors: The selectors to pass to SourcesIndex.select(), and
+            optionally a list of errors to skip unreadable files with.
+
+    Returns:
+        Transaction: The changes to make.
+
+    Raises:
+        SourcesIndexError: If a file can't be read, and no errors list was
+            given.
+        SourceError: If the changes can't be saved in a file's format.
+        SystemSourceException: If the changes would disable the system
+            repository.
+    """
+    changes = Transaction()
+    for entry, stanzas, matched in SourcesIndex().select(**selectors):
+        if args.disable and entry.system:
+            raise SystemSourceException(
+                'The system repository cannot be disabled.'
+            )
+        for stanza in matched:
+            if entry.legacy:
+                apply_line_changes(stanza, args)
+            else:
+                apply_changes(stanza, args)
+        check_lists(matched, args, problems)
+        changes.write(entry.filename, render(entry.filename, stanzas))
+    return changes
+
+def modify_repository(name, args, problems=None):
+    """ Apply the requested changes to a repository in memory.
+
+    Arguments:
+        name (str): The name of the repository to modify.
+        args (argparse.Namespace): The parsed modify arguments.
+        problems (list): If given, any suites or components added which
+            aren't in apt's lists are described in it.
+
+    Returns:
+        Transaction: The changes to make.
+
+    Raises:
+        SourcesIndexError: If the repository can't be found.
+        SourceError: If the changes can't be saved in the repository's format.
+        SystemSourceException: If the changes would leave the system
+            repository unusable.
+    """
+    if name == 'system':
+        return modify_system(args, problems)
+
+    index = SourcesIndex(dry_run=getattr(args, 'dry_run', False))
+    entry = index.get_entry(name)
+    # The system repository may also be found by its file or source name.
+    if entry.system:
+        return modify_system(args, problems)
+    stanzas = list(index.stanzas(entry))
+    if entry.legacy:
+        for line in stanzas:
+            apply_line_changes(line, args)
+        changed = stanzas
+    else:
+        if not stanzas:
+            raise SourcesIndexError(f'The repository {name} has no sources.')
+        # Only the repository's own stanza changes (the first one, or the
+        # one found by name); the rest of the file is saved as it was.
+        changed = [stanzas[index.find_stanza(entry, stanzas) or 0]]
+        apply_changes(changed[0], args)
+    check_lists(changed, args, problems)
+
+    changes = Transaction()
+    changes.write(entry.filename, render(entry.filename, stanzas))
+    return changes
+
+def modify_system(args, problems=None):
+    """ Apply the requested changes to the system source in memory.
+
+    Arguments:
+        args (argparse.Namespace): The parsed modify arguments.
+        problems (list): If given, any suites or components added which
+            aren't in apt's lists are described in it.
+
+    Returns:
+        Transaction: The changes to make.
+
+    Raises:
+        SystemSourceException: If the changes would leave the system
+            repository unusable.
+    """
+    if args.disable:
+        raise SystemSourceException('The system repository cannot be disabled.')
+
+    system_source = SystemSource()
+    with system_source.batch(save=False):
+        system_source.apply(
+            add_suites=split_arg(args.add_suite),
+            remove_suites=split_arg(args.remove_suite),
+            add_components=split_arg(args.add_component),
+            remove_components=split_arg(args.remove_component)
+        )
+        apply_changes(system_source, args, suites=False, components=False)
+    check_lists([system_source], args, problems)
+
+    changes = Transaction()
+    changes.write(system_source.filename, system_source.dump())
+    return changes
+
+def check_lists(stanzas, args, problems):
+    """ Check changed sources' suites and components against apt's lists.
+
+    This only reads the release files apt has already downloaded, so it
+    works offline. Nothing is checked unless suites, components or URIs are
+    being added.
+
+    Arguments:
+        stanzas ([Source]): The changed sources.
+        args (argparse.Namespace): The parsed modify arguments.
+        problems (list): The list to add descriptions of any problems to, or
+            None to skip the check.
+    """
+    if problems is None:
+        return
+    if not (args.add_suite or args.add_component or args.add_uri):
+        return
+    files = lists.scan()
+    for stanza in stanzas:
+        problems.extend(lists.validate(stanza, files))
+
+def log_problems(log, problems):
+    """ Warn about each problem found by check_lists().
+
+    Arguments:
+        log (logging.Logger): The log to warn in.
+        problems ([str]): The problems found.
+    """
+    for problem in problems:
+        log.warning('%s Check the spelling.', problem)
+
+def apply_changes(source, args, suites=True, components=True):
+    """ Apply the changes requested in args to a source in memory.
+
+    Arguments:
+        source (Source): The source to change.
+        args (argparse.Namespace): The parsed modify arguments.
+        suites (bool): Whether to apply suite changes.
+        components (bool): Whether to apply component changes.
+
+    Raises:
+        SourceError: If an option to add isn't given as OPTION=VALUE.
+    """
+    if suites:
+        source.suites = edit_list(
+            source.suites, args.add_suite, args.remove_suite
+        )
+    if components:
+        source.components = edit_list(
+            source.components, args.add_component, args.remove_component
+        )
+    source.uris = edit_list(source.uris, args.add_uri, args.remove_uri)
+
+    for option in split_arg(args.add_option):
+        key, equals, value = option.partition('=')
+        if not key or not equals:
+            raise SourceError(
+                f'The option {option} must be given as OPTION=VALUE.'
+            )
+        source[Source.options_d.get(key, key)] = value
+
+    for option in split_arg(args.remove_option):
+        key = option.split('=', 1)[0]
+        key = Source.options_d.get(key, key)
+        if key in source:
+            del source[key]
+
+    if args.enable:
+        source.enabled = True
+    if args.disable:
+        source.enabled = False
+
+def apply_line_changes(line, args):
+    """ Apply the changes requested in args to a line in a legacy source.
+
+    This is the same as apply_changes(), except that enabling the repository
+    doesn't enable source code lines which were disabled.
+
+    Arguments:
+        line (DebLine): The line to change.
+        args (argparse.Namespace): The parsed modify arguments.
+    """
+    source_code = util.AptSourceType.SOURCE in line.types
+    was_enabled = line.enabled.get_bool()
+    apply_changes(line, args)
+    if args.enable and source_code and not was_enabled:
+        line.enabled = False
+
+def edit_list(current, add=None, remove=None):
+    """ Add and remove comma-separated items from a list, keeping order.
+
+    Arguments:
+        current ([str]): The current list of items.
+        add (str): Comma-separated items to add.
+        remove (str): Comma-separated items to remove.
+
+    Returns:
+        [str]: The new list of items.
+    """
+    items = list(current or [])
+    for item in split_arg(add):
+        if item not in items:
+            items.append(item)
+    for item in split_arg(remove):
+        if item in items:
+            items.remove(item)
+    return items
+
+def split_arg(arg):
+    """ Split a comma-separated argument into a list.
+
+    Arguments:
+        arg (str): The argument value, or None if not provided.
+
+    Returns:
+        [str]: The items in the argument.
+    """
+    if not arg:
+        return []
+    return [item.strip() for item in arg.split(',') if item.strip()]
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import shutil
+import unittest
+
+from . import argparser
+from .modify import modify_repository, modify_selected
+from .remove import remove_repository
+from .. import util
+from ..index import SourcesIndexError
+from ..source import SourceError
+from ..system import SystemSourceException
+
+BAR_SOURCES = """X-Repolib-Name: Bar One
+Types: deb
+URIs: http://example.com/bar
+Suites: focal
+Components: main
+
+X-Repolib-Name: Bar Two
+Types: deb
+URIs: http://example.com/bar-two
+Suites: focal
+Components: main
+"""
+
+SYSTEM_SOURCES = """X-Repolib-Name: Pop_OS System Sources
+Types: deb
+URIs: http://apt.pop-os.org/ubuntu
+Suites: focal
+Components: main
+"""
+
+def parse(*argv):
+    return argparser.get_argparser().parse_args(['modify', *argv])
+
+class ModifyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'bar.sources', mode='w') as source_file:
+            source_file.write(BAR_SOURCES)
+        with open(self.sources_dir / 'system.sources', mode='w') as source_file:
+            source_file.write(SYSTEM_SOURCES)
+
+    def test_multiple_stanzas(self):
+        """ Other stanzas in the file are kept unchanged. """
+        args = parse('bar', '--add-component', 'contrib', '--dry-run')
+        contents = modify_repository('bar', args).writes['bar.sources']
+        self.assertEqual(
+            contents,
+            BAR_SOURCES.replace('main\n\n', 'main contrib\n\n', 1)
+        )
+
+    def test_modify_by_name(self):
+        """ A source found by name is changed, not the first in its file. """
+        args = parse('Bar Two', '--add-component', 'contrib', '--dry-run')
+        contents = modify_repository('Bar Two', args).writes['bar.sources']
+        self.assertEqual(
+            contents,
+            BAR_SOURCES.replace('main\n', 'main contrib\n').replace(
+                'main contrib\n\n', 'main\n\n'
+            )
+        )
+
+    def test_remove_by_name(self):
+        """ Only the source found by name is removed from its file. """
+        changes = remove_repository('Bar Two')
+        self.assertEqual(changes.removals, [])
+        self.assertEqual(
+            changes.writes['bar.sources'],
+            BAR_SOURCES.split('\n\n', maxsplit=1)[0] + '\n'
+        )
+        self.assertEqual(remove_repository('bar').removals, ['bar.sources'])
+
+    def test_system_by_name(self):
+        """ The system repository is protected under any of its names. """
+        for name in ('system', 'Pop_OS System Sources'):
+            with self.assertRaises(SourcesIndexError):
+                remove_repository(name)
+            with self.assertRaises(SystemSourceException):
+                modify_repository(name, parse(name, '--disable', '--dry-run'))
+
+    def test_select_unreadable(self):
+        """ A file which can't be read is skipped, or reported. """
+        with open(self.sources_dir / 'broken.list', mode='w') as list_file:
+            list_file.write('deb\n')
+        args = parse('--match-suite', 'focal', '--add-component', 'contrib', '-n')
+        errors = []
+        changes = modify_selected(args, errors=errors, suite='focal')
+        self.assertEqual(sorted(changes.writes), ['bar.sources', 'system.sources'])
+        self.assertEqual(len(errors), 1)
+        self.assertIn('broken.list', errors[0])
+        with self.assertRaises(SourcesIndexError):
+            modify_selected(args, suite='focal')
+
+    def test_invalid_option(self):
+        args = parse('bar', '--add-option', 'foo', '--dry-run')
+        with self.assertRaisesRegex(SourceError, 'OPTION=VALUE'):
+            modify_repository('bar', args)
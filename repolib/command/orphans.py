@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Module for removing orphaned lists and keyrings in CLI applications.
+"""
+
+import os
+import sys
+
+from ..orphans import OrphansError, find_orphans
+
+def orphans(log, args, parser):
+    """ GC subcommand.
+
+    The gc command lists the downloaded package lists and keyrings which no
+    configured source uses, such as those left behind by removed
+    repositories. With --delete, it deletes them, which requires root.
+
+    Options:
+        --delete
+    """
+
+    if args.delete and os.geteuid() != 0:
+        parser.print_usage()
+        log.error('You need to root, or use sudo.')
+        sys.exit(1)
+
+    try:
+        found = find_orphans()
+    except OrphansError as err:
+        log.error('%s Fix or remove it first.', err)
+        sys.exit(err.code)
+    if not found.paths:
+        print('No orphaned lists or keyrings found.')
+        return
+
+    if not args.delete:
+        for path in found.paths:
+            print(path)
+        print(
+            f'{len(found.paths)} orphaned file(s), '
+            f'{found.size / 1024 / 1024:.1f} MiB. Use --delete to remove them.'
+        )
+        return
+
+    try:
+        removed = found.remove()
+    except OSError as err:
+        log.error('Could not remove the orphaned files: %s', err)
+        sys.exit(1)
+    for path in removed:
+        print(f'Removed {path}')
+    print(
+        f'Removed {len(removed)} orphaned file(s), '
+        f'{found.size / 1024 / 1024:.1f} MiB.'
+    )
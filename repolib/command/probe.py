@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Module for probing repo mirrors in CLI applications.
+"""
+
+from .. import probe as probe_lib
+from .listall import print_records
+
+def probe(log, args, parser):
+    """ Probe subcommand.
+
+    The probe command requests the release file of every URI and suite in the
+    enabled sources concurrently, and reports how long each mirror took to
+    respond, the response, and how long ago the release file was updated.
+
+    Options:
+        --jobs, -j
+        --timeout, -t
+        --format text|json|ndjson
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    results = probe_lib.probe(
+        probe_lib.get_endpoints(), workers=args.jobs, timeout=args.timeout
+    )
+    if args.format != 'text':
+        print_records((result.make_dict() for result in results), args.format)
+        return
+
+    if not results:
+        print('No HTTP or HTTPS repositories are configured.')
+        return
+    for result in results:
+        print(format_result(result))
+    failed = sum(1 for result in results if not result.ok)
+    print(f'{len(results)} endpoint(s) probed, {failed} failed.')
+
+def format_result(result):
+    """ Format a probe result as a line of text.
+
+    Arguments:
+        result (probe.ProbeResult): The result.
+
+    Returns:
+        str: The line.
+    """
+    latency = '-'
+    if result.latency is not None:
+        latency = f'{result.latency * 1000:.0f} ms'
+    if result.ok:
+        state = 'updated ?'
+        age = result.get_age()
+        if age is not None:
+            state = f'updated {age / 86400:.1f} days ago'
+        if result.is_expired():
+            state += ' (expired)'
+    else:
+        state = result.error or f'HTTP {result.status}'
+    status = 'OK' if result.ok else 'FAIL'
+    return f'{status:4} {latency:>8}  {state:28}  {result.url}'
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Module for querying an inventory of many hosts' repos in CLI applications.
+"""
+
+import fnmatch
+import sys
+from collections import Counter
+
+from ..table import SourceTable, SourceTableError
+from .listall import print_records
+from .modify import split_arg
+
+def query(log, args, parser):
+    """ Query subcommand.
+
+    The query command loads an inventory made by the inventory command into
+    a columnar table, and finds the sources matching the given selectors.
+    It can list them, count them grouped by some columns, or list the
+    distinct values of a column, such as the hosts using a suite. It doesn't
+    require root.
+
+    Options:
+        --match-host, --match-name, --match-type, --match-uri,
+        --match-suite, --match-component
+        --enabled, --disabled
+        --count COLUMNS
+        --unique COLUMN
+        --dedupe COLUMNS
+        --format text|json|ndjson
+    """
+    # pylint: disable=unused-argument
+    # All commands take the same arguments.
+
+    try:
+        if args.inventory == '-':
+            table = SourceTable.from_ndjson(sys.stdin)
+        else:
+            with open(args.inventory, mode='r') as inventory_file:
+                table = SourceTable.from_ndjson(inventory_file)
+        table = table.filter(args.enabled, **get_selectors(args))
+        if args.dedupe:
+            table = table.dedupe(*split_arg(args.dedupe))
+        if args.count:
+            columns = split_arg(args.count)
+            counts = table.count(*columns)
+            if len(columns) == 1:
+                counts = Counter(
+                    {(value,): count for value, count in counts.items()}
+                )
+            records = (
+                dict(zip(columns, values), count=count)
+                for values, count in counts.most_common()
+            )
+        elif args.unique:
+            records = (
+                {args.unique: value} for value in table.unique(args.unique)
+            )
+        else:
+            records = table.rows()
+        records = list(records)
+    except OSError as err:
+        log.error('Could not read %s: %s', args.inventory, err)
+        sys.exit(1)
+    except SourceTableError as err:
+        log.error('Could not query %s: %s', args.inventory, err)
+        sys.exit(err.code)
+
+    if args.format != 'text':
+        print_records(records, args.format)
+        return
+    for record in records:
+        print('\t'.join(str(value) for value in record.values()))
+
+def get_selectors(args):
+    """ Make table selectors from the query arguments.
+
+    The host and name are matched as shell-style globs, and the URI as a
+    prefix, like the --match options of modify. The other columns accept a
+    comma-separated list of values to match any of.
+
+    Arguments:
+        args (argparse.Namespace): The parsed query arguments.
+
+    Returns:
+        dict: The selectors to pass to SourceTable.filter().
+    """
+    selectors = {}
+    for column in ('host', 'name'):
+        pattern = getattr(args, f'match_{column}')
+        if pattern:
+            selectors[column] = make_glob(pattern)
+    if args.match_uri:
+        prefix = args.match_uri
+        selectors['uri'] = lambda uri: uri.startswith(prefix)
+    for column in ('type', 'suite', 'component'):
+        values = split_arg(getattr(args, f'match_{column}'))
+        if values:
+            selectors[column] = values
+    return selectors
+
+def make_glob(pattern):
+    """ Make a function matching a shell-style glob.
+
+    Arguments:
+        pattern (str): The glob.
+
+    Returns:
+        function: A function taking a value and returning whether it matches.
+    """
+    return lambda value: fnmatch.fnmatchcase(value, pattern)
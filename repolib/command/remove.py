@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Module for removing repos from the system in CLI applications.
+"""
+
+import os
+import sys
+
+from ..index import SourcesIndex, SourcesIndexError
+from ..manifest import render
+from ..source import SourceError
+from ..transaction import Transaction, TransactionError
+from .apply import commit_changes, print_summary
+
+def remove(log, args, parser):
+    """ Remove subcommand.
+
+    The remove command removes a configured repository. The system repository
+    cannot be removed. It requires root, unless --dry-run is given.
+
+    Options:
+        --dry-run, -n
+    """
+
+    if not args.dry_run and os.geteuid() != 0:
+        parser.print_usage()
+        log.error('You need to root, or use sudo.')
+        sys.exit(1)
+
+    try:
+        changes = remove_repository(args.repository, dry_run=args.dry_run)
+        summary = commit_changes(changes, dry_run=args.dry_run)
+    except (SourceError, SourcesIndexError, TransactionError) as err:
+        log.error('Could not remove %s: %s', args.repository, err)
+        sys.exit(err.code)
+    if args.dry_run:
+        print_summary(summary, dry_run=True)
+
+def remove_repository(name, dry_run=False):
+    """ Plan the removal of a repository.
+
+    If the repository is found by the name of a source in a DEB822 file
+    which holds other sources too, only that source is removed from the
+    file. Otherwise, the whole file is removed.
+
+    Arguments:
+        name (str): The name of the repository to remove.
+        dry_run (bool): Whether the changes are only being shown, so nothing
+            else should be written either.
+
+    Returns:
+        Transaction: The changes to make.
+
+    Raises:
+        SourcesIndexError: If the repository can't be found, or is the system
+            repository.
+    """
+    if name == 'system':
+        raise SourcesIndexError('The system repository cannot be removed.')
+
+    index = SourcesIndex(dry_run=dry_run)
+    entry = index.get_entry(name)
+    if entry.system:
+        raise SourcesIndexError('The system repository cannot be removed.')
+
+    changes = Transaction()
+    if entry.stanza is None:
+        changes.remove(entry.filename)
+        return changes
+
+    stanzas = list(index.stanzas(entry))
+    del stanzas[index.find_stanza(entry, stanzas)]
+    if stanzas:
+        changes.write(entry.filename, render(entry.filename, stanzas))
+    else:
+        changes.remove(entry.filename)
+    return changes
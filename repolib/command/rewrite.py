@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Module for rewriting repo URIs with prefix rules in CLI applications.
+"""
+
+import os
+import sys
+
+from ..mirrors import rewrite_sources
+from ..source import SourceError
+from ..transaction import TransactionError
+from ..uritrie import RulesError, load_rules
+from .apply import commit_changes, print_summary
+
+def rewrite(log, args, parser):
+    """ Rewrite subcommand.
+
+    The rewrite command changes the URIs of every source using a file of
+    prefix rules, such as to route repositories through a caching proxy. Each
+    URI is rewritten by the rule with the longest matching prefix. All of the
+    changed files are committed together. It requires root, unless --dry-run
+    is given.
+
+    Options:
+        --dry-run, -n
+    """
+
+    if not args.dry_run and os.geteuid() != 0:
+        parser.print_usage()
+        log.error('You need to root, or use sudo.')
+        sys.exit(1)
+
+    try:
+        with open(args.rules, mode='r') as rules_file:
+            rules = load_rules(rules_file)
+    except OSError as err:
+        log.error('Could not read the rules %s: %s', args.rules, err)
+        sys.exit(1)
+    except RulesError as err:
+        log.error('Could not read the rules %s: %s', args.rules, err)
+        sys.exit(err.code)
+
+    try:
+        changes = rewrite_sources(rules)
+        summary = commit_changes(changes, dry_run=args.dry_run)
+    except (SourceError, TransactionError) as err:
+        log.error('Could not rewrite the sources: %s', err)
+        sys.exit(err.code)
+    print_summary(summary, dry_run=args.dry_run)
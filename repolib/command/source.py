@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Module for enabling or disabling source code in CLI applications.
+"""
+
+import os
+import sys
+
+from .. import util
+from ..deb import DebLineSourceException
+from ..index import SourcesIndex, SourcesIndexError
+from ..manifest import render
+from ..source import SourceError
+from ..transaction import Transaction, TransactionError
+from .apply import commit_changes, print_summary
+from .listall import ALL_SOURCES
+
+def source(log, args, parser):
+    """ Source subcommand.
+
+    The source command enables or disables source code packages for a
+    repository, or for every repository if none is given. The new Types for
+    every source are worked out in memory; files which don't change are
+    skipped, and the rest are committed together. It requires root, unless
+    --dry-run is given.
+
+    Options:
+        --enable, -e
+        --disable, -d
+        --dry-run, -n
+    """
+
+    if not args.dry_run and os.geteuid() != 0:
+        parser.print_usage()
+        log.error('You need to root, or use sudo.')
+        sys.exit(1)
+
+    index = SourcesIndex(dry_run=args.dry_run)
+    name = args.repository
+    if isinstance(name, list):
+        name = ' '.join(name)
+
+    try:
+        if name == ALL_SOURCES:
+            entries = index.entries()
+        else:
+            entries = [index.get_entry(name)]
+
+        changes = Transaction()
+        for entry in entries:
+            stanzas = list(index.stanzas(entry))
+            position = index.find_stanza(entry, stanzas)
+            # Only the source the repository was found by, if it was found
+            # by the name of a source.
+            selected = stanzas if position is None else [stanzas[position]]
+            if set_source_code(selected, args.source_enable, legacy=entry.legacy):
+                changes.write(entry.filename, render(entry.filename, stanzas))
+        summary = commit_changes(changes, dry_run=args.dry_run)
+    except (
+            DebLineSourceException,
+            SourceError,
+            SourcesIndexError,
+            TransactionError) as err:
+        log.error('Could not change source code for %s: %s', name, err)
+        sys.exit(err.code)
+
+    print_summary(summary, dry_run=args.dry_run)
+
+def set_source_code(stanzas, enabled, legacy=False):
+    """ Enable or disable source code for the sources in a file.
+
+    If the file has separate source code entries (e.g. a deb-src line next to
+    a deb line), those are enabled or disabled; they are only enabled if one
+    of the binary entries in the file is enabled. Otherwise, source code is
+    added to or removed from the Types of each binary source. Legacy files
+    without a deb-src line get one added after each deb line when enabling.
+
+    Arguments:
+        stanzas ([Source]): The sources in the file. The list is changed in
+            place.
+        enabled (bool): Whether to enable source code.
+        legacy (bool): Whether the file is in the legacy one-line format.
+
+    Returns:
+        bool: True if any of the sources were changed, otherwise False.
+    """
+    binary = util.AptSourceType.BINARY
+    code = util.AptSourceType.SOURCE
+    original = [stanza.dump() for stanza in stanzas]
+    separate = any(stanza.types == [code] for stanza in stanzas)
+    binaries = [stanza for stanza in stanzas if binary in (stanza.types or [])]
+    # Separate source code entries are only enabled alongside an enabled
+    # binary entry, so disabled repositories stay disabled.
+    enable_separate = enabled and (
+        not binaries
+        or any(stanza.enabled.get_bool() for stanza in binaries if stanza.enabled)
+    )
+
+    if legacy and enabled and not separate:
+        for position in range(len(stanzas) - 1, -1, -1):
+            if stanzas[position].types == [binary]:
+                src_line = stanzas[position].copy()
+                src_line.enabled = stanzas[position].enabled.get_bool()
+                stanzas.insert(position + 1, src_line)
+        separate = True
+
+    for stanza in stanzas:
+        types = stanza.types or []
+        if types == [code]:
+            if separate:
+                stanza.enabled = enable_separate
+        elif binary in types and not separate:
+            stanza.set_source_enabled(enabled)
+        elif binary in types and code in types and not enabled:
+            stanza.set_source_enabled(False)
+
+    return [stanza.dump() for stanza in stanzas] != original
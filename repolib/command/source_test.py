@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import unittest
+
+from .source import set_source_code
+from .. import deb
+from .. import util
+from ..source import Source
+
+class SourceCodeTestCase(unittest.TestCase):
+
+    def test_set_source_code_types(self):
+        stanza = Source()
+        stanza.init_values()
+        stanza.uris = ['http://example.com/ubuntu']
+        stanza.suites = ['focal']
+        stanza.components = ['main']
+        self.assertTrue(set_source_code([stanza], True))
+        self.assertEqual(
+            stanza.types,
+            [util.AptSourceType.BINARY, util.AptSourceType.SOURCE]
+        )
+        self.assertFalse(set_source_code([stanza], True))
+        self.assertTrue(set_source_code([stanza], False))
+        self.assertEqual(stanza.types, [util.AptSourceType.BINARY])
+
+    def test_set_source_code_legacy(self):
+        lines = [deb.DebLine('deb http://example.com/ubuntu focal main')]
+        self.assertTrue(set_source_code(lines, True, legacy=True))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].types, [util.AptSourceType.SOURCE])
+        self.assertEqual(lines[1].enabled, util.AptSourceEnabled.TRUE)
+
+        self.assertTrue(set_source_code(lines, False, legacy=True))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].enabled, util.AptSourceEnabled.FALSE)
+
+    def test_set_source_code_disabled_repo(self):
+        lines = [
+            deb.DebLine('# deb http://example.com/ubuntu focal main'),
+            deb.DebLine('# deb-src http://example.com/ubuntu focal main'),
+        ]
+        self.assertFalse(set_source_code(lines, True, legacy=True))
+        self.assertEqual(lines[1].enabled, util.AptSourceEnabled.FALSE)
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+A cache of data for shell completion of apt-manage.
+"""
+
+import os
+
+from . import source
+from . import util
+
+CACHE_NAME = 'apt-manage-completion'
+
+def get_cache_path():
+    """ Get the path to the completion cache.
+
+    Returns:
+        pathlib.Path: The path to the cache file.
+    """
+    return util.get_cache_dir() / CACHE_NAME
+
+def scan():
+    """ Gather the data to complete from the sources dir.
+
+    This reads the files directly rather than parsing them into sources, as
+    only the names, suites and components are needed.
+
+    Returns:
+        dict: The repository 'names', 'suites', 'components' and known
+        'options', each as a sorted list of str.
+    """
+    names = []
+    suites = set()
+    components = set()
+
+    for path in sorted(util.get_sources_dir().iterdir()):
+        if path.suffix not in ('.sources', '.list') or not path.is_file():
+            continue
+        names.append(path.stem)
+        with open(path, mode='r') as source_file:
+            if path.suffix == '.sources':
+                for line in source_file:
+                    key, _, value = line.partition(':')
+                    key = key.strip().lower()
+                    if key == 'suites':
+                        suites.update(value.split())
+                    elif key == 'components':
+                        components.update(value.split())
+            else:
+                for line in source_file:
+                    if not util.validate_debline(line):
+                        continue
+                    words = line.replace('#', ' ', 1).split()[1:]
+                    if words and words[0].startswith('['):
+                        while words and not words[0].endswith(']'):
+                            words.pop(0)
+                        words = words[1:]
+                    suites.update(words[1:2])
+                    for word in words[2:]:
+                        if word.startswith('#'):
+                            break
+                        components.add(word)
+
+    options = list(source.Source.options_d) + list(source.Source.outoptions_d)
+    return {
+        'names': names,
+        'suites': sorted(suites),
+        'components': sorted(components),
+        'options': sorted(options),
+    }
+
+def update_cache():
+    """ Regenerate the completion cache from the sources dir.
+
+    The cache is a world-readable text file with one line for each kind of
+    data: the kind, followed by the space-separated values. This is simple to
+    read using only shell builtins, so completion never needs to start Python.
+    If the cache can't be written (e.g. when not running as root), it is left
+    as it was.
+
+    Returns:
+        bool: True if the cache was updated, otherwise False.
+    """
+    try:
+        data = scan()
+        cache_path = get_cache_path()
+        temp_path = cache_path.with_name(f'.{CACHE_NAME}~')
+        with open(temp_path, mode='w') as cache_file:
+            for kind, values in data.items():
+                cache_file.write(f'{kind} {" ".join(values)}\n')
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import shutil
+import unittest
+
+from . import completion
+from . import util
+
+class CompletionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'system.sources', mode='w') as source_file:
+            source_file.write(
+                'X-Repolib-Name: System\n'
+                'Types: deb\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal focal-updates\n'
+                'Components: main universe\n'
+            )
+        with open(self.sources_dir / 'legacy.list', mode='w') as list_file:
+            list_file.write(
+                'deb [ arch=amd64 ] http://example.com/legacy focal-legacy main\n'
+                '# deb-src http://example.com/legacy focal-legacy contrib # comment\n'
+            )
+
+    def test_scan(self):
+        data = completion.scan()
+        self.assertEqual(data['names'], ['legacy', 'system'])
+        self.assertEqual(
+            data['suites'], ['focal', 'focal-legacy', 'focal-updates']
+        )
+        self.assertEqual(data['components'], ['contrib', 'main', 'universe'])
+        self.assertIn('arch', data['options'])
+        self.assertIn('Architectures', data['options'])
+
+    def test_update_cache(self):
+        self.assertTrue(completion.update_cache())
+        with open(completion.get_cache_path()) as cache_file:
+            lines = cache_file.read().splitlines()
+        self.assertEqual(lines[0], 'names legacy system')
+        self.assertEqual(lines[2], 'components contrib main universe')
+        self.assertEqual(completion.get_cache_path().stat().st_mode & 0o777, 0o644)
@@ -93,9 +93,12 @@ class DebLine(source.Source):
             line = line.strip()
 
         # URI parsing
+        line_uri = None
         for uri in self.uri_re.finditer(line):
             self.uris = [uri[0]]
             line_uri = line.replace(uri[0], '')
+        if line_uri is None:
+            raise DebLineSourceException(f'The line {self.deb_line} has no URI.')
 
         # Options parsing
         try:
@@ -107,6 +110,10 @@ class DebLine(source.Source):
             pass
 
         deb_list = line_uri.split()
+        if len(deb_list) < 2:
+            raise DebLineSourceException(
+                f'The line {self.deb_line} has no suite.'
+            )
 
         # Type Parsing
         self.types = [util.AptSourceType.BINARY]
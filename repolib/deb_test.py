@@ -196,6 +196,11 @@ class DebTestCase(unittest.TestCase):
         # pylint: enable=no-member
         self.assertEqual(source.components, ['main'])
 
+    def test_incomplete_source(self):
+        for line in ('deb', '# deb', 'deb http://example.com/'):
+            with self.assertRaises(deb.DebLineSourceException):
+                deb.DebLine(line)
+
     @unittest.expectedFailure
     def test_cdrom_source(self):
         source = deb.DebLine(
@@ -0,0 +1,254 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Find sources which configure the same indexes more than once.
+"""
+
+from . import util
+from .deb import DebLineSourceException
+from .index import SourcesIndex, SourcesIndexError
+from .source import DEFAULT_ARCH, SourceError, SourceKey
+
+DUPLICATE = 'duplicate'
+REDUNDANT = 'redundant'
+PARTIAL = 'partial'
+
+class Location:
+    """ A single source within a file in the sources dir.
+
+    Arguments:
+        filename (str): The name of the file in the sources dir.
+        stanza (int): The position of the source within the file, counting
+            from 0 (the same as in list --format json).
+        name (str): The name of the source, if it has one.
+    """
+
+    def __init__(self, filename, stanza, name=None):
+        self.filename = filename
+        self.stanza = stanza
+        self.name = name
+
+    @property
+    def rank(self):
+        """ tuple: Sorts the location to keep first among duplicates.
+
+        DEB822 files are preferred over legacy files, and then earlier files
+        and stanzas over later ones.
+        """
+        return (self.filename.endswith('.list'), self.filename, self.stanza)
+
+    def __str__(self):
+        return f'{self.filename} stanza {self.stanza}'
+
+    def __repr__(self):
+        return f'Location({self.filename!r}, {self.stanza!r})'
+
+class Overlap:
+    """ Two sources which configure some of the same indexes.
+
+    Arguments:
+        kind (str): DUPLICATE if both sources configure exactly the same
+            indexes, REDUNDANT if every index of the source to drop is also
+            configured by the one to keep, or PARTIAL otherwise.
+        keep (Location): The source to keep.
+        drop (Location): The source to drop (for a PARTIAL overlap, to remove
+            the shared indexes from).
+        keys (frozenset of source.SourceKey): The shared indexes.
+    """
+
+    def __init__(self, kind, keep, drop, keys):
+        self.kind = kind
+        self.keep = keep
+        self.drop = drop
+        self.keys = keys
+
+    def explain(self):
+        """ Explain the overlap, and what to change to remove it.
+
+        Returns:
+            str: A human-readable explanation.
+        """
+        if self.kind == DUPLICATE:
+            return f'{self.drop} duplicates {self.keep}: drop {self.drop}.'
+        if self.kind == REDUNDANT:
+            return f'{self.drop} is covered by {self.keep}: drop {self.drop}.'
+        shared = ', '.join(str(key) for key in sorted(self.keys))
+        return (
+            f'{self.drop} overlaps {self.keep} for {len(self.keys)} '
+            f'index(es): remove {shared} from {self.drop}.'
+        )
+
+    def make_dict(self):
+        """ Makes a dict of the overlap, for machine-readable output.
+
+        Returns:
+            A dict with the data from the overlap.
+        """
+        return {
+            'kind': self.kind,
+            'keep': {'filename': self.keep.filename, 'stanza': self.keep.stanza},
+            'drop': {'filename': self.drop.filename, 'stanza': self.drop.stanza},
+            'keys': [key._asdict() for key in sorted(self.keys)],
+            'explanation': self.explain(),
+        }
+
+def find_overlaps(index=None):
+    """ Find every pair of enabled sources which configure the same indexes.
+
+    The sources dir is read in a single pass, and each source's keys are
+    joined on a hash of everything but the architecture, so only sources
+    which actually share an index are ever compared. Files which can't be
+    read are skipped.
+
+    Arguments:
+        index (SourcesIndex): The index to read from (default: the sources
+            dir).
+
+    Returns:
+        [Overlap]: The overlaps, duplicate and redundant sources first. A
+        source is only reported as dropped once, and sources already dropped
+        aren't reported as ones to keep.
+    """
+    index = index or SourcesIndex()
+    locations = []
+    archs = []
+    joined = {}
+    for entry in index.entries():
+        try:
+            for number, stanza in enumerate(index.stanzas(entry)):
+                if stanza.enabled == util.AptSourceEnabled.FALSE:
+                    continue
+                location_id = len(locations)
+                locations.append(Location(entry.filename, number, stanza.name))
+                stanza_archs = {}
+                for key in stanza.make_keys():
+                    stanza_archs.setdefault(key[:4], set()).add(key.arch)
+                for base in stanza_archs:
+                    joined.setdefault(base, []).append(location_id)
+                archs.append(stanza_archs)
+        except (
+                DebLineSourceException,
+                SourceError,
+                SourcesIndexError,
+                ValueError):
+            continue
+
+    shared = {}
+    for base, location_ids in joined.items():
+        for position, first in enumerate(location_ids):
+            for second in location_ids[position + 1:]:
+                common = shared_archs(archs[first][base], archs[second][base])
+                if common:
+                    shared.setdefault((first, second), {})[base] = common
+
+    overlaps = []
+    for (first, second), bases in shared.items():
+        first_covered = covers(archs[second], archs[first], bases)
+        second_covered = covers(archs[first], archs[second], bases)
+        if first_covered and second_covered:
+            kind = DUPLICATE
+            keep, drop = sorted((first, second), key=lambda i: locations[i].rank)
+        elif first_covered or second_covered:
+            kind = REDUNDANT
+            keep, drop = (second, first) if first_covered else (first, second)
+        else:
+            kind = PARTIAL
+            keep, drop = sorted(
+                (first, second),
+                key=lambda i: (-count_keys(archs[i]), locations[i].rank)
+            )
+        keys = frozenset(
+            SourceKey(*base, arch)
+            for base, common in bases.items()
+            for arch in common
+        )
+        overlaps.append(Overlap(kind, locations[keep], locations[drop], keys))
+
+    overlaps.sort(
+        key=lambda overlap: (
+            overlap.kind == PARTIAL, overlap.keep.rank, overlap.drop.rank
+        )
+    )
+    found = []
+    dropped = set()
+    for overlap in overlaps:
+        if overlap.keep.rank in dropped or overlap.drop.rank in dropped:
+            continue
+        if overlap.kind != PARTIAL:
+            dropped.add(overlap.drop.rank)
+        found.append(overlap)
+    return found
+
+def count_keys(archs):
+    """ Count the keys of a source.
+
+    Arguments:
+        archs (dict): The architectures of the source, by base key.
+
+    Returns:
+        int: The number of keys.
+    """
+    return sum(len(base_archs) for base_archs in archs.values())
+
+def shared_archs(first, second):
+    """ Find the architectures two sources both configure for an index.
+
+    Arguments:
+        first (set of str): The architectures of one source.
+        second (set of str): The architectures of the other.
+
+    Returns:
+        set of str: The shared architectures. DEFAULT_ARCH stands for the
+        system's architectures, so it is shared with any other architecture.
+    """
+    if DEFAULT_ARCH in first:
+        return set(second)
+    if DEFAULT_ARCH in second:
+        return set(first)
+    return first & second
+
+def covers(keep, drop, bases):
+    """ Check whether one source configures every index of another.
+
+    Arguments:
+        keep (dict): The architectures of the covering source, by base key.
+        drop (dict): The architectures of the covered source, by base key.
+        bases (dict): The base keys the two sources share.
+
+    Returns:
+        bool: True if every index of drop is also configured by keep.
+    """
+    for base, drop_archs in drop.items():
+        if base not in bases:
+            return False
+        keep_archs = keep[base]
+        if DEFAULT_ARCH in keep_archs:
+            continue
+        if DEFAULT_ARCH in drop_archs or not drop_archs <= keep_archs:
+            return False
+    return True
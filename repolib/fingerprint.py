@@ -0,0 +1,505 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+A stable fingerprint of the configured sources, for detecting drift.
+
+The sources are normalized first, so differences in formatting and ordering
+don't change the fingerprint. Each stanza is split into a canonical stanza
+for each type, URI, suite and component it configures (like the keys from
+Source.make_keys()), with its URI normalized and multi-valued options
+sorted, so a DEB822 stanza matches the equivalent lines of a .list file, and
+splitting or merging stanzas doesn't count. Files are keyed by repository
+name, so converting a file between formats doesn't change it either. Names
+and comments aren't part of the fingerprint.
+
+The hashes form a Merkle tree. Each file's hash covers the hashes of its
+canonical stanzas, in sorted order, and the files are the leaves of a trie
+keyed by the hash of each file's key, one hex digit per level. The shape of
+the trie only depends on which files exist, so two hosts can compare their
+trees top down, only exchanging the children of nodes which differ, and find
+the files which differ in a number of exchanges which grows with the
+logarithm of the number of files.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+
+from . import util
+from .deb import DebLine, DebLineSourceException
+from .index import SourcesIndex
+from .source import Source, SourceError
+
+SOURCES_LIST_KEY = 'sources.list'
+DIGITS = '0123456789abcdef'
+# Options whose values are unordered lists.
+MULTI_VALUED = ('architectures', 'languages', 'targets')
+IGNORED_OPTIONS = ('x-repolib-',)
+
+# The canonical stanzas of each file, with the mtime and size they were read
+# at.
+_FILES = {}
+
+class FingerprintError(Exception):
+    """ Exceptions from fingerprints. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception with a fingerprint
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+def get_hash(*parts):
+    """ Hash some strings.
+
+    Each part is length-prefixed, so the parts can't run together.
+
+    Arguments:
+        parts (str): The strings to hash.
+
+    Returns:
+        str: The SHA-256 hash, in hex.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode('utf-8')
+        digest.update(f'{len(data)}:'.encode('ascii'))
+        digest.update(data)
+    return digest.hexdigest()
+
+def canonicalize(record):
+    """ Reduce a source to canonical forms which ignore formatting.
+
+    Arguments:
+        record (dict): The source, as returned by Source.make_dict() (or read
+            from an inventory).
+
+    Returns:
+        [str]: A canonical JSON form for each type, URI, suite and component
+        the source configures.
+    """
+    options = {}
+    for key, value in (record.get('options') or {}).items():
+        key = key.lower()
+        if key.startswith(IGNORED_OPTIONS):
+            continue
+        if isinstance(value, list):
+            value = ' '.join(value)
+        values = str(value).split()
+        if key in MULTI_VALUED:
+            values = sorted(set(values))
+        options[key] = ' '.join(values)
+    forms = []
+    for source_type in record.get('types') or ['']:
+        for uri in record.get('uris') or ['']:
+            for suite in record.get('suites') or ['']:
+                for component in record.get('components') or ['']:
+                    forms.append(json.dumps({
+                        'enabled': bool(record.get('enabled', True)),
+                        'type': source_type,
+                        'uri': util.normalize_uri(uri),
+                        'suite': suite,
+                        'component': component,
+                        'options': options,
+                    }, sort_keys=True, separators=(',', ':')))
+    return forms
+
+def describe(form):
+    """ Describe a canonical stanza like a one-line source.
+
+    Arguments:
+        form (str): The canonical form, as returned by canonicalize().
+
+    Returns:
+        str: The description.
+    """
+    stanza = json.loads(form)
+    parts = [stanza['type']]
+    if stanza['options']:
+        options = ' '.join(
+            f"{key}={','.join(value.split())}"
+            for key, value in sorted(stanza['options'].items())
+        )
+        parts.append(f'[{options}]')
+    parts.extend((stanza['uri'], stanza['suite'], stanza['component']))
+    line = ' '.join(part for part in parts if part)
+    return line if stanza['enabled'] else f'# {line}'
+
+class FileFingerprint:
+    """ The fingerprint of the sources in one file.
+
+    Arguments:
+        key (str): The key of the file: the repository name, or
+            SOURCES_LIST_KEY for /etc/apt/sources.list.
+        forms ([str]): The canonical form of each stanza in the file.
+    """
+
+    def __init__(self, key, forms):
+        self.key = key
+        self.stanzas = {get_hash('stanza', form): form for form in forms}
+        self.hash = get_hash('file', key, *sorted(self.stanzas))
+
+    def make_dict(self):
+        """ Make a dict of the fingerprint, for machine-readable output.
+
+        Returns:
+            dict: The hash of the file, and the canonical form of each
+            stanza by its hash.
+        """
+        return {'hash': self.hash, 'stanzas': self.stanzas}
+
+class Fingerprint:
+    """ The fingerprint of all of the configured sources.
+
+    Arguments:
+        files ([FileFingerprint]): The fingerprints of the files.
+    """
+
+    def __init__(self, files):
+        self.files = {}
+        self.paths = {}
+        for file in files:
+            self.files[file.key] = file
+            self.paths[get_hash('path', file.key)] = file.key
+        self._sorted = sorted(self.paths)
+        self._nodes = {}
+
+    @classmethod
+    def from_records(cls, records):
+        """ Make a fingerprint from source records.
+
+        Arguments:
+            records (iterable of dict): The records, in the format of
+                Source.make_dict(), with a file or filename field, such as
+                the records of one host in an inventory.
+
+        Returns:
+            Fingerprint: The fingerprint.
+        """
+        forms = {}
+        for record in records:
+            key = get_key(record.get('file') or record.get('filename') or '')
+            forms.setdefault(key, []).extend(canonicalize(record))
+        return cls(FileFingerprint(key, value) for key, value in forms.items())
+
+    @classmethod
+    def from_dict(cls, data):
+        """ Load a fingerprint made by make_dict(), such as from another host.
+
+        Arguments:
+            data (dict): The fingerprint.
+
+        Returns:
+            Fingerprint: The fingerprint.
+
+        Raises:
+            FingerprintError: If the fingerprint is malformed or doesn't
+                match its hashes.
+        """
+        try:
+            loaded = cls(
+                FileFingerprint(key, file['stanzas'].values())
+                for key, file in data['files'].items()
+            )
+        except (AttributeError, KeyError, TypeError) as err:
+            raise FingerprintError(
+                f'The fingerprint is malformed: {err}'
+            ) from err
+        if loaded.root != data.get('root'):
+            raise FingerprintError("The fingerprint doesn't match its hashes.")
+        return loaded
+
+    @property
+    def root(self):
+        """ str: The root hash of the tree. """
+        return self.get_node('') or get_hash('empty')
+
+    def get_node(self, prefix):
+        """ Get the hash of a node in the tree.
+
+        Arguments:
+            prefix (str): The prefix of the hashes of the file keys under the
+                node.
+
+        Returns:
+            str: The hash of the node, or None if no files are under it.
+        """
+        if prefix not in self._nodes:
+            paths = self.get_paths(prefix)
+            if not paths:
+                node = None
+            elif len(paths) == 1:
+                key = self.paths[paths[0]]
+                node = get_hash('leaf', paths[0], self.files[key].hash)
+            else:
+                node = get_hash('node', *(
+                    self.get_node(prefix + digit) or '' for digit in DIGITS
+                ))
+            self._nodes[prefix] = node
+        return self._nodes[prefix]
+
+    def expand(self, prefix):
+        """ Get the children of a node, for comparing with another host.
+
+        This is the only request needed from the other host while comparing
+        trees, apart from get_file().
+
+        Arguments:
+            prefix (str): The prefix of the node.
+
+        Returns:
+            dict: The hash of each child with any files under it, and the
+            key of the file if it is the only one, by the child's prefix.
+        """
+        children = {}
+        for digit in DIGITS:
+            child = prefix + digit
+            node = self.get_node(child)
+            if node is None:
+                continue
+            paths = self.get_paths(child)
+            key = self.paths[paths[0]] if len(paths) == 1 else None
+            children[child] = (node, key)
+        return children
+
+    def get_file(self, key):
+        """ Get the fingerprint of a file.
+
+        Arguments:
+            key (str): The key of the file.
+
+        Returns:
+            FileFingerprint: The fingerprint, or None if there is no file.
+        """
+        return self.files.get(key)
+
+    def get_keys(self, prefix):
+        """ Get the keys of the files under a node.
+
+        Arguments:
+            prefix (str): The prefix of the node.
+
+        Returns:
+            [str]: The keys.
+        """
+        return [self.paths[path] for path in self.get_paths(prefix)]
+
+    def get_paths(self, prefix):
+        """ Get the hashes of the keys of the files under a node.
+
+        Arguments:
+            prefix (str): The prefix of the node.
+
+        Returns:
+            [str]: The hashes, sorted.
+        """
+        # Hex digits sort before 'g', so this is the end of the prefix's range.
+        start = bisect.bisect_left(self._sorted, prefix)
+        end = bisect.bisect_left(self._sorted, prefix + 'g')
+        return self._sorted[start:end]
+
+    def make_dict(self):
+        """ Make a dict of the fingerprint, for machine-readable output.
+
+        Returns:
+            dict: The root hash, and the fingerprint of each file by key.
+        """
+        return {
+            'root': self.root,
+            'files': {
+                key: self.files[key].make_dict() for key in sorted(self.files)
+            },
+        }
+
+def get_key(filename):
+    """ Get the key of a file in the fingerprint.
+
+    Arguments:
+        filename (str): The name or path of the file.
+
+    Returns:
+        str: The repository name (the filename without directory or suffix),
+        or SOURCES_LIST_KEY for sources.list.
+    """
+    basename = os.path.basename(filename)
+    if basename == 'sources.list' and not filename.endswith('.d/sources.list'):
+        return SOURCES_LIST_KEY
+    return os.path.splitext(basename)[0]
+
+def cached_paths():
+    """ Get the files whose canonical stanzas are cached.
+
+    Returns:
+        set of str: The paths of the files.
+    """
+    return set(_FILES)
+
+def clear_cache():
+    """ Forget the canonical stanzas read so far, so every file is read again. """
+    _FILES.clear()
+
+def read_forms(path, legacy):
+    """ Read the canonical forms of the stanzas in a file.
+
+    The forms are cached, and the file is only read again if its
+    modification time or size change.
+
+    Arguments:
+        path (str): The path to the file.
+        legacy (bool): Whether the file is in the one-line format.
+
+    Returns:
+        [str]: The canonical form of each stanza.
+
+    Raises:
+        OSError: If the file can't be read.
+    """
+    stat = os.stat(path)
+    cached = _FILES.get(path)
+    if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+    with open(path, mode='r') as source_file:
+        if legacy:
+            stanzas = [
+                DebLine(line.strip())
+                for line in source_file if util.validate_debline(line)
+            ]
+        else:
+            stanzas = list(Source.iter_paragraphs(source_file))
+    forms = [
+        form for stanza in stanzas for form in canonicalize(stanza.make_dict())
+    ]
+    _FILES[path] = ((stat.st_mtime_ns, stat.st_size), forms)
+    return forms
+
+def fingerprint(index=None):
+    """ Make the fingerprint of the configured sources.
+
+    The sources dir and /etc/apt/sources.list are included. Files which
+    haven't changed since they were last read aren't read again.
+
+    Arguments:
+        index (SourcesIndex): The index to read from (default: the sources
+            dir).
+
+    Returns:
+        Fingerprint: The fingerprint.
+
+    Raises:
+        FingerprintError: If a file can't be read.
+    """
+    index = index or SourcesIndex()
+    paths = [(entry.path, entry.legacy) for entry in index.entries()]
+    if os.path.exists(util.SOURCES_LIST):
+        paths.append((util.SOURCES_LIST, True))
+
+    forms = {}
+    seen = set()
+    for path, legacy in paths:
+        path = str(path)
+        seen.add(path)
+        try:
+            file_forms = read_forms(path, legacy)
+        except (
+                DebLineSourceException,
+                IndexError,
+                OSError,
+                SourceError,
+                ValueError) as err:
+            raise FingerprintError(f'Could not read {path}: {err}') from err
+        forms.setdefault(get_key(path), []).extend(file_forms)
+    for path in set(_FILES) - seen:
+        del _FILES[path]
+    return Fingerprint(
+        FileFingerprint(key, value) for key, value in forms.items()
+    )
+
+def compare(local, remote):
+    """ Find the files which differ between two fingerprints.
+
+    The trees are compared from the root down, and only the children of
+    nodes whose hashes differ are requested from the remote fingerprint, so
+    few requests are needed when few files differ.
+
+    Arguments:
+        local (Fingerprint): The local fingerprint.
+        remote: The other host's fingerprint, or any object with the same
+            root attribute and expand() method, such as a client which makes
+            requests to the other host.
+
+    Returns:
+        ([str], int): The keys of the files which differ (including those
+        only on one host), sorted, and the number of requests made to the
+        remote fingerprint.
+    """
+    if local.root == remote.root:
+        return [], 1
+    requests = 1
+    differ = set()
+    pending = ['']
+    while pending:
+        prefix = pending.pop()
+        ours = local.expand(prefix)
+        theirs = remote.expand(prefix)
+        requests += 1
+        for child in set(ours) | set(theirs):
+            our_node, our_key = ours.get(child, (None, None))
+            their_node, their_key = theirs.get(child, (None, None))
+            if our_node == their_node:
+                continue
+            if their_node is None:
+                differ.update(local.get_keys(child))
+            elif our_key is not None and their_key is not None:
+                differ.update((our_key, their_key))
+            elif their_key is not None and our_node is None:
+                differ.add(their_key)
+            else:
+                pending.append(child)
+    return sorted(differ), requests
+
+def compare_file(local, remote):
+    """ Find the stanzas which differ between two fingerprints of a file.
+
+    Arguments:
+        local (FileFingerprint): The local file, or None if it's missing.
+        remote (FileFingerprint): The other host's file, or None if it's
+            missing.
+
+    Returns:
+        ([str], [str]): The canonical forms of the stanzas only in the
+        local file, and those only in the other host's file.
+    """
+    ours = local.stanzas if local else {}
+    theirs = remote.stanzas if remote else {}
+    return (
+        sorted(ours[stanza] for stanza in set(ours) - set(theirs)),
+        sorted(theirs[stanza] for stanza in set(theirs) - set(ours)),
+    )
@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from . import fingerprint
+from . import util
+
+EXAMPLE_SOURCES = """X-Repolib-Name: Example
+Types: deb deb-src
+URIs: http://example.com/ubuntu/
+Suites: focal focal-updates
+Components: main universe
+Architectures: i386 amd64
+"""
+
+EXAMPLE_LIST = """# A comment
+deb-src [arch=amd64,i386] http://example.com/ubuntu focal-updates main universe
+deb [arch=amd64,i386] http://EXAMPLE.com:80/ubuntu focal universe main
+deb [arch=i386,amd64] http://example.com/ubuntu focal-updates universe
+deb [arch=i386,amd64] http://example.com/ubuntu focal-updates main
+deb-src [arch=amd64,i386] http://example.com/ubuntu focal main universe
+"""
+
+def make_fingerprint(files):
+    return fingerprint.Fingerprint(
+        fingerprint.FileFingerprint(key, [key]) for key in files
+    )
+
+class FingerprintTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        patcher = mock.patch.object(
+            util, 'SOURCES_LIST', os.path.join(self.root.name, 'sources.list')
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        fingerprint.clear_cache()
+
+    def write(self, filename, contents):
+        with open(self.sources_dir / filename, mode='w') as source_file:
+            source_file.write(contents)
+
+    def test_formatting(self):
+        """ Formats, ordering, names and comments don't count. """
+        self.write('example.sources', EXAMPLE_SOURCES)
+        deb822 = fingerprint.fingerprint()
+        os.remove(self.sources_dir / 'example.sources')
+        self.write('example.list', EXAMPLE_LIST)
+        legacy = fingerprint.fingerprint()
+        self.assertEqual(deb822.root, legacy.root)
+        self.assertEqual(list(deb822.files), ['example'])
+        self.assertEqual(len(deb822.files['example'].stanzas), 8)
+
+        self.write('example.list', EXAMPLE_LIST.replace('universe main', 'main'))
+        os.utime(self.sources_dir / 'example.list', ns=(0, 0))
+        self.assertNotEqual(fingerprint.fingerprint().root, legacy.root)
+
+    def test_sources_list(self):
+        self.write('example.sources', EXAMPLE_SOURCES)
+        before = fingerprint.fingerprint()
+        with open(util.SOURCES_LIST, mode='w') as sources_list:
+            sources_list.write('deb http://archive.ubuntu.com/ubuntu focal main\n')
+        after = fingerprint.fingerprint()
+        self.assertNotEqual(before.root, after.root)
+        self.assertEqual(
+            sorted(after.files), ['example', fingerprint.SOURCES_LIST_KEY]
+        )
+
+    def test_cache(self):
+        self.write('example.sources', EXAMPLE_SOURCES)
+        path = str(self.sources_dir / 'example.sources')
+        with mock.patch.object(
+                fingerprint, 'canonicalize',
+                wraps=fingerprint.canonicalize) as canonicalize:
+            first = fingerprint.fingerprint()
+            self.assertIn(path, fingerprint.cached_paths())
+            second = fingerprint.fingerprint()
+            self.assertEqual(canonicalize.call_count, 1)
+            self.assertEqual(first.root, second.root)
+
+            self.write('example.sources', EXAMPLE_SOURCES + 'Enabled: no\n')
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            third = fingerprint.fingerprint()
+            self.assertEqual(canonicalize.call_count, 2)
+            self.assertNotEqual(first.root, third.root)
+
+        os.remove(path)
+        fingerprint.fingerprint()
+        self.assertNotIn(path, fingerprint.cached_paths())
+
+    def test_from_records(self):
+        self.write('example.sources', EXAMPLE_SOURCES)
+        local = fingerprint.fingerprint()
+        record = {
+            'host': 'web1',
+            'file': 'sources.list.d/example.list',
+            'enabled': True,
+            'types': ['deb', 'deb-src'],
+            'uris': ['http://example.com/ubuntu'],
+            'suites': ['focal-updates', 'focal'],
+            'components': ['universe', 'main'],
+            'options': {'Architectures': 'amd64 i386'},
+        }
+        self.assertEqual(
+            fingerprint.Fingerprint.from_records([record]).root, local.root
+        )
+
+    def test_dict(self):
+        self.write('example.sources', EXAMPLE_SOURCES)
+        local = fingerprint.fingerprint()
+        loaded = fingerprint.Fingerprint.from_dict(local.make_dict())
+        self.assertEqual(loaded.root, local.root)
+
+        data = local.make_dict()
+        data['files']['example']['stanzas'].popitem()
+        with self.assertRaises(fingerprint.FingerprintError):
+            fingerprint.Fingerprint.from_dict(data)
+        with self.assertRaises(fingerprint.FingerprintError):
+            fingerprint.Fingerprint.from_dict({'files': []})
+
+    def test_describe(self):
+        forms = fingerprint.canonicalize({
+            'enabled': False,
+            'types': ['deb'],
+            'uris': ['http://example.com/ubuntu/'],
+            'suites': ['focal'],
+            'components': ['main', 'universe'],
+            'options': {'Architectures': 'i386 amd64'},
+        })
+        self.assertEqual(len(forms), 2)
+        self.assertEqual(
+            fingerprint.describe(forms[0]),
+            '# deb [architectures=amd64,i386] http://example.com/ubuntu '
+            'focal main'
+        )
+
+class CompareTestCase(unittest.TestCase):
+
+    def test_compare(self):
+        keys = [f'repo{number}' for number in range(1000)]
+        local = make_fingerprint(keys)
+        self.assertEqual(fingerprint.compare(local, make_fingerprint(keys)), ([], 1))
+
+        remote = make_fingerprint(keys[:500] + ['changed'] + keys[501:] + ['new'])
+        differ, requests = fingerprint.compare(local, remote)
+        self.assertEqual(differ, ['changed', 'new', 'repo500'])
+        # A few levels of the trie for each difference, not every file.
+        self.assertLess(requests, 15)
+
+    def test_compare_empty(self):
+        local = make_fingerprint(['repo1', 'repo2'])
+        empty = make_fingerprint([])
+        self.assertEqual(fingerprint.compare(local, empty)[0], ['repo1', 'repo2'])
+        self.assertEqual(fingerprint.compare(empty, local)[0], ['repo1', 'repo2'])
+
+    def test_compare_file(self):
+        local = fingerprint.FileFingerprint('example', ['a', 'b'])
+        remote = fingerprint.FileFingerprint('example', ['b', 'c'])
+        self.assertEqual(fingerprint.compare_file(local, remote), (['a'], ['c']))
+        self.assertEqual(fingerprint.compare_file(None, remote), ([], ['b', 'c']))
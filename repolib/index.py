@@ -0,0 +1,306 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+An index of the sources configured in the sources dir.
+"""
+
+import fnmatch
+import os
+
+from . import deb
+from . import legacy_deb
+from . import names
+from . import source
+from . import util
+
+SOURCES_SUFFIX = '.sources'
+LIST_SUFFIX = '.list'
+
+class SourcesIndexError(Exception):
+    """ Exceptions from the sources index. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception with the sources index
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+class IndexEntry:
+    """ A single file in the sources dir.
+
+    Arguments:
+        name (str): The name of the repository (the filename without suffix).
+        filename (str): The name of the file in the sources dir.
+        mtime (float): The modification time of the file.
+        stanza (int): If the entry was found by the name of one of the
+            sources in the file, the position of that source, otherwise None.
+        source_name (str): The name the source was found by.
+    """
+
+    def __init__(self, name, filename, mtime=0, stanza=None, source_name=None):
+        self.name = name
+        self.filename = filename
+        self.mtime = mtime
+        self.stanza = stanza
+        self.source_name = source_name
+
+    @property
+    def legacy(self):
+        """ bool: Whether this is a legacy one-line format file. """
+        return self.filename.endswith(LIST_SUFFIX)
+
+    @property
+    def system(self):
+        """ bool: Whether this is the system sources file. """
+        return self.filename == util.SYSTEM_FILENAME
+
+    @property
+    def path(self):
+        """ pathlib.Path: The full path to the file. """
+        return util.get_sources_dir() / self.filename
+
+    def __repr__(self):
+        return f'IndexEntry({self.name!r}, {self.filename!r})'
+
+class SourcesIndex:
+    """ An index of the sources dir.
+
+    The index reads the directory a single time when it is iterated, and only
+    opens a file when the sources inside of it are requested. Sources are
+    yielded one at a time, so the whole directory never needs to be held in
+    memory.
+
+    Arguments:
+        dry_run (bool): Never write to the filesystem, even to save a rebuilt
+            name index.
+    """
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+
+    def entries(self):
+        """ Iterate over the files in the sources dir, sorted by name.
+
+        Yields:
+            IndexEntry: An entry for each .sources or .list file.
+        """
+        sources_dir = util.get_sources_dir()
+        with os.scandir(sources_dir) as dir_entries:
+            files = sorted(
+                (dir_entry.name, dir_entry.stat().st_mtime)
+                for dir_entry in dir_entries
+                if dir_entry.is_file()
+            )
+
+        for filename, mtime in files:
+            for suffix in (SOURCES_SUFFIX, LIST_SUFFIX):
+                if filename.endswith(suffix):
+                    yield IndexEntry(filename[:-len(suffix)], filename, mtime)
+                    break
+
+    def get_entry(self, name):
+        """ Find the file for the repository called name.
+
+        The name is first checked against the filenames in the sources dir,
+        and then against the names of the sources saved in them, using the
+        name index. If a source in a DEB822 file is found by its name, the
+        entry refers only to that source (see find_stanza()); names of legacy
+        files refer to the whole file.
+
+        Arguments:
+            name (str): The name of the repository, or of a source.
+
+        Returns:
+            IndexEntry: The entry for the repository.
+
+        Raises:
+            SourcesIndexError: If no repository with that name is configured.
+        """
+        for suffix in (SOURCES_SUFFIX, LIST_SUFFIX):
+            path = util.get_sources_dir() / f'{name}{suffix}'
+            if path.exists():
+                return IndexEntry(name, path.name, path.stat().st_mtime)
+
+        location = names.lookup(name, save=not self.dry_run)
+        if location:
+            path = util.get_sources_dir() / location[0]
+            if path.exists():
+                stanza = None if path.suffix == LIST_SUFFIX else location[1]
+                return IndexEntry(
+                    path.name[:-len(path.suffix)],
+                    path.name,
+                    path.stat().st_mtime,
+                    stanza=stanza,
+                    source_name=name
+                )
+
+        raise SourcesIndexError(f'The repository {name} could not be found.')
+
+    def load(self, entry):
+        """ Load the repository for an entry.
+
+        Arguments:
+            entry (IndexEntry): The entry to load.
+
+        Returns:
+            source.Source for DEB822 files, or legacy_deb.LegacyDebSource for
+            one-line format files.
+        """
+        if entry.legacy:
+            repo = legacy_deb.LegacyDebSource(filename=entry.filename)
+        else:
+            repo = source.Source(filename=entry.filename)
+        repo.load_from_file()
+        return repo
+
+    def find_stanza(self, entry, stanzas):
+        """ Find the source an entry was looked up by in its file.
+
+        The position from the name index is checked against the name of the
+        source there, in case the file was edited since the index was made.
+
+        Arguments:
+            entry (IndexEntry): The entry, as returned by get_entry().
+            stanzas ([source.Source]): The sources in the entry's file.
+
+        Returns:
+            int: The position of the source, or None if the entry refers to
+            the whole file.
+
+        Raises:
+            SourcesIndexError: If the source is no longer in the file.
+        """
+        if entry.stanza is None:
+            return None
+        if entry.stanza < len(stanzas):
+            if stanzas[entry.stanza].name == entry.source_name:
+                return entry.stanza
+        for position, stanza in enumerate(stanzas):
+            if stanza.name == entry.source_name:
+                return position
+        raise SourcesIndexError(
+            f'The repository {entry.source_name} could not be found.'
+        )
+
+    def stanzas(self, entry):
+        """ Iterate over each of the sources configured in an entry.
+
+        DEB822 files yield a Source for each stanza in the file, and legacy
+        files yield a DebLine for each line.
+
+        Arguments:
+            entry (IndexEntry): The entry to read.
+
+        Yields:
+            source.Source: Each source in the file.
+        """
+        with open(entry.path, mode='r') as source_file:
+            if entry.legacy:
+                for line in source_file:
+                    if util.validate_debline(line):
+                        yield deb.DebLine(line.strip())
+            else:
+                for stanza in source.Source.iter_paragraphs(source_file):
+                    stanza.filename = entry.filename
+                    yield stanza
+
+    def sources(self):
+        """ Iterate over every source in the sources dir.
+
+        Yields:
+            (IndexEntry, source.Source): The entry and each source within it.
+        """
+        for entry in self.entries():
+            for stanza in self.stanzas(entry):
+                yield entry, stanza
+
+    def select(
+            self,
+            name=None,
+            uri=None,
+            suite=None,
+            component=None,
+            file_type=None,
+            errors=None):
+        """ Find the sources matching all of the given selectors.
+
+        Selectors which are None match everything. The directory is scanned
+        once, and files are skipped without being opened if their type
+        doesn't match.
+
+        Keyword Arguments:
+            name (str): A shell-style glob matching the repository name (the
+                filename without suffix) or the name of the source.
+            uri (str): A prefix matching one of the source's URIs.
+            suite (str): A suite the source must include.
+            component (str): A component the source must include.
+            file_type (str): Either 'sources' or 'list'.
+            errors (list): If given, files which can't be read are skipped,
+                and a description of each is added to it.
+
+        Yields:
+            (IndexEntry, [source.Source], [source.Source]): Each file with at
+            least one matching source, all of the sources in the file, and
+            the ones which matched.
+
+        Raises:
+            SourcesIndexError: If a file can't be read, unless errors is
+                given.
+        """
+        for entry in self.entries():
+            if file_type and not entry.filename.endswith(f'.{file_type}'):
+                continue
+            name_matched = not name or fnmatch.fnmatchcase(entry.name, name)
+            try:
+                stanzas = list(self.stanzas(entry))
+            except (
+                    deb.DebLineSourceException,
+                    source.SourceError,
+                    ValueError) as err:
+                message = f'Could not read {entry.filename}: {err}'
+                if errors is None:
+                    raise SourcesIndexError(message) from err
+                errors.append(message)
+                continue
+            matched = []
+            for stanza in stanzas:
+                if not name_matched and not (
+                        stanza.name and fnmatch.fnmatchcase(stanza.name, name)):
+                    continue
+                if uri and not any(
+                        stanza_uri.startswith(uri) for stanza_uri in stanza.uris or []):
+                    continue
+                if suite and suite not in (stanza.suites or []):
+                    continue
+                if component and component not in (stanza.components or []):
+                    continue
+                matched.append(stanza)
+            if matched:
+                yield entry, stanzas, matched
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import shutil
+import unittest
+
+from . import index
+from . import util
+
+class IndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'multi.sources', mode='w') as sources_file:
+            sources_file.write(
+                'X-Repolib-Name: Multi\n'
+                'Enabled: yes\n'
+                'Types: deb\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal\n'
+                'Components: main\n'
+                '\n'
+                'X-Repolib-Name: Multi Source\n'
+                'Enabled: no\n'
+                'Types: deb-src\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal\n'
+                'Components: main universe\n'
+            )
+        with open(self.sources_dir / 'legacy.list', mode='w') as list_file:
+            list_file.write(
+                'deb http://example.com/legacy focal main\n'
+                '# deb-src http://example.com/legacy focal main\n'
+            )
+        with open(self.sources_dir / 'README', mode='w') as other_file:
+            other_file.write('Not a source\n')
+        self.index = index.SourcesIndex()
+
+    def test_entries(self):
+        entries = list(self.index.entries())
+        self.assertEqual(
+            [entry.name for entry in entries], ['legacy', 'multi']
+        )
+        self.assertTrue(entries[0].legacy)
+        self.assertFalse(entries[1].legacy)
+
+    def test_get_entry(self):
+        entry = self.index.get_entry('legacy')
+        self.assertEqual(entry.filename, 'legacy.list')
+        with self.assertRaises(index.SourcesIndexError):
+            self.index.get_entry('missing')
+
+    def test_stanzas(self):
+        stanzas = list(self.index.stanzas(self.index.get_entry('multi')))
+        self.assertEqual(len(stanzas), 2)
+        self.assertEqual(stanzas[1].name, 'Multi Source')
+        self.assertEqual(stanzas[1].components, ['main', 'universe'])
+        self.assertEqual(stanzas[1].filename, 'multi.sources')
+
+        lines = list(self.index.stanzas(self.index.get_entry('legacy')))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].types, [util.AptSourceType.SOURCE])
+        self.assertFalse(lines[1].enabled.get_bool())
+
+    def test_sources(self):
+        names = [entry.name for entry, _ in self.index.sources()]
+        self.assertEqual(names, ['legacy', 'legacy', 'multi', 'multi'])
+
+    def test_select(self):
+        selected = list(self.index.select(component='universe'))
+        self.assertEqual(len(selected), 1)
+        entry, stanzas, matched = selected[0]
+        self.assertEqual(entry.name, 'multi')
+        self.assertEqual(len(stanzas), 2)
+        self.assertEqual([stanza.name for stanza in matched], ['Multi Source'])
+
+        selected = list(self.index.select(uri='http://example.com/leg'))
+        self.assertEqual([entry.name for entry, _, _ in selected], ['legacy'])
+        self.assertEqual(len(selected[0][2]), 2)
+
+        selected = list(self.index.select(file_type='sources'))
+        self.assertEqual([entry.name for entry, _, _ in selected], ['multi'])
+
+        selected = list(self.index.select(name='Multi S*'))
+        self.assertEqual(len(selected[0][2]), 1)
+
+        selected = list(self.index.select(name='leg*', suite='focal'))
+        self.assertEqual([entry.name for entry, _, _ in selected], ['legacy'])
+
+        self.assertEqual(list(self.index.select(suite='missing')), [])
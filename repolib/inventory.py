@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Build an inventory of the sources configured across many hosts.
+
+Each host's ``/etc/apt`` is collected as a tar archive. The archives are read
+as streams, without extracting them, and the sources in them are parsed with
+the same parsers used for the local system.
+"""
+
+import json
+import os
+import re
+import tarfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from . import util
+from .deb import DebLine, DebLineSourceException
+from .source import Source, SourceError
+
+# Members of the archive holding sources, relative to /etc/apt.
+MEMBER_RE = re.compile(
+    r'(?:^|/)(sources\.list|sources\.list\.d/[^/]+\.(?:list|sources))$'
+)
+ARCHIVE_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2')
+# Larger members are skipped, so one bad archive can't use up the memory.
+MAX_MEMBER_BYTES = 1024 * 1024
+
+def get_host(path):
+    """ Get the name of the host an archive was collected from.
+
+    Arguments:
+        path (str): The path to the archive, named after the host.
+
+    Returns:
+        str: The filename without its directory or archive suffix.
+    """
+    name = os.path.basename(path)
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def parse_member(filename, contents):
+    """ Parse the sources in a file.
+
+    Arguments:
+        filename (str): The name of the file, relative to /etc/apt. Files
+            ending with .sources are parsed as DEB822, and others as legacy
+            one-line files.
+        contents (str): The contents of the file.
+
+    Returns:
+        [source.Source]: The sources in the file.
+    """
+    lines = contents.splitlines()
+    if filename.endswith('.sources'):
+        return list(Source.iter_paragraphs(lines))
+    return [
+        DebLine(line.strip()) for line in lines if util.validate_debline(line)
+    ]
+
+def read_archive(path, fileobj=None):
+    """ Read the records for every source in a host's archive.
+
+    The archive is read as a stream, one member at a time, so it is never
+    extracted or held in memory, and it may be compressed.
+
+    Arguments:
+        path (str): The path to the archive.
+        fileobj (file): Read the archive from this file instead of opening
+            path, which is then only used for the name of the host.
+
+    Returns:
+        (str, [str], [str]): The host, a JSON record for each source, and a
+        description of each file which couldn't be read. Records are in the
+        same format as list --format ndjson, along with the host and the
+        file's path relative to /etc/apt.
+    """
+    host = get_host(path)
+    records = []
+    errors = []
+    try:
+        with tarfile.open(path, mode='r|*', fileobj=fileobj) as archive:
+            for member in archive:
+                match = MEMBER_RE.search(member.name)
+                if not match or not member.isfile():
+                    continue
+                filename = match.group(1)
+                basename = os.path.basename(filename)
+                repository = basename[:-len(os.path.splitext(basename)[1])]
+                if member.size > MAX_MEMBER_BYTES:
+                    errors.append(f'{host}: {filename} is too large')
+                    continue
+                contents = archive.extractfile(member).read()
+                try:
+                    stanzas = parse_member(
+                        filename, contents.decode('utf-8', 'replace')
+                    )
+                    for number, stanza in enumerate(stanzas):
+                        record = stanza.make_dict()
+                        record['host'] = host
+                        record['file'] = filename
+                        record['repository'] = repository
+                        record['filename'] = basename
+                        record['stanza'] = number
+                        records.append(json.dumps(record))
+                except (
+                        DebLineSourceException,
+                        IndexError,
+                        SourceError,
+                        util.RepoError,
+                        ValueError) as err:
+                    errors.append(f'{host}: could not read {filename}: {err}')
+    except (EOFError, OSError, tarfile.TarError) as err:
+        errors.append(f'{host}: could not read {path}: {err}')
+    return host, records, errors
+
+def get_result(future, path):
+    """ Get the result of reading an archive in the pool.
+
+    An unexpected error reading one archive is recorded as that host's error,
+    so it doesn't stop the others from being read.
+
+    Arguments:
+        future (concurrent.futures.Future): The finished call to
+            read_archive().
+        path (str): The path to the archive.
+
+    Returns:
+        (str, [str], [str]): The result of read_archive().
+    """
+    try:
+        return future.result()
+    except Exception as err: # pylint: disable=broad-except
+        host = get_host(path)
+        return host, [], [f'{host}: could not read {path}: {err!r}']
+
+def ingest(paths, workers=None):
+    """ Read many hosts' archives across a pool of processes.
+
+    At most two archives per process are in flight at once, and results are
+    yielded as soon as each archive is read, so memory use doesn't grow with
+    the number of hosts.
+
+    Arguments:
+        paths (iterable of str): The paths to the archives.
+        workers (int): The number of processes (default: the number of
+            CPUs).
+
+    Yields:
+        (str, [str], [str]): The results of read_archive() for each archive,
+        in the order they finish.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for path in paths:
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield get_result(future, pending.pop(future))
+            pending[executor.submit(read_archive, path)] = path
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield get_result(future, pending.pop(future))
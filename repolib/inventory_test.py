@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import io
+import json
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+
+from . import inventory
+
+SOURCES = """X-Repolib-Name: Example
+Types: deb deb-src
+URIs: http://example.com/ubuntu
+Suites: focal
+Components: main
+"""
+
+LIST = """# A comment
+deb http://archive.ubuntu.com/ubuntu focal main restricted
+# deb-src http://archive.ubuntu.com/ubuntu focal main restricted
+"""
+
+def add_member(archive, name, contents):
+    data = contents.encode('utf-8')
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    archive.addfile(info, io.BytesIO(data))
+
+class InventoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.root = Path(self.root.name)
+
+    def make_archive(self, name, members, mode='w:gz'):
+        path = self.root / name
+        with tarfile.open(path, mode=mode) as archive:
+            for member, contents in members.items():
+                add_member(archive, member, contents)
+        return str(path)
+
+    def test_get_host(self):
+        self.assertEqual(inventory.get_host('/srv/host1.tar.gz'), 'host1')
+        self.assertEqual(inventory.get_host('web.example.com.tgz'), 'web.example.com')
+        self.assertEqual(inventory.get_host('host2'), 'host2')
+
+    def test_read_archive(self):
+        path = self.make_archive('host1.tar.gz', {
+            'etc/apt/sources.list': LIST,
+            './etc/apt/sources.list.d/example.sources': SOURCES,
+            'etc/apt/sources.list.d/example.list.save': LIST,
+            'etc/apt/apt.conf.d/99example': 'APT::Get::Assume-Yes "true";\n',
+        })
+        host, records, errors = inventory.read_archive(path)
+        self.assertEqual(host, 'host1')
+        self.assertEqual(errors, [])
+        records = [json.loads(record) for record in records]
+        self.assertEqual(
+            [(record['file'], record['stanza']) for record in records],
+            [('sources.list', 0), ('sources.list', 1),
+             ('sources.list.d/example.sources', 0)]
+        )
+        self.assertEqual({record['host'] for record in records}, {'host1'})
+        self.assertEqual(records[0]['uris'], ['http://archive.ubuntu.com/ubuntu'])
+        self.assertTrue(records[0]['enabled'])
+        self.assertFalse(records[1]['enabled'])
+        self.assertEqual(records[1]['types'], ['deb-src'])
+        self.assertEqual(records[2]['name'], 'Example')
+        self.assertEqual(records[2]['repository'], 'example')
+        self.assertEqual(records[2]['filename'], 'example.sources')
+
+    def test_read_stream(self):
+        """ Archives which can't be seeked, like pipes, can be read. """
+        path = self.make_archive('host1.tar', {
+            'apt/sources.list.d/example.sources': SOURCES,
+        }, mode='w')
+        with open(path, mode='rb') as archive_file:
+            stream = io.BufferedReader(io.BytesIO(archive_file.read()))
+        stream.seekable = lambda: False
+        _, records, errors = inventory.read_archive('host1.tar', fileobj=stream)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(records), 1)
+
+    def test_read_errors(self):
+        path = self.make_archive('host1.tar.gz', {
+            'etc/apt/sources.list.d/bad.list': 'deb http://example.com\n',
+            'etc/apt/sources.list.d/good.sources': SOURCES,
+        })
+        _, records, errors = inventory.read_archive(path)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(len(errors), 1)
+        self.assertIn('bad.list', errors[0])
+
+        broken = self.root / 'host2.tar.gz'
+        broken.write_bytes(b'not an archive')
+        host, records, errors = inventory.read_archive(str(broken))
+        self.assertEqual((host, records), ('host2', []))
+        self.assertEqual(len(errors), 1)
+
+    def test_ingest_errors(self):
+        """ A host with a bad file doesn't stop the others being read. """
+        paths = [
+            self.make_archive('good.tar.gz', {
+                'etc/apt/sources.list.d/example.sources': SOURCES,
+            }),
+            self.make_archive('bad.tar.gz', {
+                'etc/apt/sources.list': 'deb\n',
+                'etc/apt/sources.list.d/example.sources': SOURCES,
+            }),
+        ]
+        results = {
+            host: (records, errors)
+            for host, records, errors in inventory.ingest(paths, workers=2)
+        }
+        self.assertEqual(sorted(results), ['bad', 'good'])
+        records, errors = results['good']
+        self.assertEqual(len(records), 1)
+        self.assertEqual(errors, [])
+        records, errors = results['bad']
+        self.assertEqual(len(records), 1)
+        self.assertEqual(len(errors), 1)
+        self.assertIn('sources.list', errors[0])
+
+    def test_ingest(self):
+        paths = [
+            self.make_archive(f'host{number}.tar.gz', {
+                'etc/apt/sources.list.d/example.sources': SOURCES,
+            })
+            for number in range(5)
+        ]
+        results = list(inventory.ingest(paths, workers=2))
+        self.assertEqual(
+            sorted(host for host, _, _ in results),
+            [f'host{number}' for number in range(5)]
+        )
+        for _, records, errors in results:
+            self.assertEqual(len(records), 1)
+            self.assertEqual(errors, [])
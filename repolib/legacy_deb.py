@@ -26,8 +26,15 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import json
+
 from . import deb
+from . import metrics
+from . import timing
 from . import util
+from .source import Source, SourceError
+
+NAME_HEADER = '## X-Repolib-Name:'
 
 class LegacyDebSource():
     """Legacy deb sources
@@ -49,6 +56,51 @@ class LegacyDebSource():
         self.filename = filename
         self.sources = []
 
+    def __reduce__(self):
+        """ Pickle the source compactly, along with each of its lines. """
+        return (_restore, (self.name, self.filename, tuple(self.sources)))
+
+    def to_bytes(self):
+        """ Serialize the source and its lines into a compact form.
+
+        This is restored with from_bytes(). See Source.to_bytes().
+
+        Returns:
+            bytes: The serialized source.
+        """
+        record = {
+            'name': self.name,
+            'filename': self.filename,
+            # pylint: disable=protected-access
+            'sources': [line._to_record() for line in self.sources],
+        }
+        return json.dumps(record, separators=(',', ':')).encode()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Restore a source serialized with to_bytes().
+
+        Arguments:
+            data (bytes): The serialized source.
+
+        Returns:
+            LegacyDebSource: The restored source.
+
+        Raises:
+            SourceError: If the data isn't a serialized legacy source.
+        """
+        try:
+            record = json.loads(data)
+            lines = [
+                # pylint: disable=protected-access
+                Source._from_record(line) for line in record['sources']
+            ]
+            return _restore(record['name'], record['filename'], lines)
+        except (KeyError, TypeError, ValueError) as err:
+            raise SourceError(
+                f'Invalid serialized legacy source: {err}'
+            ) from err
+
     def make_names(self):
         """ Creates a filename for this source, if one is not provided.
 
@@ -71,7 +123,7 @@ class LegacyDebSource():
 
         full_path = util.get_sources_dir() / self.filename
 
-        with open(full_path, 'r') as source_file:
+        with timing.span('parse'), open(full_path, 'r') as source_file:
             for line in source_file:
                 if util.validate_debline(line):
                     deb_src = deb.DebLine(line)
@@ -84,20 +136,51 @@ class LegacyDebSource():
 
         source_output = self.make_deblines()
 
-        with open(full_path, 'w') as source_file:
-            source_file.write(source_output)
+        with timing.span('write'), open(full_path, 'w') as source_file:
+            metrics.inc('repolib_bytes_written_total', source_file.write(source_output))
+        metrics.inc('repolib_files_written_total')
 
-    def make_deblines(self):
+    def make_deblines(self, name=None):
         """ Create a string representation of the enties as they would be saved.
 
         This is useful for testing, and is used by the save_to_disk() method.
 
+        Keyword arguments:
+          name -- STR, The name to save in the header. (default: the name of
+            the first entry)
+
         Returns:
             A str with the output entries.
         """
         toprint = '## Added/managed by repolib ##\n'
-        toprint += f'#\n## X-Repolib-Name: {self.sources[0].name}\n'
+        toprint += f'#\n{NAME_HEADER} {name or self.sources[0].name}\n'
         for source in self.sources:
             toprint += f'{source.make_debline()}\n'
 
         return toprint
+
+def read_name(path):
+    """ Read the name saved in the header of a legacy file.
+
+    Arguments:
+        path (pathlib.Path): The path to the file.
+
+    Returns:
+        str: The name, or None if the file doesn't exist or has no name.
+    """
+    try:
+        with open(path, mode='r') as source_file:
+            for line in source_file:
+                if line.startswith(NAME_HEADER):
+                    return line[len(NAME_HEADER):].strip() or None
+                if util.validate_debline(line):
+                    break
+    except FileNotFoundError:
+        pass
+    return None
+
+def _restore(name, filename, sources):
+    """ Rebuild a legacy source from its name, filename and lines. """
+    legacy_source = LegacyDebSource(name=name, filename=filename)
+    legacy_source.sources = list(sources)
+    return legacy_source
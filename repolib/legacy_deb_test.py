@@ -28,6 +28,7 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # pylint: disable=missing-function-docstring, missing-class-docstring
 # These aren't really relevant for unit testing (which is mostly automatic.)
 
+import pickle
 import unittest
 
 from . import legacy_deb
@@ -64,6 +65,13 @@ class LegacyTestCase(unittest.TestCase):
             self.assertEqual(debsource.suites, ['ubuntu'])
             self.assertEqual(debsource.components, ['main', 'universe'])
 
+    def test_serialize(self):
+        for restored in (
+                pickle.loads(pickle.dumps(self.source)),
+                legacy_deb.LegacyDebSource.from_bytes(self.source.to_bytes())):
+            self.assertEqual(restored.filename, self.source.filename)
+            self.assertEqual(restored.make_deblines(), self.source.make_deblines())
+
     def test_make_deblines(self):
         # pylint: disable=line-too-long
         # unittest doesn't like when this is split to a sane length. We need to
@@ -0,0 +1,315 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+An offline index of the release files apt has downloaded.
+
+apt keeps the InRelease (or Release) file of each repository it has fetched
+in its lists dir. Reading these tells which suites, components and
+architectures a repository provides without using the network.
+"""
+
+import os
+from urllib.parse import urlsplit
+
+from . import targets
+from . import util
+
+RELEASE_SUFFIXES = ('_InRelease', '_Release')
+RELEASE_FIELDS = ('Suite', 'Codename', 'Components', 'Architectures')
+
+# Characters which apt quotes in the names of files in the lists dir.
+QUOTED_CHARS = '\\|{}[]<>"^~_=!@#$%&*'
+
+# The parsed release files, with the modification time they were read at.
+_RELEASES = {}
+
+class ReleaseInfo:
+    """ The parts of a release file used to validate sources.
+
+    Arguments:
+        filename (str): The name of the file in the lists dir.
+        fields (dict): The fields read from the file.
+    """
+
+    def __init__(self, filename, fields):
+        self.filename = filename
+        self.suite = fields.get('Suite', '')
+        self.codename = fields.get('Codename', '')
+        self.components = fields.get('Components', '').split()
+        self.architectures = fields.get('Architectures', '').split()
+
+    def has_component(self, component):
+        """ Check whether the repository provides a component.
+
+        Some repositories (e.g. Debian's security archive) list their
+        components with a prefix, like updates/main, which is matched too.
+
+        Arguments:
+            component (str): The component.
+
+        Returns:
+            bool: True if the component is provided.
+        """
+        return any(
+            component in (provided, provided.split('/')[-1])
+            for provided in self.components
+        )
+
+    def __repr__(self):
+        return f'ReleaseInfo({self.filename!r})'
+
+def get_filename(url):
+    """ Get the name apt saves the file downloaded from a URL as.
+
+    This matches apt's URItoFileName(): the scheme and any login are dropped,
+    special characters are quoted, and slashes are replaced by underscores.
+    Otherwise the URL is used as written; like apt, the case of the host and
+    any port given are kept, even if they make no difference to the server.
+
+    Arguments:
+        url (str): The URL of the file.
+
+    Returns:
+        str: The name of the file in the lists dir.
+    """
+    parts = urlsplit(url.strip())
+    location = parts.netloc.rpartition('@')[2]
+    host, colon, port = location.rpartition(':')
+    if colon and ']' not in port:
+        location = host
+        if port.isdigit() and int(port):
+            location += f':{int(port)}'
+    location += parts.path
+    quoted = ''.join(
+        f'%{ord(char):02x}'
+        if char in QUOTED_CHARS or ord(char) <= 0x20 or ord(char) >= 0x7f
+        else char
+        for char in location
+    )
+    return quoted.replace('/', '_')
+
+def get_prefix(uri, suite, component=''):
+    """ Get the start of the names of the files downloaded for a suite.
+
+    The URI is used as apt uses it, not normalized, so different spellings of
+    the same URI get different prefixes, just as they get different files.
+
+    Arguments:
+        uri (str): The URI of the repository.
+        suite (str): The suite.
+        component (str): Only match the files of this component (default:
+            the files of the suite itself, such as the release file).
+
+    Returns:
+        str: The start of the names of the files in the lists dir.
+    """
+    return get_filename(
+        f'{get_archive_uri(uri)}{targets.get_path(suite, component, "")}'
+    )
+
+def get_archive_uri(uri):
+    """ Get a repository's URI as apt fetches files relative to it.
+
+    apt only makes sure the URI ends with a slash.
+
+    Arguments:
+        uri (str): The URI of the repository.
+
+    Returns:
+        str: The URI the paths of the repository's files are appended to.
+    """
+    uri = uri.strip()
+    return uri if uri.endswith('/') else f'{uri}/'
+
+def parse_release(path):
+    """ Read the fields used by repolib from a release file.
+
+    Only the start of the file is read; the checksums which make up most of
+    it are skipped. Signed (InRelease) files are read the same way.
+
+    Arguments:
+        path (pathlib.Path): The path to the file.
+
+    Returns:
+        dict: The RELEASE_FIELDS found in the file.
+    """
+    fields = {}
+    with open(path, mode='r', errors='replace') as release_file:
+        for line in release_file:
+            if line.startswith('-----BEGIN PGP SIGNATURE'):
+                break
+            if not line.strip() or line[0].isspace():
+                continue
+            key, _, value = line.partition(':')
+            if key in RELEASE_FIELDS:
+                fields[key] = value.strip()
+                if len(fields) == len(RELEASE_FIELDS):
+                    break
+    return fields
+
+def scan():
+    """ List the files in the lists dir.
+
+    Returns:
+        dict: The size in bytes and the modification time in nanoseconds of
+        each file, by name. This is empty if the lists dir doesn't exist.
+    """
+    files = {}
+    try:
+        with os.scandir(util.get_lists_dir()) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.is_file():
+                    stat = dir_entry.stat()
+                    files[dir_entry.name] = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return files
+
+def releases(files=None):
+    """ Get the release files in the lists dir.
+
+    Each file is only parsed again if it has been modified since it was last
+    read, so repeated calls are cheap.
+
+    Arguments:
+        files (dict): The files in the lists dir, as returned by scan()
+            (default: scan the lists dir).
+
+    Returns:
+        dict: A ReleaseInfo for each URI and suite, by the prefix of its
+        files (as returned by get_prefix()). InRelease files are preferred
+        over Release files.
+    """
+    if files is None:
+        files = scan()
+    lists_dir = util.get_lists_dir()
+    found = {}
+    for suffix in reversed(RELEASE_SUFFIXES):
+        for filename, (_, mtime) in files.items():
+            if not filename.endswith(suffix):
+                continue
+            cached = _RELEASES.get(filename)
+            if not cached or cached[0] != mtime:
+                try:
+                    info = ReleaseInfo(
+                        filename, parse_release(lists_dir / filename)
+                    )
+                except OSError:
+                    continue
+                cached = _RELEASES[filename] = (mtime, info)
+            found[filename[:-len(suffix)] + '_'] = cached[1]
+    for filename in set(_RELEASES) - set(files):
+        del _RELEASES[filename]
+    return found
+
+def lookup(uri, suite, files=None):
+    """ Find the release file for a suite.
+
+    Arguments:
+        uri (str): The URI of the repository.
+        suite (str): The suite.
+        files (dict): The files in the lists dir, as returned by scan()
+            (default: scan the lists dir).
+
+    Returns:
+        ReleaseInfo: The release file, or None if apt hasn't downloaded it.
+    """
+    return releases(files).get(get_prefix(uri, suite))
+
+def validate(source, files=None):
+    """ Check a source's suites and components against the release files.
+
+    Only the URIs apt has already downloaded release files for are checked;
+    nothing is reported for the others.
+
+    Arguments:
+        source (Source): The source to check.
+        files (dict): The files in the lists dir, as returned by scan()
+            (default: scan the lists dir).
+
+    Returns:
+        [str]: A description of each suite or component which wasn't found.
+    """
+    known = releases(files)
+    problems = []
+    for uri in source.uris or []:
+        uri_prefix = get_filename(f'{get_archive_uri(uri)}dists/')
+        uri_suites = sorted(
+            prefix[len(uri_prefix):-1].replace('_', '/')
+            for prefix in known
+            if prefix.startswith(uri_prefix)
+        )
+        for suite in source.suites or []:
+            info = known.get(get_prefix(uri, suite))
+            if info is None:
+                if uri_suites and not suite.endswith('/'):
+                    problems.append(
+                        f'The suite {suite} has not been downloaded from '
+                        f'{uri} (known suites: {", ".join(uri_suites)}).'
+                    )
+                continue
+            for component in source.components or []:
+                if info.components and not info.has_component(component):
+                    problems.append(
+                        f'The suite {suite} at {uri} has no component '
+                        f'{component} (it has: {", ".join(info.components)}).'
+                    )
+    return problems
+
+def get_size(index_targets, files=None):
+    """ Get the space the downloaded files of a source take up on disk.
+
+    Every file downloaded for the suites and components of the targets is
+    counted, whatever its architecture, language or compression.
+
+    Arguments:
+        index_targets ([targets.IndexTarget]): The files fetched for the
+            source, as returned by targets.make_targets().
+        files (dict): The files in the lists dir, as returned by scan()
+            (default: scan the lists dir).
+
+    Returns:
+        int: The size in bytes.
+    """
+    if files is None:
+        files = scan()
+    prefixes = set()
+    for index_target in index_targets:
+        if index_target.target == targets.RELEASE:
+            prefix = get_prefix(index_target.uri, index_target.suite)
+            prefixes.update(prefix + suffix[1:] for suffix in RELEASE_SUFFIXES)
+            prefixes.add(f'{prefix}Release.gpg')
+        else:
+            prefixes.add(get_prefix(
+                index_target.uri, index_target.suite, index_target.component
+            ))
+    prefixes = tuple(prefixes)
+    return sum(
+        size for filename, (size, _) in files.items()
+        if filename.startswith(prefixes)
+    )
@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Declarative manifests of the desired sources configuration.
+"""
+
+import json
+
+from . import index
+from . import legacy_deb
+from . import source
+from . import transaction
+from . import util
+
+FILENAME_FIELD = 'X-Repolib-Filename'
+# Fields of a JSON record which hold lists of strings, and which must be set.
+LIST_FIELDS = ('types', 'uris', 'suites', 'components')
+REQUIRED_FIELDS = ('uris', 'suites')
+PROTECTED_FILES = [util.SYSTEM_FILENAME]
+
+class ManifestError(Exception):
+    """ Exceptions from a manifest. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception with a manifest
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+def load_manifest(manifest_file):
+    """ Load the desired sources from a manifest.
+
+    The manifest is either JSON or DEB822. A JSON manifest is a list of
+    source records in the same format output by ``apt-manage list --format
+    json`` (or an object with a "sources" key holding that list). A DEB822
+    manifest is a series of stanzas as they would appear in a .sources file.
+
+    Each source is saved in the file named by its "filename" (JSON) or
+    X-Repolib-Filename (DEB822) field. If that isn't given, the "repository"
+    field or the name of the source is used to make one. Several sources with
+    the same filename are saved together in that file.
+
+    Arguments:
+        manifest_file (file): An open file with the manifest contents.
+
+    Returns:
+        dict: A dict mapping each filename to a list of source.Source.
+
+    Raises:
+        ManifestError: If the manifest can't be read.
+    """
+    contents = manifest_file.read()
+    if contents.lstrip().startswith(('[', '{')):
+        try:
+            records = json.loads(contents)
+        except ValueError as err:
+            raise ManifestError(f'The manifest is not valid JSON: {err}') from err
+        if isinstance(records, dict):
+            records = records.get('sources', [])
+        stanzas = _load_records(records)
+    else:
+        stanzas = _load_stanzas(contents)
+
+    manifest = {}
+    for filename, stanza in stanzas:
+        if '/' in filename or not filename.endswith(('.sources', '.list')):
+            raise ManifestError(
+                f'{filename} is not a valid filename for a source.'
+            )
+        stanza.filename = filename
+        manifest.setdefault(filename, []).append(stanza)
+    return manifest
+
+def render(filename, stanzas):
+    """ Render the contents of a file containing stanzas.
+
+    Arguments:
+        filename (str): The name of the file. Files ending with .list are
+            rendered in the legacy one-line format. The lines of a .list file
+            have no names of their own, so the name in the header of an
+            existing file is kept.
+        stanzas ([source.Source]): The sources to save in the file.
+
+    Returns:
+        str: The contents of the file.
+    """
+    if filename.endswith('.list'):
+        repo = legacy_deb.LegacyDebSource(filename=filename)
+        repo.sources = stanzas
+        return repo.make_deblines(
+            name=legacy_deb.read_name(util.get_sources_dir() / filename)
+        )
+    return '\n'.join(stanza.dump() for stanza in stanzas)
+
+def plan(manifest, prune=False):
+    """ Work out the changes needed to make the sources dir match a manifest.
+
+    Arguments:
+        manifest (dict): The desired sources, as returned by load_manifest().
+        prune (bool): Whether to remove files which aren't in the manifest.
+            The system sources are never removed.
+
+    Returns:
+        transaction.Transaction: The changes needed, ready to be committed.
+
+    Raises:
+        ManifestError: If a source in the manifest can't be saved.
+    """
+    changes = transaction.Transaction()
+    for filename, stanzas in manifest.items():
+        try:
+            changes.write(filename, render(filename, stanzas))
+        except (source.SourceError, IndexError, TypeError) as err:
+            raise ManifestError(f'Could not save {filename}: {err}') from err
+
+    if prune:
+        for entry in index.SourcesIndex().entries():
+            if entry.filename in manifest or entry.filename in PROTECTED_FILES:
+                continue
+            changes.remove(entry.filename)
+    return changes
+
+def _load_records(records):
+    """ Load sources from a list of JSON records. """
+    for record in records:
+        if not isinstance(record, dict):
+            raise ManifestError(f'{record!r} is not a valid source.')
+        _check_record(record)
+        stanza = source.Source()
+        try:
+            stanza.load_from_dict(record)
+        except (ValueError, AttributeError, TypeError) as err:
+            raise ManifestError(f'{record!r} is not a valid source: {err}') from err
+        filename = record.get('filename')
+        if not filename and record.get('repository'):
+            filename = f'{record["repository"]}.sources'
+        yield _get_filename(stanza, filename), stanza
+
+def _check_record(record):
+    """ Make sure the fields of a JSON record have the right types. """
+    for field in LIST_FIELDS:
+        value = record.get(field)
+        if value is not None and not (
+                isinstance(value, list)
+                and all(isinstance(item, str) for item in value)):
+            raise ManifestError(
+                f'{record!r} is not a valid source: {field} must be a list '
+                'of strings.'
+            )
+    for field in REQUIRED_FIELDS:
+        if not record.get(field):
+            raise ManifestError(
+                f'{record!r} is not a valid source: it has no {field}.'
+            )
+    if not isinstance(record.get('options', {}), (dict, type(None))):
+        raise ManifestError(
+            f'{record!r} is not a valid source: options must be an object.'
+        )
+
+def _load_stanzas(contents):
+    """ Load sources from DEB822 data. """
+    for stanza in source.Source.iter_paragraphs(contents):
+        filename = stanza.get(FILENAME_FIELD)
+        if filename:
+            del stanza[FILENAME_FIELD]
+        yield _get_filename(stanza, filename), stanza
+
+def _get_filename(stanza, filename=None):
+    """ Get the filename for a stanza, making one from its name if needed. """
+    if filename:
+        return filename
+    if not stanza.name:
+        raise ManifestError(
+            f'The source for {stanza.uris} has no filename or name.'
+        )
+    return f'{stanza.name.translate(util.CLEAN_CHARS)}.sources'
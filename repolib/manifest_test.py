@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import io
+import json
+import logging
+import shutil
+import unittest
+
+from . import index
+from . import manifest
+from . import transaction
+from . import util
+from .command.listall import iter_records
+
+class ManifestTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'system.sources', mode='w') as source_file:
+            source_file.write(
+                'X-Repolib-Name: System\n'
+                'Enabled: yes\n'
+                'Types: deb\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal\n'
+                'Components: main\n'
+            )
+        with open(self.sources_dir / 'old.list', mode='w') as list_file:
+            list_file.write('deb http://example.com/old focal main\n')
+
+    def test_load_json(self):
+        records = [
+            {
+                'name': 'Example', 'filename': 'example.list',
+                'types': ['deb'], 'uris': ['http://example.com/ubuntu'],
+                'suites': ['focal'], 'components': ['main'],
+                'options': {'arch': ['amd64']}
+            },
+            {
+                'name': 'Other Repo', 'enabled': False,
+                'types': ['deb', 'deb-src'], 'uris': ['http://example.com/other'],
+                'suites': ['focal'], 'components': ['main']
+            }
+        ]
+        desired = manifest.load_manifest(io.StringIO(json.dumps(records)))
+        self.assertEqual(sorted(desired), ['Other_Repo.sources', 'example.list'])
+        self.assertEqual(
+            manifest.render('example.list', desired['example.list']),
+            '## Added/managed by repolib ##\n'
+            '#\n'
+            '## X-Repolib-Name: Example\n'
+            'deb [arch=amd64] http://example.com/ubuntu focal main\n'
+        )
+
+    def test_load_deb822(self):
+        desired = manifest.load_manifest(io.StringIO(
+            'X-Repolib-Name: Example\n'
+            'X-Repolib-Filename: example.sources\n'
+            'Types: deb\n'
+            'URIs: http://example.com/ubuntu\n'
+            'Suites: focal\n'
+            'Components: main\n'
+            '\n'
+            'X-Repolib-Name: Example Source\n'
+            'X-Repolib-Filename: example.sources\n'
+            'Types: deb-src\n'
+            'URIs: http://example.com/ubuntu\n'
+            'Suites: focal\n'
+            'Components: main\n'
+        ))
+        self.assertEqual(list(desired), ['example.sources'])
+        self.assertEqual(len(desired['example.sources']), 2)
+        self.assertNotIn('X-Repolib-Filename', desired['example.sources'][0])
+
+    def test_invalid_filename(self):
+        with self.assertRaises(manifest.ManifestError):
+            manifest.load_manifest(io.StringIO(
+                '[{"name": "x", "filename": "../x.sources"}]'
+            ))
+
+    def test_invalid_records(self):
+        for record in (
+                {'name': 'x', 'uris': 'http://a', 'suites': ['focal']},
+                {'name': 'x', 'uris': ['http://a'], 'suites': [5]},
+                {'name': 'x', 'uris': ['http://a'], 'suites': ['focal'], 'options': []},
+                {'name': 'x', 'suites': ['focal']},
+                {'name': 'x', 'uris': ['http://a']}):
+            with self.subTest(record=record):
+                with self.assertRaises(manifest.ManifestError) as context:
+                    manifest.load_manifest(io.StringIO(json.dumps([record])))
+                self.assertIn(repr(record), str(context.exception))
+
+    def test_plan(self):
+        with open(self.sources_dir / 'system.sources') as source_file:
+            system = source_file.read()
+        desired = manifest.load_manifest(io.StringIO(
+            system.replace('Name: System', 'Name: System\nX-Repolib-Filename: system.sources')
+            + '\nX-Repolib-Name: new\nTypes: deb\n'
+            'URIs: http://example.com/new\nSuites: focal\nComponents: main\n'
+        ))
+        changes = manifest.plan(desired, prune=True)
+        self.assertEqual(changes.changes(), [
+            (transaction.UNCHANGED, 'system.sources'),
+            (transaction.ADDED, 'new.sources'),
+            (transaction.REMOVED, 'old.list'),
+        ])
+
+        changes = manifest.plan({}, prune=True)
+        self.assertEqual(changes.changes(), [(transaction.REMOVED, 'old.list')])
+
+    def test_list_apply(self):
+        """ Applying the output of list changes nothing. """
+        # Files not written by repolib are normalized the first time.
+        (self.sources_dir / 'old.list').unlink()
+        with open(self.sources_dir / 'foo.list', mode='w') as list_file:
+            list_file.write(
+                '## Added/managed by repolib ##\n'
+                '#\n'
+                '## X-Repolib-Name: Foo Repo\n'
+                'deb http://example.com/foo focal main\n'
+                '# deb-src http://example.com/foo focal main\n'
+            )
+        sources = index.SourcesIndex()
+        records = list(iter_records(
+            logging.getLogger('test'), sources, sources.entries()
+        ))
+        desired = manifest.load_manifest(io.StringIO(json.dumps(records)))
+        self.assertEqual(
+            manifest.plan(desired, prune=True).changes(),
+            [(transaction.UNCHANGED, filename) for filename in sorted(desired)]
+        )
+        self.assertEqual(sorted(desired), ['foo.list', 'system.sources'])
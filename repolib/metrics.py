@@ -0,0 +1,275 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Export metrics about RepoLib operations for the Prometheus textfile collector.
+
+Metrics are enabled by setting the REPOLIB_METRICS_DIR environment variable
+to the textfile collector directory of node_exporter. While enabled, metrics
+are only gathered in memory; when the process exits, they are added to the
+totals in repolib.prom in that directory, which is replaced atomically. When
+disabled, recording a metric does nothing.
+"""
+
+import atexit
+import contextlib
+import fcntl
+import os
+import re
+import threading
+import time
+
+ENV_VAR = 'REPOLIB_METRICS_DIR'
+FILENAME = 'repolib.prom'
+
+COUNTER = 'counter'
+HISTOGRAM = 'histogram'
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    'repolib_operations_total': (
+        COUNTER, 'Operations run, by command.'
+    ),
+    'repolib_operation_duration_seconds': (
+        HISTOGRAM, 'Time taken by operations, by command.'
+    ),
+    'repolib_bytes_written_total': (
+        COUNTER, 'Bytes written to files in the sources dir.'
+    ),
+    'repolib_files_written_total': (
+        COUNTER, 'Files written in the sources dir.'
+    ),
+    'repolib_files_skipped_total': (
+        COUNTER, 'Files not rewritten because they were unchanged.'
+    ),
+    'repolib_files_removed_total': (
+        COUNTER, 'Files removed from the sources dir.'
+    ),
+    'repolib_launchpad_fetch_duration_seconds': (
+        HISTOGRAM, 'Time taken to fetch data from Launchpad, including retries.'
+    ),
+    'repolib_launchpad_fetch_retries_total': (
+        COUNTER, 'Retried requests to Launchpad.'
+    ),
+    'repolib_launchpad_fetch_errors_total': (
+        COUNTER, 'Requests to Launchpad which failed after any retries.'
+    ),
+    'repolib_key_import_duration_seconds': (
+        HISTOGRAM, 'Time taken to import signing keys.'
+    ),
+}
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)$')
+
+ENABLED = False
+_DIRECTORY = None
+_SAMPLES = {}
+_LOCK = threading.Lock()
+
+def enable(directory):
+    """ Enable metrics for the rest of the process.
+
+    Arguments:
+        directory (str): The textfile collector directory to write to.
+    """
+    # pylint: disable=global-statement
+    # Metrics are deliberately process-wide.
+    global ENABLED, _DIRECTORY
+    if not ENABLED:
+        atexit.register(flush)
+    ENABLED = True
+    _DIRECTORY = directory
+
+def inc(name, value=1, **labels):
+    """ Increase a counter.
+
+    Arguments:
+        name (str): The name of the counter, from METRICS.
+        value (float): The amount to increase it by.
+        labels: Labels for the sample.
+    """
+    if not ENABLED:
+        return
+    key = _make_key(name, labels)
+    with _LOCK:
+        _SAMPLES[key] = _SAMPLES.get(key, 0) + value
+
+def observe(name, value, **labels):
+    """ Record an observation in a histogram.
+
+    Arguments:
+        name (str): The name of the histogram, from METRICS.
+        value (float): The value observed (e.g. a duration in seconds).
+        labels: Labels for the sample.
+    """
+    if not ENABLED:
+        return
+    # Every bucket is recorded, even if unchanged, so they stay in order.
+    for bucket in BUCKETS:
+        inc(f'{name}_bucket', int(value <= bucket), le=repr(bucket), **labels)
+    inc(f'{name}_bucket', le='+Inf', **labels)
+    inc(f'{name}_sum', value, **labels)
+    inc(f'{name}_count', **labels)
+
+@contextlib.contextmanager
+def _timer(name, labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+def timer(name, **labels):
+    """ Time a block of code, recording the duration in a histogram.
+
+    Arguments:
+        name (str): The name of the histogram, from METRICS.
+        labels: Labels for the sample.
+
+    Returns:
+        A context manager timing the block, or a no-op one if metrics are
+        disabled.
+    """
+    if not ENABLED:
+        return contextlib.nullcontext()
+    return _timer(name, labels)
+
+def flush():
+    """ Add the metrics gathered by this process to the totals on disk.
+
+    The file is locked while it is updated, so that concurrent processes don't
+    lose each other's metrics, and it is replaced atomically so the collector
+    never reads a partial file. Errors are ignored, as metrics should never
+    cause an operation to fail.
+
+    Returns:
+        bool: True if the file was updated, otherwise False.
+    """
+    if not ENABLED or not _SAMPLES:
+        return False
+    with _LOCK:
+        pending = dict(_SAMPLES)
+        _SAMPLES.clear()
+
+    path = os.path.join(_DIRECTORY, FILENAME)
+    try:
+        with open(os.path.join(_DIRECTORY, f'.{FILENAME}.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            samples = read_samples(path)
+            for key, value in pending.items():
+                samples[key] = samples.get(key, 0) + value
+            temp_path = os.path.join(_DIRECTORY, f'.{FILENAME}.{os.getpid()}')
+            with open(temp_path, mode='w') as temp_file:
+                temp_file.write(render(samples))
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+    except OSError:
+        # Keep the samples, in case a later flush succeeds.
+        with _LOCK:
+            for key, value in pending.items():
+                _SAMPLES[key] = _SAMPLES.get(key, 0) + value
+        return False
+    return True
+
+def read_samples(path):
+    """ Read the samples from a metrics file.
+
+    Arguments:
+        path (str): The path to the file.
+
+    Returns:
+        dict: The value of each sample, keyed by the metric name and labels
+        (e.g. 'repolib_operations_total{command="add"}'), in file order. This
+        is empty if the file doesn't exist.
+    """
+    samples = {}
+    try:
+        with open(path, mode='r') as metrics_file:
+            for line in metrics_file:
+                match = SAMPLE_RE.match(line.strip())
+                if not match or line.startswith('#'):
+                    continue
+                try:
+                    samples[match[1] + (match[2] or '')] = float(match[3])
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return samples
+
+def render(samples):
+    """ Render samples in the Prometheus text format.
+
+    Samples are grouped under the metric they belong to, in the order of
+    METRICS. Samples of unknown metrics are dropped.
+
+    Arguments:
+        samples (dict): The samples, as returned by read_samples().
+
+    Returns:
+        str: The text to write.
+    """
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        family = [
+            (key, value) for key, value in samples.items()
+            if _get_family(key) == name
+        ]
+        if not family:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for key, value in family:
+            value = float(value)
+            lines.append(f'{key} {int(value) if value.is_integer() else value!r}')
+    return '\n'.join(lines) + '\n'
+
+def _get_family(key):
+    name = key.split('{', 1)[0]
+    if name in METRICS:
+        return name
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+            return name[:-len(suffix)]
+    return None
+
+def _make_key(name, labels):
+    if not labels:
+        return name
+    # The le label goes last, as is conventional for histogram buckets.
+    items = sorted(labels.items(), key=lambda item: (item[0] == 'le', item[0]))
+    label_text = ','.join(
+        f'{key}="{_escape(str(value))}"' for key, value in items
+    )
+    return f'{name}{{{label_text}}}'
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+if os.environ.get(ENV_VAR):
+    enable(os.environ[ENV_VAR])
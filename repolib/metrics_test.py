@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from . import metrics
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.enabled = metrics.ENABLED
+        self.old_directory = metrics._DIRECTORY # pylint: disable=protected-access
+        metrics.enable(self.directory)
+        self.path = os.path.join(self.directory, metrics.FILENAME)
+
+    def tearDown(self):
+        # pylint: disable=protected-access
+        metrics._SAMPLES.clear()
+        metrics.ENABLED = self.enabled
+        metrics._DIRECTORY = self.old_directory
+        shutil.rmtree(self.directory)
+
+    def test_counter(self):
+        metrics.inc('repolib_operations_total', command='add')
+        metrics.inc('repolib_operations_total', command='add')
+        metrics.inc('repolib_bytes_written_total', 150)
+        self.assertTrue(metrics.flush())
+        samples = metrics.read_samples(self.path)
+        self.assertEqual(samples['repolib_operations_total{command="add"}'], 2)
+        self.assertEqual(samples['repolib_bytes_written_total'], 150)
+
+        metrics.inc('repolib_operations_total', command='add')
+        self.assertTrue(metrics.flush())
+        samples = metrics.read_samples(self.path)
+        self.assertEqual(samples['repolib_operations_total{command="add"}'], 3)
+        self.assertEqual(samples['repolib_bytes_written_total'], 150)
+        self.assertFalse(metrics.flush())
+
+    def test_histogram(self):
+        metrics.observe('repolib_key_import_duration_seconds', 0.3)
+        metrics.observe('repolib_key_import_duration_seconds', 20)
+        metrics.flush()
+        samples = metrics.read_samples(self.path)
+        name = 'repolib_key_import_duration_seconds'
+        self.assertEqual(samples[f'{name}_bucket{{le="0.25"}}'], 0)
+        self.assertEqual(samples[f'{name}_bucket{{le="0.5"}}'], 1)
+        self.assertEqual(samples[f'{name}_bucket{{le="+Inf"}}'], 2)
+        self.assertEqual(samples[f'{name}_count'], 2)
+        self.assertAlmostEqual(samples[f'{name}_sum'], 20.3)
+
+        with open(self.path) as metrics_file:
+            lines = metrics_file.read().splitlines()
+        self.assertEqual(lines[0], f'# HELP {name} Time taken to import signing keys.')
+        self.assertEqual(lines[1], f'# TYPE {name} histogram')
+        self.assertEqual(lines[2], f'{name}_bucket{{le="0.005"}} 0')
+
+    def test_disabled(self):
+        metrics.ENABLED = False
+        metrics.inc('repolib_operations_total', command='add')
+        self.assertFalse(metrics.flush())
+        self.assertFalse(os.path.exists(self.path))
@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Pick the fastest of several mirrors, and point the sources at it.
+"""
+
+from . import probe
+from . import util
+from .deb import DebLineSourceException
+from .index import SourcesIndex
+from .manifest import render
+from .source import SourceError
+from .transaction import Transaction
+from .uritrie import URITrie
+
+# How far behind the newest candidate a mirror's release file may be.
+DEFAULT_MAX_LAG = 24 * 60 * 60
+
+class MirrorError(Exception):
+    """ Exceptions from choosing a mirror. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception while choosing a mirror
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+def select_fastest(
+        candidates,
+        suite,
+        workers=probe.DEFAULT_WORKERS,
+        timeout=probe.DEFAULT_TIMEOUT,
+        max_lag=DEFAULT_MAX_LAG):
+    """ Measure several mirrors of the same archive, and pick the fastest.
+
+    The candidates are probed concurrently. Mirrors which fail, serve an
+    expired release file, or whose release file is more than max_lag seconds
+    older than the newest one (because they have fallen out of sync) aren't
+    picked.
+
+    Arguments:
+        candidates ([str]): The URIs of the mirrors.
+        suite (str): The suite to request from each mirror.
+        workers (int): The most mirrors to request at once.
+        timeout (float): The seconds to wait for each mirror.
+        max_lag (float): The most seconds a mirror may be behind.
+
+    Returns:
+        (str, [probe.ProbeResult]): The normalized URI of the fastest mirror,
+        and the result for each candidate.
+
+    Raises:
+        MirrorError: If none of the mirrors is usable.
+    """
+    endpoints = [(util.normalize_uri(uri), suite) for uri in candidates]
+    results = probe.probe(endpoints, workers=workers, timeout=timeout)
+    usable = [
+        result for result in results if result.ok and not result.is_expired()
+    ]
+    dates = [result.date for result in usable if result.date]
+    if dates:
+        newest = max(dates)
+        usable = [
+            result for result in usable
+            if not result.date
+            or (newest - result.date).total_seconds() <= max_lag
+        ]
+    if not usable:
+        raise MirrorError(f'None of the mirrors could serve {suite}.')
+    return min(usable, key=lambda result: result.latency).uri, results
+
+def rewrite_uri(uri, rules):
+    """ Rewrite a URI using the longest matching prefix rule.
+
+    A prefix only matches at a path boundary, so http://example.com/ubuntu
+    doesn't match http://example.com/ubuntu-ports.
+
+    Arguments:
+        uri (str): The URI to rewrite.
+        rules (dict or uritrie.URITrie): The replacement for each URI prefix.
+
+    Returns:
+        str: The rewritten URI, or the URI unchanged if no rule matches.
+    """
+    if not isinstance(rules, URITrie):
+        rules = URITrie(rules)
+    return rules.rewrite(uri)
+
+def rewrite_sources(rules, index=None):
+    """ Rewrite the URIs of every source matching a prefix rule.
+
+    The sources dir is read in a single pass, and each changed file is
+    recorded in a transaction, so all of them can be committed together.
+    Both DEB822 and legacy files are rewritten. If a source ends up with the
+    same URI twice, the second is dropped. The rules are kept in a trie, so
+    each URI is matched in time proportional to its length, however many
+    rules there are.
+
+    Arguments:
+        rules (dict or uritrie.URITrie): The replacement for each URI prefix.
+        index (SourcesIndex): The index to read from (default: the sources
+            dir).
+
+    Returns:
+        Transaction: The changes to make.
+
+    Raises:
+        SourceError: If a changed file can't be read or saved.
+    """
+    if not isinstance(rules, URITrie):
+        rules = URITrie(rules)
+    index = index or SourcesIndex()
+    changes = Transaction()
+    for entry in index.entries():
+        try:
+            stanzas = list(index.stanzas(entry))
+        except (DebLineSourceException, ValueError) as err:
+            raise SourceError(f'Could not read {entry.filename}: {err}') from err
+        changed = False
+        for stanza in stanzas:
+            uris = stanza.uris or []
+            new_uris = list(dict.fromkeys(rules.rewrite(uri) for uri in uris))
+            if new_uris != uris:
+                stanza.uris = new_uris
+                changed = True
+        if changed:
+            changes.write(entry.filename, render(entry.filename, stanzas))
+    return changes
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import shutil
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import mirrors
+from . import util
+
+def make_handler(date, delay=0):
+    class MirrorHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            time.sleep(delay)
+            if self.path != '/ubuntu/dists/focal/InRelease':
+                self.send_error(404)
+                return
+            body = f'Suite: focal\nDate: {date}\n'.encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return MirrorHandler
+
+class MirrorsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = []
+        self.uris = {}
+        for name, date, delay in (
+                ('slow', 'Thu, 23 Apr 2020 17:33:17 UTC', 0.3),
+                ('fast', 'Thu, 23 Apr 2020 17:33:17 UTC', 0),
+                ('stale', 'Mon, 20 Apr 2020 17:33:17 UTC', 0)):
+            server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(date, delay))
+            thread = threading.Thread(
+                target=server.serve_forever, kwargs={'poll_interval': 0.05}
+            )
+            thread.start()
+            self.servers.append((server, thread))
+            self.uris[name] = f'http://127.0.0.1:{server.server_port}/ubuntu'
+
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'example.sources', mode='w') as source_file:
+            source_file.write(
+                'X-Repolib-Name: Example\n'
+                'Types: deb\n'
+                f'URIs: {self.uris["slow"]}/ {self.uris["stale"]}\n'
+                'Suites: focal\n'
+                'Components: main\n'
+            )
+        with open(self.sources_dir / 'legacy.list', mode='w') as list_file:
+            list_file.write(
+                f'deb {self.uris["slow"]}-ports focal main\n'
+                f'deb {self.uris["stale"]}/pool-extra focal main\n'
+            )
+
+    def tearDown(self):
+        for server, thread in self.servers:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    def test_select_fastest(self):
+        winner, results = mirrors.select_fastest(
+            [self.uris['slow'], self.uris['fast'], self.uris['stale']], 'focal'
+        )
+        self.assertEqual(winner, self.uris['fast'])
+        self.assertEqual(len(results), 3)
+
+        winner, _ = mirrors.select_fastest(
+            [self.uris['slow'], self.uris['stale']], 'focal'
+        )
+        self.assertEqual(winner, self.uris['slow'])
+
+        with self.assertRaises(mirrors.MirrorError):
+            mirrors.select_fastest([self.uris['fast']], 'missing')
+
+    def test_rewrite_uri(self):
+        rules = {'http://example.com': 'http://a', 'http://example.com/ubuntu': 'http://b/'}
+        self.assertEqual(mirrors.rewrite_uri('http://example.com/ubuntu/', rules), 'http://b')
+        self.assertEqual(mirrors.rewrite_uri('http://example.com/debian', rules), 'http://a/debian')
+        self.assertEqual(
+            mirrors.rewrite_uri('http://example.community/', rules),
+            'http://example.community/'
+        )
+
+    def test_rewrite_sources(self):
+        changes = mirrors.rewrite_sources({
+            self.uris['slow']: self.uris['fast'],
+            self.uris['stale']: self.uris['fast'],
+        })
+        self.assertIn(f'URIs: {self.uris["fast"]}\n', changes.writes['example.sources'])
+        self.assertIn(f'deb {self.uris["slow"]}-ports focal main', changes.writes['legacy.list'])
+        self.assertIn(
+            f'deb {self.uris["fast"]}/pool-extra focal main',
+            changes.writes['legacy.list']
+        )
+        changes.commit()
+        self.assertEqual(mirrors.rewrite_sources({self.uris['slow']: self.uris['fast']}).writes, {})
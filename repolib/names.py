@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+A sidecar index mapping repository names to the files they are saved in.
+"""
+
+import json
+import os
+
+from . import util
+
+CACHE_NAME = 'apt-manage-names'
+NAME_FIELD = 'x-repolib-name'
+
+def get_cache_path(create=True):
+    """ Get the path to the name index.
+
+    Arguments:
+        create (bool): Whether to create the cache dir if it doesn't exist.
+
+    Returns:
+        pathlib.Path: The path to the index file.
+    """
+    return util.get_cache_dir(create=create) / CACHE_NAME
+
+def get_dir_mtime():
+    """ Get the modification time of the sources dir.
+
+    This changes whenever a file is added to, removed from or renamed within
+    the sources dir.
+
+    Returns:
+        int: The modification time, in nanoseconds.
+    """
+    return os.stat(util.get_sources_dir()).st_mtime_ns
+
+def scan():
+    """ Find the name of every source in the sources dir.
+
+    This reads the files directly rather than parsing them into sources, as
+    only the names are needed. Names are read from the X-Repolib-Name field of
+    each stanza in DEB822 files, and from the ``## X-Repolib-Name:`` header of
+    legacy files. If more than one source has the same name, the first one
+    (sorted by filename) is kept.
+
+    Returns:
+        dict: A mapping of each name to a [filename, stanza] pair, where
+        stanza is the position of the source within the file.
+    """
+    names = {}
+    for path in sorted(util.get_sources_dir().iterdir()):
+        if path.suffix not in ('.sources', '.list') or not path.is_file():
+            continue
+        with open(path, mode='r') as source_file:
+            if path.suffix == '.sources':
+                stanza = 0
+                in_stanza = False
+                for line in source_file:
+                    if not line.strip():
+                        if in_stanza:
+                            stanza += 1
+                        in_stanza = False
+                        continue
+                    if line.startswith('#'):
+                        continue
+                    in_stanza = True
+                    key, _, value = line.partition(':')
+                    if key.strip().lower() == NAME_FIELD and value.strip():
+                        names.setdefault(value.strip(), [path.name, stanza])
+            else:
+                for line in source_file:
+                    key, _, value = line.lstrip('#').partition(':')
+                    if key.strip().lower() == NAME_FIELD and value.strip():
+                        names.setdefault(value.strip(), [path.name, 0])
+                        break
+    return names
+
+def update_cache():
+    """ Regenerate the name index from the sources dir.
+
+    The index is a JSON file holding the modification time of the sources dir
+    when it was generated, along with the names from scan(). If the index
+    can't be written (e.g. when not running as root), it is left as it was.
+
+    Returns:
+        bool: True if the index was updated, otherwise False.
+    """
+    try:
+        mtime = get_dir_mtime()
+        data = {'mtime': mtime, 'names': scan()}
+        write_cache(data)
+    except OSError:
+        return False
+    return True
+
+def write_cache(data):
+    """ Atomically write the name index.
+
+    Arguments:
+        data (dict): The index data to write.
+    """
+    cache_path = get_cache_path()
+    temp_path = cache_path.with_name(f'.{CACHE_NAME}~')
+    with open(temp_path, mode='w') as cache_file:
+        json.dump(data, cache_file)
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, cache_path)
+
+def load(save=True):
+    """ Load the name index, scanning the sources dir if it is out of date.
+
+    The index is out of date if it is missing or unreadable, or if the sources
+    dir has been modified since it was generated (e.g. by another tool). The
+    index is then rebuilt, and saved if the cache dir is writable, so later
+    lookups don't scan again. Changes made to a file in place are recorded by
+    calling update_cache() when changes are committed.
+
+    Arguments:
+        save (bool): Whether to save a rebuilt index. Dry runs pass False, so
+            they don't touch the filesystem.
+
+    Returns:
+        dict: The names, as returned by scan().
+    """
+    mtime = None
+    try:
+        mtime = get_dir_mtime()
+        with open(get_cache_path(create=False), mode='r') as cache_file:
+            data = json.load(cache_file)
+        if data['mtime'] == mtime:
+            return data['names']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    names = scan()
+    if save and mtime is not None:
+        try:
+            write_cache({'mtime': mtime, 'names': names})
+        except OSError:
+            pass
+    return names
+
+def lookup(name, save=True):
+    """ Find the file a source with a given name is saved in.
+
+    Arguments:
+        name (str): The name of the source (its X-Repolib-Name).
+        save (bool): Whether to save the index if it has to be rebuilt (see
+            load()).
+
+    Returns:
+        (str, int): The filename and the position of the source within the
+        file, or None if no source has that name.
+    """
+    location = load(save=save).get(name)
+    if location is None:
+        return None
+    filename, stanza = location
+    return filename, stanza
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import os
+import shutil
+import unittest
+
+from . import index
+from . import names
+from . import util
+
+class NamesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'example.sources', mode='w') as source_file:
+            source_file.write(
+                'X-Repolib-Name: Example\n'
+                'Types: deb\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal\n'
+                'Components: main\n'
+                '\n'
+                'X-Repolib-Name: Example Updates\n'
+                'Types: deb\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal-updates\n'
+                'Components: main\n'
+            )
+        with open(self.sources_dir / 'legacy.list', mode='w') as list_file:
+            list_file.write(
+                '## Added/managed by repolib ##\n'
+                '#\n'
+                '## X-Repolib-Name: Legacy Repo\n'
+                'deb http://example.com/legacy focal main\n'
+            )
+
+    def test_scan(self):
+        self.assertEqual(names.scan(), {
+            'Example': ['example.sources', 0],
+            'Example Updates': ['example.sources', 1],
+            'Legacy Repo': ['legacy.list', 0],
+        })
+
+    def test_lookup(self):
+        self.assertEqual(names.lookup('Example Updates'), ('example.sources', 1))
+        self.assertIsNone(names.lookup('Missing'))
+
+    def test_self_heal(self):
+        self.assertTrue(names.update_cache())
+        os.remove(self.sources_dir / 'legacy.list')
+        self.assertIsNone(names.lookup('Legacy Repo'))
+
+    def test_get_entry(self):
+        entry = index.SourcesIndex().get_entry('Legacy Repo')
+        self.assertEqual(entry.name, 'legacy')
+        self.assertEqual(entry.filename, 'legacy.list')
+        self.assertIsNone(entry.stanza)
+        with self.assertRaises(index.SourcesIndexError):
+            index.SourcesIndex().get_entry('Missing')
+
+    def test_find_stanza(self):
+        sources_index = index.SourcesIndex()
+        entry = sources_index.get_entry('Example Updates')
+        self.assertEqual(entry.filename, 'example.sources')
+        self.assertEqual(entry.stanza, 1)
+        stanzas = list(sources_index.stanzas(entry))
+        self.assertEqual(sources_index.find_stanza(entry, stanzas), 1)
+        # The position is checked, in case the file changed since.
+        self.assertEqual(sources_index.find_stanza(entry, stanzas[::-1]), 0)
+        with self.assertRaises(index.SourcesIndexError):
+            sources_index.find_stanza(entry, stanzas[:1])
+
+        entry = sources_index.get_entry('example')
+        self.assertIsNone(sources_index.find_stanza(entry, stanzas))
+
+    def test_load_dry_run(self):
+        """ Looking up names in a dry run never writes the index. """
+        cache_dir = util.get_cache_dir()
+        shutil.rmtree(cache_dir)
+        self.assertEqual(
+            names.lookup('Example', save=False), ('example.sources', 0)
+        )
+        sources = index.SourcesIndex(dry_run=True)
+        self.assertEqual(sources.get_entry('Example Updates').stanza, 1)
+        self.assertFalse(cache_dir.exists())
+        self.assertTrue(names.update_cache())
+        self.assertTrue(names.get_cache_path().exists())
+
+    def test_heal(self):
+        """ The index is saved again after another tool changes the dir. """
+        self.assertTrue(names.update_cache())
+        with open(self.sources_dir / 'other.sources', mode='w') as source_file:
+            source_file.write('X-Repolib-Name: Other\nTypes: deb\n')
+        self.assertEqual(names.lookup('Other'), ('other.sources', 0))
+        with open(names.get_cache_path()) as cache_file:
+            self.assertIn('Other', cache_file.read())
+        self.assertEqual(names.load(), names.scan())
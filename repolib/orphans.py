@@ -0,0 +1,268 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Find downloaded lists and keyrings which no configured source uses.
+"""
+
+import os
+import re
+from pathlib import Path
+
+from . import lists
+from . import util
+from .deb import DebLine, DebLineSourceException
+from .index import SourcesIndex, SourcesIndexError
+from .source import SourceError
+
+# Files kept by hash within a suite, rather than by their own name.
+BY_HASH_PREFIX = 'by-hash_'
+
+# PPA URIs, and the keyrings add-apt-repository saves their keys in.
+PPA_RE = re.compile(
+    r'^https?://ppa\.launchpad(?:content)?\.net/([^/]+)/([^/]+)/ubuntu$'
+)
+PPA_KEYRING_RE = re.compile(r'^[^/]+-ubuntu-[^/]+\.gpg$')
+
+class OrphansError(Exception):
+    """ Exceptions from finding orphaned files. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception finding orphaned files
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+class Orphans:
+    """ The files no configured source uses.
+
+    Attributes:
+        lists (dict): The size of each orphaned file in the lists dir, by
+            path.
+        keyrings (dict): The size of each orphaned keyring, by path.
+    """
+
+    def __init__(self):
+        self.lists = {}
+        self.keyrings = {}
+
+    @property
+    def paths(self):
+        """ [pathlib.Path]: Every orphaned file, sorted. """
+        return sorted(list(self.lists) + list(self.keyrings))
+
+    @property
+    def size(self):
+        """ int: The total size of the orphaned files, in bytes. """
+        return sum(self.lists.values()) + sum(self.keyrings.values())
+
+    def remove(self):
+        """ Delete the orphaned files.
+
+        Returns:
+            [pathlib.Path]: The files which were deleted. Files which were
+            already gone are skipped.
+        """
+        removed = []
+        for path in self.paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            removed.append(path)
+        return removed
+
+def iter_sources(index=None, skip_errors=False):
+    """ Iterate over every configured source, including sources.list.
+
+    Arguments:
+        index (SourcesIndex): The index to read from (default: the sources
+            dir).
+        skip_errors (bool): Skip files which can't be read, rather than
+            raising an error.
+
+    Yields:
+        source.Source: Each source.
+
+    Raises:
+        OrphansError: If a file can't be read, unless skip_errors is set.
+            Skipping it would make the files its sources use look orphaned.
+    """
+    index = index or SourcesIndex()
+    for entry in index.entries():
+        try:
+            stanzas = list(index.stanzas(entry))
+        except (
+                DebLineSourceException,
+                SourceError,
+                SourcesIndexError,
+                ValueError) as err:
+            if skip_errors:
+                continue
+            raise OrphansError(
+                f'Could not read {entry.filename}: {err}'
+            ) from err
+        yield from stanzas
+
+    try:
+        with open(util.SOURCES_LIST, mode='r') as sources_list:
+            lines = [line for line in sources_list if util.validate_debline(line)]
+    except FileNotFoundError:
+        return
+    for line in lines:
+        try:
+            yield DebLine(line.strip())
+        except (DebLineSourceException, ValueError) as err:
+            if skip_errors:
+                continue
+            raise OrphansError(
+                f'Could not read {util.SOURCES_LIST}: {err}'
+            ) from err
+
+def find_orphans(index=None):
+    """ Find the lists and keyrings which no configured source uses.
+
+    The prefixes of the files apt downloads for every enabled source are
+    collected first. Then each directory is scanned once, and any file none
+    of them accounts for is orphaned. Files of components which aren't
+    configured are orphaned, but every file of the suite itself (such as
+    its release or Contents files) is kept. Lists of disabled sources are
+    orphaned too, as apt ignores them.
+
+    Keyrings are checked in two places: files in the keyrings dir which no
+    source's Signed-By option names, and PPA keyrings in the trusted.gpg.d
+    dir (as added by add-apt-repository) for PPAs which are no longer
+    configured. Other keys in trusted.gpg.d are trusted for every source,
+    so they are never orphaned.
+
+    Arguments:
+        index (SourcesIndex): The index to read from (default: the sources
+            dir).
+
+    Returns:
+        Orphans: The orphaned files.
+
+    Raises:
+        OrphansError: If any of the configured sources can't be read.
+    """
+    release_prefixes = set()
+    component_prefixes = set()
+    keyrings = set()
+    ppa_keyrings = set()
+    for source in iter_sources(index):
+        options = source.options or {}
+        for key, value in options.items():
+            if key.lower() != 'signed-by':
+                continue
+            for signed_by in value.split():
+                if signed_by.startswith('/'):
+                    keyrings.add(os.path.normpath(signed_by))
+        for uri in source.uris or []:
+            ppa = PPA_RE.match(util.normalize_uri(uri))
+            if ppa:
+                ppa_keyrings.add(f'{ppa.group(1)}-ubuntu-{ppa.group(2)}.gpg')
+        if source.enabled == util.AptSourceEnabled.FALSE:
+            continue
+        for uri in source.uris or []:
+            for suite in source.suites or []:
+                if suite.endswith('/'):
+                    component_prefixes.add(lists.get_prefix(uri, suite))
+                    continue
+                release_prefixes.add(lists.get_prefix(uri, suite))
+                for component in source.components or []:
+                    component_prefixes.add(
+                        lists.get_prefix(uri, suite, component)
+                    )
+
+    orphans = Orphans()
+    lists_dir = util.get_lists_dir()
+    for filename, (size, _) in lists.scan().items():
+        if '_' not in filename:
+            continue
+        if not is_referenced(filename, release_prefixes, component_prefixes):
+            orphans.lists[lists_dir / filename] = size
+
+    for path, size in scan_dir(util.KEYRINGS_DIR).items():
+        if str(path) not in keyrings:
+            orphans.keyrings[path] = size
+    for path, size in scan_dir(util.TRUSTED_DIR).items():
+        if PPA_KEYRING_RE.match(path.name) and path.name not in ppa_keyrings:
+            orphans.keyrings[path] = size
+    return orphans
+
+def is_referenced(filename, release_prefixes, component_prefixes):
+    """ Check whether a file in the lists dir belongs to a configured source.
+
+    Every point the filename could be split into a prefix is looked up in
+    the sets of prefixes, so this takes time in proportion to the length of
+    the filename, not the number of sources.
+
+    Arguments:
+        filename (str): The name of the file.
+        release_prefixes (set of str): The prefixes of suites' files. Any
+            file directly in a suite's directory belongs to it, including the
+            release files and files other tools fetch through apt, such as
+            apt-file's Contents files.
+        component_prefixes (set of str): The prefixes of components' files.
+
+    Returns:
+        bool: True if the file belongs to a configured source.
+    """
+    position = filename.find('_')
+    while position != -1:
+        prefix = filename[:position + 1]
+        if prefix in component_prefixes:
+            return True
+        if prefix in release_prefixes:
+            rest = filename[position + 1:]
+            if '_' not in rest or rest.startswith(BY_HASH_PREFIX):
+                return True
+        position = filename.find('_', position + 1)
+    return False
+
+def scan_dir(path):
+    """ List the files in a directory.
+
+    Arguments:
+        path (str): The directory.
+
+    Returns:
+        dict: The size of each file, by path. This is empty if the directory
+        doesn't exist.
+    """
+    files = {}
+    try:
+        with os.scandir(path) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.is_file():
+                    files[Path(dir_entry.path)] = dir_entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    return files
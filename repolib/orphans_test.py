@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from . import orphans
+from . import util
+
+class OrphansTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        root = Path(self.root.name)
+        self.dirs = {}
+        for name, attribute in (
+                ('lists', 'LISTS_DIR'),
+                ('keyrings', 'KEYRINGS_DIR'),
+                ('trusted.gpg.d', 'TRUSTED_DIR')):
+            self.dirs[name] = root / name
+            self.dirs[name].mkdir()
+            patcher = mock.patch.object(util, attribute, str(root / name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'example.sources', mode='w') as source_file:
+            source_file.write(
+                'Types: deb\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal\n'
+                'Components: main\n'
+                f'Signed-By: {self.dirs["keyrings"]}/example.gpg\n'
+                '\n'
+                'Enabled: no\n'
+                'Types: deb\n'
+                'URIs: http://example.com/disabled\n'
+                'Suites: focal\n'
+                'Components: main\n'
+                f'Signed-By: {self.dirs["keyrings"]}/disabled.gpg\n'
+            )
+        with open(self.sources_dir / 'ppa.list', mode='w') as list_file:
+            list_file.write(
+                'deb http://ppa.launchpad.net/system76/pop/ubuntu focal main\n'
+            )
+
+        (root / 'sources.list').write_text(
+            '# Comment\n'
+            'deb http://archive.ubuntu.com/ubuntu focal main\n'
+        )
+        patcher = mock.patch.object(util, 'SOURCES_LIST', str(root / 'sources.list'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for name in (
+                'lock',
+                'example.com_ubuntu_dists_focal_InRelease',
+                'example.com_ubuntu_dists_focal_main_binary-amd64_Packages',
+                'example.com_ubuntu_dists_focal_universe_binary-amd64_Packages',
+                'example.com_disabled_dists_focal_InRelease',
+                'example.com_removed_dists_focal_main_binary-amd64_Packages',
+                'archive.ubuntu.com_ubuntu_dists_focal_main_i18n_Translation-en',
+                'ppa.launchpad.net_system76_pop_ubuntu_dists_focal_InRelease'):
+            (self.dirs['lists'] / name).write_text('x')
+        (self.dirs['lists'] / 'partial').mkdir()
+        for name in ('example.gpg', 'disabled.gpg', 'removed.gpg'):
+            (self.dirs['keyrings'] / name).write_text('x')
+        for name in (
+                'ubuntu-keyring-2018-archive.gpg',
+                'system76-ubuntu-pop.gpg',
+                'removed-ubuntu-ppa.gpg'):
+            (self.dirs['trusted.gpg.d'] / name).write_text('x')
+
+    def test_find_orphans(self):
+        found = orphans.find_orphans()
+        lists_dir = self.dirs['lists']
+        self.assertEqual(sorted(found.lists), [
+            lists_dir / 'example.com_disabled_dists_focal_InRelease',
+            lists_dir / 'example.com_removed_dists_focal_main_binary-amd64_Packages',
+            lists_dir / 'example.com_ubuntu_dists_focal_universe_binary-amd64_Packages',
+        ])
+        self.assertEqual(sorted(found.keyrings), [
+            self.dirs['keyrings'] / 'removed.gpg',
+            self.dirs['trusted.gpg.d'] / 'removed-ubuntu-ppa.gpg',
+        ])
+        self.assertEqual(found.size, 5)
+
+    def test_uri_spelling(self):
+        # apt names lists after the URI as written, so lists of the same
+        # repository under another spelling are not in use.
+        with open(self.sources_dir / 'example.sources', mode='w') as source_file:
+            source_file.write(
+                'Types: deb\n'
+                'URIs: http://Example.com:80/ubuntu\n'
+                'Suites: focal\n'
+                'Components: main\n'
+            )
+        (self.dirs['lists'] / 'Example.com:80_ubuntu_dists_focal_InRelease').write_text('x')
+        found = orphans.find_orphans()
+        self.assertNotIn(
+            self.dirs['lists'] / 'Example.com:80_ubuntu_dists_focal_InRelease',
+            found.lists
+        )
+        self.assertIn(
+            self.dirs['lists'] / 'example.com_ubuntu_dists_focal_InRelease',
+            found.lists
+        )
+
+    def test_unreadable_source(self):
+        with open(self.sources_dir / 'broken.list', mode='w') as list_file:
+            list_file.write('deb\n')
+        with self.assertRaisesRegex(orphans.OrphansError, 'broken.list'):
+            orphans.find_orphans()
+        self.assertEqual(
+            len(list(orphans.iter_sources(skip_errors=True))), 4
+        )
+
+    def test_suite_files(self):
+        """ Files of a configured suite, like apt-file's, are kept. """
+        kept = [
+            self.dirs['lists'] / 'example.com_ubuntu_dists_focal_Contents-amd64.lz4',
+            self.dirs['lists'] / 'example.com_ubuntu_dists_focal_by-hash_SHA256_abc',
+        ]
+        removed = self.dirs['lists'] / 'example.com_removed_dists_focal_Contents-amd64.lz4'
+        for path in kept + [removed]:
+            path.write_text('x')
+        found = orphans.find_orphans()
+        self.assertIn(removed, found.remove())
+        for path in kept:
+            self.assertTrue(path.exists())
+        self.assertFalse(removed.exists())
+
+    def test_remove(self):
+        found = orphans.find_orphans()
+        self.assertEqual(found.remove(), found.paths)
+        self.assertEqual(orphans.find_orphans().paths, [])
+        self.assertTrue((self.dirs['lists'] / 'lock').exists())
@@ -39,7 +39,7 @@ import urllib.request
 from http.client import HTTPException
 from urllib.error import HTTPError, URLError
 
-from . import source, util
+from . import metrics, source, timing, util
 
 DISTRO_CODENAME = util.DISTRO_CODENAME
 
@@ -160,7 +160,9 @@ def get_info_from_lp(owner_name, ppa):
     if owner_name[0] != '~':
         owner_name = '~' + owner_name
     lp_url = LAUNCHPAD_PPA_API % (owner_name, ppa)
-    data = _get_https_content_py3(lp_url, True)
+    with timing.span('launchpad'), metrics.timer(
+            'repolib_launchpad_fetch_duration_seconds'):
+        data = _get_https_content_py3(lp_url, True)
     return json.loads(data)
 
 def _get_https_content_py3(lp_url, accept_json, retry_delays=None):
@@ -192,7 +194,9 @@ def _get_https_content_py3(lp_url, accept_json, retry_delays=None):
             time.sleep(next(sleep_waits))
         except StopIteration:
             break
+        metrics.inc('repolib_launchpad_fetch_retries_total')
 
+    metrics.inc('repolib_launchpad_fetch_errors_total')
     raise err
 
 def add_key(fingerprint):
@@ -204,7 +208,9 @@ def add_key(fingerprint):
     apt_key_cmd = "apt-key adv --keyserver keyserver.ubuntu.com --recv-keys".split()
     # apt_key_cmd.append(ppa_info['signing_key_fingerprint'])
     apt_key_cmd.append(fingerprint)
-    subprocess.run(
-        apt_key_cmd,
-        check=False
-    )
+    with timing.span('apt-key'), metrics.timer(
+            'repolib_key_import_duration_seconds'):
+        subprocess.run(
+            apt_key_cmd,
+            check=False
+        )
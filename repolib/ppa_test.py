@@ -65,6 +65,21 @@ class PPATestCase(unittest.TestCase):
     def test_options(self):
         self.assertIsNone(self.source.options)
 
+    def test_serialize(self):
+        self.source.ppa_info = {
+            'displayname': 'Pop!_OS PPA',
+            'reference': '~system76/ubuntu/pop',
+            'signing_key_fingerprint': 'E6AC4C23E3B6BD8CA3C79E4F204DD8AEC33A7AFF',
+            'description': 'Packages for Pop!_OS',
+            'self_link': 'https://api.launchpad.net/devel/~system76/+archive/ubuntu/pop',
+            'authorized_size': 8192,
+        }
+        restored = ppa.PPALine.from_bytes(self.source.to_bytes())
+        self.assertEqual(restored.dump(), self.source.dump())
+        self.assertEqual(restored.ppa_line, 'ppa:system76/pop')
+        self.assertEqual(restored.ppa_info, self.source.ppa_info)
+        self.assertEqual(restored.make_name(), self.source.make_name())
+
     def test_internet_features(self):
         try:
             self.source.load_from_ppa()
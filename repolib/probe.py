@@ -0,0 +1,235 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Check the health and latency of the mirrors configured in the sources.
+"""
+
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http.client import HTTPException
+from urllib.error import HTTPError, URLError
+
+from . import targets
+from . import timing
+from . import util
+from .orphans import iter_sources
+
+PROBE_SCHEMES = ('http', 'https')
+DEFAULT_TIMEOUT = 5
+DEFAULT_WORKERS = 8
+# How much of a release file is read looking for its Date field.
+MAX_HEADER_BYTES = 64 * 1024
+USER_AGENT = 'repolib-probe'
+
+class ProbeResult:
+    """ The outcome of requesting the release file of a URI and suite.
+
+    Arguments:
+        uri (str): The normalized URI of the repository.
+        suite (str): The suite.
+        url (str): The URL of the release file.
+
+    Attributes:
+        status (int): The HTTP status, or None if there was no response.
+        latency (float): The seconds taken to receive the response headers,
+            or None if there was no response.
+        date (datetime.datetime): The Date field of the release file.
+        valid_until (datetime.datetime): The Valid-Until field, if present.
+        error (str): A description of what went wrong, if anything.
+    """
+
+    def __init__(self, uri, suite, url):
+        self.uri = uri
+        self.suite = suite
+        self.url = url
+        self.status = None
+        self.latency = None
+        self.date = None
+        self.valid_until = None
+        self.error = None
+
+    @property
+    def ok(self):
+        """ bool: Whether the release file was fetched. """
+        return self.status == 200 and not self.error
+
+    def get_age(self, now=None):
+        """ Get how long ago the release file was published.
+
+        Arguments:
+            now (datetime.datetime): The current time (default: now).
+
+        Returns:
+            float: The age in seconds, or None if the date is unknown.
+        """
+        if self.date is None:
+            return None
+        now = now or datetime.now(timezone.utc)
+        return (now - self.date).total_seconds()
+
+    def is_expired(self, now=None):
+        """ Check whether the release file's Valid-Until date has passed.
+
+        Arguments:
+            now (datetime.datetime): The current time (default: now).
+
+        Returns:
+            bool: True if apt would reject the release file as expired.
+        """
+        if self.valid_until is None:
+            return False
+        return (now or datetime.now(timezone.utc)) > self.valid_until
+
+    def make_dict(self):
+        """ Makes a dict of the result, for machine-readable output.
+
+        Returns:
+            A dict with the data from the result.
+        """
+        return {
+            'uri': self.uri,
+            'suite': self.suite,
+            'url': self.url,
+            'ok': self.ok,
+            'status': self.status,
+            'latency': self.latency,
+            'date': self.date.isoformat() if self.date else None,
+            'age': self.get_age(),
+            'expired': self.is_expired(),
+            'error': self.error,
+        }
+
+def get_endpoints(index=None):
+    """ Find every URI and suite pair in the enabled sources.
+
+    This includes the sources in sources.list.
+
+    Arguments:
+        index (SourcesIndex): The index to read from (default: the sources
+            dir). Files which can't be read are skipped.
+
+    Returns:
+        [(str, str)]: The sorted, distinct pairs, with normalized URIs. Only
+        HTTP and HTTPS URIs are included.
+    """
+    endpoints = set()
+    for stanza in iter_sources(index, skip_errors=True):
+        if stanza.enabled == util.AptSourceEnabled.FALSE:
+            continue
+        for uri in stanza.uris or []:
+            uri = util.normalize_uri(uri)
+            if uri.split(':', 1)[0] not in PROBE_SCHEMES:
+                continue
+            for suite in stanza.suites or []:
+                endpoints.add((uri, suite))
+    return sorted(endpoints)
+
+def parse_date(value):
+    """ Parse a date from a release file.
+
+    Arguments:
+        value (str): The date, in RFC 2822 format.
+
+    Returns:
+        datetime.datetime: The date (in UTC if no zone is given), or None if
+        it can't be parsed.
+    """
+    try:
+        date = parsedate_to_datetime(value.strip())
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date
+
+def probe_endpoint(uri, suite, timeout=DEFAULT_TIMEOUT):
+    """ Request the release file of a suite, and time the response.
+
+    Only the start of the file is read, up to its Date and Valid-Until
+    fields.
+
+    Arguments:
+        uri (str): The URI of the repository.
+        suite (str): The suite.
+        timeout (float): The seconds to wait for a response.
+
+    Returns:
+        ProbeResult: The outcome.
+    """
+    url = f'{uri}/{targets.get_path(suite, "", "InRelease")}'
+    result = ProbeResult(uri, suite, url)
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    start = time.monotonic()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            result.latency = time.monotonic() - start
+            result.status = response.status
+            read = 0
+            while read < MAX_HEADER_BYTES:
+                line = response.readline()
+                if not line or line.startswith(b'-----BEGIN PGP SIGNATURE'):
+                    break
+                if line[:1] in (b' ', b'\t'):
+                    # The checksums have started, after the fields.
+                    break
+                read += len(line)
+                key, _, value = line.decode('utf-8', 'replace').partition(':')
+                if key == 'Date':
+                    result.date = parse_date(value)
+                elif key == 'Valid-Until':
+                    result.valid_until = parse_date(value)
+    except HTTPError as err:
+        result.latency = time.monotonic() - start
+        result.status = err.code
+        result.error = str(err.reason)
+    except (HTTPException, URLError, OSError) as err:
+        result.error = str(getattr(err, 'reason', err))
+    return result
+
+def probe(endpoints, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+    """ Probe many endpoints concurrently.
+
+    Arguments:
+        endpoints ([(str, str)]): The URI and suite pairs to probe.
+        workers (int): The most requests to make at once.
+        timeout (float): The seconds to wait for each response.
+
+    Returns:
+        [ProbeResult]: The result for each endpoint, in the same order.
+    """
+    if not endpoints:
+        return []
+    with timing.span('probe'), ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(endpoints)))) as executor:
+        return list(executor.map(
+            lambda endpoint: probe_endpoint(*endpoint, timeout=timeout),
+            endpoints
+        ))
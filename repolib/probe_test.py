@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import shutil
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from . import probe
+from . import util
+
+RELEASE = (
+    '-----BEGIN PGP SIGNED MESSAGE-----\n'
+    'Hash: SHA512\n'
+    '\n'
+    'Origin: Example\n'
+    'Suite: focal\n'
+    'Date: Thu, 23 Apr 2020 17:33:17 UTC\n'
+    'Valid-Until: Thu, 30 Apr 2020 17:33:17 UTC\n'
+    'SHA256:\n'
+    ' 0123 1234 main/binary-amd64/Packages\n'
+)
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    """ A stand-in mirror, with a release file for focal only. """
+    delay = 0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        if self.path != '/ubuntu/dists/focal/InRelease':
+            self.send_error(404)
+            return
+        body = RELEASE.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class ProbeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        MirrorHandler.delay = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), MirrorHandler)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={'poll_interval': 0.05}
+        )
+        self.thread.start()
+        self.uri = f'http://127.0.0.1:{self.server.server_port}/ubuntu'
+
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'example.sources', mode='w') as source_file:
+            source_file.write(
+                'Types: deb deb-src\n'
+                f'URIs: {self.uri}/\n'
+                'Suites: focal focal-updates\n'
+                'Components: main\n'
+                '\n'
+                'Types: deb\n'
+                'URIs: file:///srv/repo\n'
+                'Suites: focal\n'
+                'Components: main\n'
+            )
+        with open(self.sources_dir / 'other.list', mode='w') as list_file:
+            list_file.write(f'deb {self.uri} focal main\n')
+        patcher = mock.patch.object(util, 'SOURCES_LIST', '/nonexistent')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_get_endpoints(self):
+        self.assertEqual(probe.get_endpoints(), [
+            (self.uri, 'focal'), (self.uri, 'focal-updates'),
+        ])
+
+    def test_probe(self):
+        results = probe.probe(probe.get_endpoints())
+        focal, updates = results
+        self.assertTrue(focal.ok)
+        self.assertEqual(focal.status, 200)
+        self.assertGreaterEqual(focal.latency, 0)
+        self.assertEqual(
+            focal.date, datetime(2020, 4, 23, 17, 33, 17, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            focal.get_age(datetime(2020, 4, 24, 17, 33, 17, tzinfo=timezone.utc)),
+            86400
+        )
+        self.assertTrue(focal.is_expired())
+        self.assertFalse(updates.ok)
+        self.assertEqual(updates.status, 404)
+
+    def test_concurrent(self):
+        MirrorHandler.delay = 0.5
+        endpoints = [(self.uri, 'focal')] * 4
+        start = time.monotonic()
+        results = probe.probe(endpoints, workers=4)
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertTrue(all(result.ok for result in results))
+
+    def test_timeout_and_refused(self):
+        MirrorHandler.delay = 1
+        slow = probe.probe_endpoint(self.uri, 'focal', timeout=0.2)
+        self.assertFalse(slow.ok)
+        self.assertIsNotNone(slow.error)
+
+        refused = probe.probe_endpoint('http://127.0.0.1:9', 'focal', timeout=1)
+        self.assertFalse(refused.ok)
+        self.assertIsNone(refused.status)
@@ -28,10 +28,15 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #pylint: disable=too-many-ancestors
 # If we want to use the subclass, we don't have a lot of options.
 
+import json
 import re
+import sys
+from collections import namedtuple
 
 from debian import deb822
 
+from . import metrics
+from . import timing
 from . import util
 
 class SourceError(Exception):
@@ -46,6 +51,36 @@ class SourceError(Exception):
         super().__init__(*args, **kwargs)
         self.code = code
 
+# The architectures of binary keys for sources without an Architectures option.
+DEFAULT_ARCH = '*'
+# The architecture of source code keys.
+SOURCE_ARCH = 'source'
+
+class SourceKey(namedtuple('SourceKey', 'uri type suite component arch')):
+    """ The identity of a single index configured by a source.
+
+    Keys are immutable and hashable, so they can be compared across files and
+    formats. The URI is normalized with util.normalize_uri().
+
+    Attributes:
+        uri (str): The normalized URI.
+        type (str): Either 'deb' or 'deb-src'.
+        suite (str): The suite.
+        component (str): The component, or '' for flat repositories.
+        arch (str): The architecture, DEFAULT_ARCH for the system's default
+            architectures, or SOURCE_ARCH for source code.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        key = f'{self.type} {self.uri} {self.suite} {self.component}'.strip()
+        if self.arch not in (DEFAULT_ARCH, SOURCE_ARCH):
+            key += f' [{self.arch}]'
+        return key
+
+# Attributes set by deb822.Deb822, which are rebuilt rather than serialized.
+DEB822_ATTRS = ('decoder', 'encoding', 'gpg_info')
+
 class Source(deb822.Deb822):
     """ A Deb822 object representing a software source.
 
@@ -77,6 +112,78 @@ class Source(deb822.Deb822):
         super().__init__(*args, **kwargs)
         self.filename = filename
 
+    def __reduce__(self):
+        """ Pickle the source compactly, as its fields and attributes.
+
+        The base Deb822 object holds a lot of internal state (and can't be
+        pickled at all), so only the fields and the attributes set by Source
+        and its subclasses are kept.
+        """
+        return (_restore, (type(self), tuple(self.items()), self._get_state()))
+
+    def to_bytes(self):
+        """ Serialize the source into a compact form.
+
+        This is suitable for sending to other processes or storing in shared
+        memory, and is restored with from_bytes(). Unlike pickle, loading it
+        can't run arbitrary code.
+
+        Returns:
+            bytes: The serialized source.
+        """
+        return json.dumps(self._to_record(), separators=(',', ':')).encode()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Restore a source serialized with to_bytes().
+
+        The source is restored as the same class it was serialized from,
+        which must be this class or one of its subclasses.
+
+        Arguments:
+            data (bytes): The serialized source.
+
+        Returns:
+            Source: The restored source.
+
+        Raises:
+            SourceError: If the data isn't a serialized source of this class.
+        """
+        try:
+            record = json.loads(data)
+        except ValueError as err:
+            raise SourceError(f'Invalid serialized source: {err}') from err
+        return cls._from_record(record)
+
+    def _get_state(self):
+        """ Get the attributes to serialize, other than the fields. """
+        return {
+            key: value for key, value in vars(self).items()
+            if key not in DEB822_ATTRS and not key.startswith('_Deb822')
+        }
+
+    def _to_record(self):
+        source_type = type(self)
+        return {
+            'type': f'{source_type.__module__}.{source_type.__qualname__}',
+            'fields': list(self.items()),
+            'state': self._get_state(),
+        }
+
+    @classmethod
+    def _from_record(cls, record):
+        try:
+            type_name = record['type']
+            fields = record['fields']
+            state = record['state']
+        except (KeyError, TypeError) as err:
+            raise SourceError(f'Invalid serialized source: {err}') from err
+
+        for source_type in _get_subclasses(cls):
+            if f'{source_type.__module__}.{source_type.__qualname__}' == type_name:
+                return _restore(source_type, fields, state)
+        raise SourceError(f'{type_name} is not a {cls.__name__}')
+
     def load_from_file(self, filename=None):
         """ Loads the data from a file path.
 
@@ -88,19 +195,50 @@ class Source(deb822.Deb822):
         if not self.filename:
             raise SourceError("No filename to load from")
 
-        full_path = util.get_sources_dir() / filename
+        full_path = util.get_sources_dir() / self.filename
 
-        with open(full_path, mode='r') as source_file:
+        with timing.span('parse'), open(full_path, mode='r') as source_file:
             super().__init__(source_file)
 
+    def load_from_dict(self, data):
+        """ Loads the data from a dict, as output by make_dict().
+
+        Arguments:
+            data (dict): The source data. Types may be given as strings, and
+                options may have either str or list values.
+        """
+        self.init_values()
+        if data.get('name'):
+            self.name = data['name']
+        else:
+            del self['X-Repolib-Name']
+        self.enabled = data.get('enabled', True)
+        self.types = [
+            util.AptSourceType(dtype) for dtype in data.get('types', ['deb'])
+        ]
+        self.uris = list(data.get('uris', []))
+        self.suites = list(data.get('suites', []))
+        self.components = list(data.get('components', []))
+
+        options = {}
+        for key, value in (data.get('options') or {}).items():
+            if isinstance(value, list):
+                value = ' '.join(value)
+            options[self.options_d.get(key, key)] = value
+        self.options = options
+
+        if data.get('filename'):
+            self.filename = data['filename']
+
     def save_to_disk(self):
         """ Saves the source to disk."""
         if not self.filename:
             raise SourceError('No filename to save to specified')
         full_path = util.get_sources_dir() / self.filename
 
-        with open(full_path, mode='w') as sources_file:
-            sources_file.write(self.dump())
+        with timing.span('write'), open(full_path, mode='w') as sources_file:
+            metrics.inc('repolib_bytes_written_total', sources_file.write(self.dump()))
+        metrics.inc('repolib_files_written_total')
 
     def make_source_string(self):
         """ Makes a printable string of the source.
@@ -118,6 +256,51 @@ class Source(deb822.Deb822):
         toprint = toprint.replace('X-Repolib-Name', 'Name')
         return toprint
 
+    def make_dict(self):
+        """ Makes a dict of the source data.
+
+        This is intended for machine-readable output, and uses only native
+        data types, so the result can be serialized directly (e.g. to JSON).
+
+        Returns:
+            A dict with the data from the source.
+        """
+        enabled = self.enabled
+        return {
+            'name': self.name,
+            'filename': self.filename,
+            'enabled': enabled.get_bool() if enabled else True,
+            'types': [dtype.value for dtype in self.types or []],
+            'uris': self.uris or [],
+            'suites': self.suites or [],
+            'components': self.components or [],
+            'options': self.options or {},
+        }
+
+    def make_keys(self):
+        """ Make the keys identifying each index this source configures.
+
+        Returns:
+            frozenset of SourceKey: A key for each combination of type, URI,
+            suite, component and architecture.
+        """
+        archs = (self.options or {}).get('Architectures', '').split()
+        keys = set()
+        for dtype in self.types or []:
+            if dtype == util.AptSourceType.SOURCE:
+                type_archs = [SOURCE_ARCH]
+            else:
+                type_archs = archs or [DEFAULT_ARCH]
+            for uri in self.uris or []:
+                uri = util.normalize_uri(uri)
+                for suite in self.suites or []:
+                    for component in self.components or ['']:
+                        for arch in type_archs:
+                            keys.add(SourceKey(
+                                uri, dtype.value, suite, component, arch
+                            ))
+        return frozenset(keys)
+
     def set_source_enabled(self, enabled):
         """ Convenience method to set a source with source_code enabled.
 
@@ -355,3 +538,28 @@ class Source(deb822.Deb822):
         for key in self.options:
             opt_str += f'{self.outoptions_d[key]}={self.options[key].replace(" ", ",")} '
         return opt_str
+
+def _get_subclasses(source_type):
+    """ Get a class and all of its subclasses. """
+    classes = [source_type]
+    for subclass in source_type.__subclasses__():
+        classes.extend(_get_subclasses(subclass))
+    return classes
+
+def _restore(source_type, fields, state):
+    """ Rebuild a source from its fields and attributes.
+
+    Arguments:
+        source_type (type): The class of the source.
+        fields (iterable of (str, str)): The fields of the source, in order.
+        state (dict): The other attributes of the source.
+
+    Returns:
+        Source: The restored source.
+    """
+    new_source = source_type.__new__(source_type)
+    deb822.Deb822.__init__(
+        new_source, {sys.intern(key): value for key, value in fields}
+    )
+    vars(new_source).update(state)
+    return new_source
@@ -30,8 +30,10 @@ This is a library for parsing deb lines into deb822-format data.
 # pylint: disable=missing-function-docstring, missing-class-docstring
 # These aren't really relevant for unit testing (which is mostly automatic.)
 
+import pickle
 import unittest
 
+from . import deb
 from . import source
 from . import util
 
@@ -94,3 +96,40 @@ class SourceTestCase(unittest.TestCase):
     def test_set_source_enabled(self):
         self.source.set_source_enabled(False)
         self.assertEqual(self.source.types, [util.AptSourceType.BINARY])
+
+    def test_make_dict(self):
+        self.assertDictEqual(self.source.make_dict(), {
+            'name': 'Test Source',
+            'filename': 'test.source',
+            'enabled': False,
+            'types': ['deb', 'deb-src'],
+            'uris': ['http://example.com/ubuntu', 'http://example.com/mirror'],
+            'suites': ['suite', 'suite-updates'],
+            'components': ['main', 'contrib', 'nonfree'],
+            'options': {
+                'Architectures': 'amd64 armel',
+                'Languages': 'en_US en_CA'
+            }
+        })
+
+    def test_pickle(self):
+        for original in (self.source, deb.DebLine('deb http://example.com/ focal main')):
+            restored = pickle.loads(pickle.dumps(original))
+            self.assertIs(type(restored), type(original))
+            self.assertEqual(restored.dump(), original.dump())
+            self.assertEqual(restored.filename, original.filename)
+
+    def test_to_bytes(self):
+        line = deb.DebLine('deb [arch=amd64] http://example.com/ focal main')
+        line.suites = ['focal', 'focal-updates']
+        restored = source.Source.from_bytes(line.to_bytes())
+        self.assertIsInstance(restored, deb.DebLine)
+        self.assertEqual(restored.dump(), line.dump())
+        self.assertEqual(restored.deb_line, line.deb_line)
+        self.assertEqual(restored.filename, line.filename)
+
+        with self.assertRaises(source.SourceError):
+            deb.DebLine.from_bytes(self.source.to_bytes())
+        with self.assertRaises(source.SourceError):
+            source.Source.from_bytes(b'not a source')
+
@@ -28,6 +28,8 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #pylint: disable=too-many-ancestors
 # If we want to use the subclass, we don't have a lot of options.
 
+import contextlib
+
 from . import source
 from . import util
 
@@ -48,7 +50,7 @@ class SystemSourceException(Exception):
 class SystemSource(source.Source):
     """ System Sources. """
 
-    def __init__(self, filename='system.sources'):
+    def __init__(self, filename=util.SYSTEM_FILENAME):
         """ Constructor for System Sources
 
         Loads a source object for the System Sources. These are located (by
@@ -56,8 +58,123 @@ class SystemSource(source.Source):
         a different location, please patch this in your packaging.
         """
         super().__init__()
+        self._batch_depth = 0
         self.load_from_file(filename=filename)
 
+    @contextlib.contextmanager
+    def batch(self, save=True):
+        """ Group several changes to the source into a single save.
+
+        While inside the batch, changes are only made in memory. When the
+        outermost batch exits, the final state is validated once and, if it
+        differs from the state when the batch started, saved to disk once. If
+        an exception is raised inside the batch, or the final state isn't
+        valid, the source is restored to the state it had beforehand.
+
+        Example::
+
+            with system_source.batch():
+                system_source.set_component_enabled(component='universe')
+                system_source.set_suite_enabled(suite='focal-backports')
+
+        Keyword Arguments:
+            save (bool): Whether to save the changes when the batch exits. If
+                False, they are validated but only kept in memory, e.g. to be
+                written as part of a transaction.
+
+        Yields:
+            SystemSource: self
+        """
+        if self._batch_depth > 0:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+            return
+
+        original = self.dump()
+        snapshot = {key: self[key] for key in self}
+        self._batch_depth += 1
+        try:
+            yield self
+            if self.dump() != original:
+                self._validate()
+        except Exception:
+            self.clear()
+            self.update(snapshot)
+            raise
+        finally:
+            self._batch_depth -= 1
+
+        if save and self.dump() != original:
+            self.save_to_disk()
+
+    def apply(
+            self,
+            add_suites=None,
+            remove_suites=None,
+            add_components=None,
+            remove_components=None):
+        """ Add and remove several suites and components in a single save.
+
+        Suites or components which are already in the requested state are
+        ignored.
+
+        Keyword Arguments:
+            add_suites ([str]): Suites to enable.
+            remove_suites ([str]): Suites to disable.
+            add_components ([str]): Components to enable.
+            remove_components ([str]): Components to disable.
+
+        Returns:
+            bool: True if the source was changed (and saved), otherwise False.
+        """
+        original = self.dump()
+        with self.batch():
+            suites = self._set_operation(
+                self.suites, add_suites, remove_suites
+            )
+            components = self._set_operation(
+                self.components, add_components, remove_components
+            )
+            if suites != self.suites:
+                self.suites = suites
+            if components != self.components:
+                self.components = components
+            if add_suites or add_components:
+                self.enabled = True
+
+        return self.dump() != original
+
+    def _save(self):
+        """ Save to disk, unless we're in the middle of a batch. """
+        if self._batch_depth == 0:
+            self.save_to_disk()
+
+    def _validate(self):
+        """ Make sure the system source is still usable. """
+        if not self.suites:
+            raise SystemSourceException(
+                'The system source must have at least one suite.'
+            )
+        if not self.components:
+            raise SystemSourceException(
+                'The system source must have at least one component.'
+            )
+
+    @staticmethod
+    def _set_operation(current, add=None, remove=None):
+        """ Add and remove items from a list, keeping the existing order. """
+        items = current.copy()
+        for item in add or []:
+            if item not in items:
+                items.append(item)
+        for item in remove or []:
+            if item in items:
+                items.remove(item)
+        return items
+
     def set_component_enabled(self, component='main', enabled=True):
         """ Enables or disabled a repo component (e.g. 'main')
 
@@ -70,18 +187,18 @@ class SystemSource(source.Source):
             if component in components:
                 components.remove(component)
                 self.components = components.copy()
-                self.save_to_disk()
+                self._save()
                 return component
         else:
             if component not in components:
                 self.enabled = True
                 components.append(component)
                 self.components = components.copy()
-                self.save_to_disk()
+                self._save()
                 return component
 
         raise SystemSourceException(
-            msg=f"Couldn't toggle component: {component} to {enabled}"
+            f"Couldn't toggle component: {component} to {enabled}"
         )
 
     def set_suite_enabled(self, suite=util.DISTRO_CODENAME, enabled=True):
@@ -97,17 +214,17 @@ class SystemSource(source.Source):
             if suite in suites:
                 suites.remove(suite)
                 self.suites = suites.copy()
-                self.save_to_disk()
+                self._save()
                 return suite
         else:
             if suite not in suites:
                 self.enabled = True
                 suites.append(suite)
                 self.suites = suites.copy()
-                self.save_to_disk()
+                self._save()
                 return suite
 
 
         raise SystemSourceException(
-            msg=f"Couldn't toggle suite: {suite} to {enabled}"
+            f"Couldn't toggle suite: {suite} to {enabled}"
         )
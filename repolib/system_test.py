@@ -89,3 +89,42 @@ class SystemTestCase(unittest.TestCase):
         self.source.set_source_enabled(False)
 
         self.assertEqual(self.source.types, expected)
+
+    def test_batch(self):
+        expected_suites = ['focal', 'focal-updates', 'focal-test']
+        expected_components = ['main', 'universe', 'multiverse', 'test']
+        with self.source.batch():
+            self.source.set_suite_enabled(suite='focal-backports', enabled=False)
+            self.source.set_suite_enabled(suite='focal-test')
+            self.source.set_component_enabled(component='test')
+            self.source.set_component_enabled(component='restricted', enabled=False)
+            saved = system.SystemSource()
+            self.assertNotEqual(saved.suites, expected_suites)
+
+        saved = system.SystemSource()
+        self.assertEqual(saved.suites, expected_suites)
+        self.assertEqual(saved.components, expected_components)
+
+    def test_apply(self):
+        changed = self.source.apply(
+            add_suites=['focal-test'],
+            remove_suites=['focal-backports'],
+            add_components=['test', 'main'],
+            remove_components=['restricted']
+        )
+        self.assertTrue(changed)
+        saved = system.SystemSource()
+        self.assertEqual(saved.suites, ['focal', 'focal-updates', 'focal-test'])
+        self.assertEqual(
+            saved.components, ['main', 'universe', 'multiverse', 'test']
+        )
+        self.assertFalse(self.source.apply(add_suites=['focal']))
+
+    def test_apply_invalid(self):
+        original = self.source.dump()
+        with self.assertRaises(system.SystemSourceException):
+            self.source.apply(
+                remove_components=['main', 'universe', 'multiverse', 'restricted']
+            )
+        self.assertEqual(self.source.dump(), original)
+        self.assertEqual(system.SystemSource().dump(), original)
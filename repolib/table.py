@@ -0,0 +1,474 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+A columnar table of sources, for querying many hosts' sources at once.
+
+Each source is expanded into a row for each combination of type, URI, suite
+and component it configures. Every column is categorical: the distinct
+values are stored once, and the column itself is a compact array of codes
+into them. Filters are worked out once per distinct value instead of once
+per row, and the rows are then selected with loops which run in C, so
+filtering millions of rows doesn't create a Python object per row. Grouping
+rows, with count() or dedupe(), does make a key for each row. The arrays from
+get_column() support the buffer protocol, so they can also be handed to NumPy
+with numpy.frombuffer() without copying.
+"""
+
+import json
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+
+from .index import SourcesIndex
+
+COLUMNS = ('host', 'file', 'name', 'type', 'uri', 'suite', 'component')
+ENABLED = 'enabled'
+# Columns start with a byte per code, and are widened as they need more.
+CODE_TYPES = ('B', 'H', 'L')
+FLAG_TYPE = 'B'
+BYTE_CODES = 256
+NEGATE = bytes([1, 0]) + bytes(BYTE_CODES - 2)
+
+class SourceTableError(Exception):
+    """ Exceptions from a source table. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception with a source table
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+class Categories:
+    """ The distinct values in a column, each with a code.
+
+    Codes are given out in the order values are first seen, and never
+    change, so tables filtered from the same table can share them.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        """ Get the code for a value, adding it if it's new.
+
+        Arguments:
+            value (str): The value.
+
+        Returns:
+            int: The code for the value.
+        """
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, values):
+        """ Make a lookup table of which codes match some values.
+
+        Arguments:
+            values: A value, a collection of values, or a function taking a
+                value and returning whether it matches.
+
+        Returns:
+            bytes: 1 at the index of each matching code, and 0 elsewhere.
+        """
+        if callable(values):
+            return bytes(bool(values(value)) for value in self.values)
+        if isinstance(values, str):
+            values = (values,)
+        matches = bytearray(len(self.values))
+        for value in values:
+            code = self.codes.get(value)
+            if code is not None:
+                matches[code] = 1
+        return bytes(matches)
+
+    def __len__(self):
+        return len(self.values)
+
+class SourceTable:
+    """ A columnar table of sources.
+
+    Tables made by filter(), select() and dedupe() only copy a column from
+    the table they were made from when it is first used, so a query only
+    pays for the columns it reads.
+
+    Arguments:
+        categories (dict): The Categories to use for each column, to share
+            them with another table. By default, each column gets its own.
+    """
+
+    def __init__(self, categories=None):
+        self.categories = categories or {
+            column: Categories() for column in COLUMNS
+        }
+        self.columns = {column: array(CODE_TYPES[0]) for column in COLUMNS}
+        self.enabled = array(FLAG_TYPE)
+        self.parent = None
+        self.selection = None
+
+    @classmethod
+    def from_index(cls, index=None, host=''):
+        """ Make a table of the sources configured in the sources dir.
+
+        Arguments:
+            index (SourcesIndex): The index to read (default: a new one).
+            host (str): The host to record for each source.
+
+        Returns:
+            SourceTable: The table.
+        """
+        table = cls()
+        for entry, stanza in (index or SourcesIndex()).sources():
+            table.add_source(stanza, host=host, file=entry.filename)
+        return table
+
+    @classmethod
+    def from_ndjson(cls, lines):
+        """ Make a table from an inventory, as output by apt-manage inventory.
+
+        Records from list --format ndjson can be read too, without a host.
+        Lines are read one at a time, so only the table is kept in memory.
+
+        Arguments:
+            lines (iterable of str): The lines of the inventory, such as an
+                open file.
+
+        Returns:
+            SourceTable: The table.
+
+        Raises:
+            SourceTableError: If a line isn't a JSON object.
+        """
+        table = cls()
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as err:
+                raise SourceTableError(
+                    f'Line {number} is not valid JSON: {err}'
+                ) from err
+            if not isinstance(record, dict):
+                raise SourceTableError(f'Line {number} is not a record.')
+            table.add_record(record)
+        return table
+
+    def add_source(self, source, host='', file=None):
+        """ Add the rows for a source.
+
+        Arguments:
+            source (Source): The source to add.
+            host (str): The host the source is configured on.
+            file (str): The file the source is in (default: its filename).
+        """
+        record = source.make_dict()
+        record['host'] = host
+        if file:
+            record['file'] = file
+        self.add_record(record)
+
+    def add_record(self, record):
+        """ Add the rows for a source record.
+
+        Arguments:
+            record (dict): A record in the format of Source.make_dict(), with
+                optional host and file fields (the filename is used if there
+                is no file).
+        """
+        categories = self.categories
+        host = categories['host'].encode(record.get('host') or '')
+        file = categories['file'].encode(
+            record.get('file') or record.get('filename') or ''
+        )
+        name = categories['name'].encode(record.get('name') or '')
+        enabled = 1 if record.get('enabled', True) else 0
+        for source_type in record.get('types') or ['']:
+            source_type = categories['type'].encode(source_type)
+            for uri in record.get('uris') or ['']:
+                uri = categories['uri'].encode(uri)
+                for suite in record.get('suites') or ['']:
+                    suite = categories['suite'].encode(suite)
+                    for component in record.get('components') or ['']:
+                        self.append_row((
+                            host,
+                            file,
+                            name,
+                            source_type,
+                            uri,
+                            suite,
+                            categories['component'].encode(component),
+                        ), enabled)
+
+    def append_row(self, codes, enabled):
+        """ Add a row of codes.
+
+        Arguments:
+            codes (tuple of int): The code for each column, in the order of
+                COLUMNS.
+            enabled (int): 1 if the source is enabled, otherwise 0.
+        """
+        for column, code in zip(COLUMNS, codes):
+            try:
+                self.get_column(column).append(code)
+            except OverflowError:
+                self.widen(column)
+                self.columns[column].append(code)
+        self.enabled.append(enabled)
+
+    def widen(self, column):
+        """ Store a column with the next larger size of code.
+
+        Arguments:
+            column (str): The column to widen.
+        """
+        codes = self.get_column(column)
+        code_type = CODE_TYPES[CODE_TYPES.index(codes.typecode) + 1]
+        self.columns[column] = array(code_type, codes)
+
+    def __len__(self):
+        return len(self.enabled)
+
+    def mask(self, enabled=None, **selectors):
+        """ Find the rows matching every selector.
+
+        Arguments:
+            enabled (bool): If given, only match enabled (or disabled) rows.
+            selectors: For any of the COLUMNS, the value to match, a
+                collection of values to match any of, or a function taking a
+                value and returning whether it matches.
+
+        Returns:
+            bytes: 1 for each row which matches, and 0 for each which
+            doesn't.
+
+        Raises:
+            SourceTableError: If a selector isn't one of the COLUMNS.
+        """
+        mask = bytes(repeat(1, len(self)))
+        for column, values in selectors.items():
+            codes = self.get_column(column)
+            lookup = self.categories[column].lookup(values)
+            if len(lookup) > BYTE_CODES and codes.typecode == CODE_TYPES[0]:
+                # The categories are shared with a table which has more
+                # values than a byte can hold, so the lookup can't be used to
+                # translate this column's bytes.
+                self.widen(column)
+                codes = self.columns[column]
+            if codes.typecode == CODE_TYPES[0]:
+                lookup += bytes(BYTE_CODES - len(lookup))
+                matches = codes.tobytes().translate(lookup)
+            else:
+                matches = bytes(map(lookup.__getitem__, codes))
+            mask = and_masks(mask, matches)
+        if enabled is not None:
+            flags = self.enabled.tobytes()
+            if not enabled:
+                flags = flags.translate(NEGATE)
+            mask = and_masks(mask, flags)
+        return mask
+
+    def filter(self, enabled=None, **selectors):
+        """ Make a table of only the rows matching every selector.
+
+        Arguments:
+            enabled (bool): If given, only keep enabled (or disabled) rows.
+            selectors: The selectors, as for mask().
+
+        Returns:
+            SourceTable: A table of the matching rows, sharing this table's
+            categories.
+        """
+        return self.select(self.mask(enabled, **selectors))
+
+    def select(self, mask):
+        """ Make a table of the rows in a mask.
+
+        Arguments:
+            mask (bytes): The mask, as returned by mask().
+
+        Returns:
+            SourceTable: A table of the rows, sharing this table's
+            categories.
+        """
+        table = SourceTable(self.categories)
+        table.columns = {}
+        table.enabled = array(FLAG_TYPE, compress(self.enabled, mask))
+        table.parent = self
+        table.selection = mask
+        return table
+
+    def count(self, *columns):
+        """ Count the rows with each combination of values in some columns.
+
+        Arguments:
+            columns (str): The columns to group by.
+
+        Returns:
+            collections.Counter: The number of rows for each value, or for
+            each tuple of values if there is more than one column.
+
+        Raises:
+            SourceTableError: If a column isn't one of the COLUMNS.
+        """
+        arrays = self.get_columns(columns)
+        if len(arrays) == 1:
+            values = self.categories[columns[0]].values
+            return Counter({
+                values[code]: count
+                for code, count in Counter(arrays[0]).items()
+            })
+        counts = Counter(zip(*arrays))
+        return Counter({
+            self.decode(columns, codes): count
+            for codes, count in counts.items()
+        })
+
+    def unique(self, column):
+        """ Get the distinct values in a column, in the order first seen.
+
+        Arguments:
+            column (str): The column.
+
+        Returns:
+            [str]: The values in the column.
+        """
+        values = self.categories[column].values
+        codes = dict.fromkeys(self.get_columns([column])[0])
+        return [values[code] for code in codes]
+
+    def dedupe(self, *columns):
+        """ Make a table with only the first row for each combination of values.
+
+        Rows are only duplicates if they are also both enabled or both
+        disabled. Unlike filter(), this makes a tuple of codes for each row.
+
+        Arguments:
+            columns (str): The columns to compare (default: all of them). For
+                instance, the type, uri, suite and component columns give
+                each distinct index configured anywhere once.
+
+        Returns:
+            SourceTable: A table of the first of each set of duplicate rows,
+            sharing this table's categories.
+        """
+        arrays = self.get_columns(columns or COLUMNS)
+        rows = list(zip(*arrays, self.enabled))
+        # Built from the end, so the first row of each set is kept.
+        first = dict(zip(reversed(rows), range(len(rows) - 1, -1, -1)))
+        mask = bytearray(len(self))
+        for row in first.values():
+            mask[row] = 1
+        return self.select(bytes(mask))
+
+    def rows(self):
+        """ Iterate over the rows of the table.
+
+        Yields:
+            dict: The value of each column in the row, and whether it's
+            enabled.
+        """
+        values = [self.categories[column].values for column in COLUMNS]
+        for codes in zip(*self.get_columns(COLUMNS), self.enabled):
+            row = {
+                column: column_values[code]
+                for column, column_values, code in zip(COLUMNS, values, codes)
+            }
+            row[ENABLED] = bool(codes[-1])
+            yield row
+
+    def get_columns(self, columns):
+        """ Get the arrays of codes for some columns.
+
+        Arguments:
+            columns (iterable of str): The columns.
+
+        Returns:
+            [array.array]: The codes in each column.
+
+        Raises:
+            SourceTableError: If a column isn't one of the COLUMNS.
+        """
+        return [self.get_column(column) for column in columns]
+
+    def get_column(self, column):
+        """ Get the array of codes for a column.
+
+        Arguments:
+            column (str): The column.
+
+        Returns:
+            array.array: The codes in the column.
+
+        Raises:
+            SourceTableError: If the column isn't one of the COLUMNS.
+        """
+        if column not in COLUMNS:
+            raise SourceTableError(f'There is no column {column}.')
+        codes = self.columns.get(column)
+        if codes is None:
+            parent_codes = self.parent.get_column(column)
+            codes = array(
+                parent_codes.typecode, compress(parent_codes, self.selection)
+            )
+            self.columns[column] = codes
+        return codes
+
+    def decode(self, columns, codes):
+        """ Get the values for codes in some columns.
+
+        Arguments:
+            columns ([str]): The columns.
+            codes (tuple of int): A code in each column.
+
+        Returns:
+            (str): The values.
+        """
+        return tuple(
+            self.categories[column].values[code]
+            for column, code in zip(columns, codes)
+        )
+
+def and_masks(first, second):
+    """ Combine two masks, matching the rows which match in both.
+
+    Arguments:
+        first (bytes): A mask.
+        second (bytes): A mask of the same length.
+
+    Returns:
+        bytes: The combined mask.
+    """
+    combined = int.from_bytes(first, 'little') & int.from_bytes(second, 'little')
+    return combined.to_bytes(len(first), 'little')
@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import io
+import json
+import shutil
+import unittest
+
+from . import table
+from . import util
+from .index import SourcesIndex
+
+RECORDS = [
+    {
+        'host': 'web1', 'file': 'sources.list', 'name': 'archive',
+        'enabled': True, 'types': ['deb', 'deb-src'],
+        'uris': ['http://archive.ubuntu.com/ubuntu'],
+        'suites': ['focal', 'focal-updates'], 'components': ['main', 'universe'],
+    },
+    {
+        'host': 'web2', 'file': 'sources.list', 'name': 'archive',
+        'enabled': True, 'types': ['deb'],
+        'uris': ['http://archive.ubuntu.com/ubuntu'],
+        'suites': ['jammy'], 'components': ['main'],
+    },
+    {
+        'host': 'web2', 'file': 'sources.list.d/example.sources',
+        'name': 'Example', 'enabled': False, 'types': ['deb'],
+        'uris': ['http://example.com/ubuntu'],
+        'suites': ['focal'], 'components': ['main'],
+    },
+]
+
+class SourceTableTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.table = table.SourceTable()
+        for record in RECORDS:
+            self.table.add_record(record)
+
+    def test_rows(self):
+        self.assertEqual(len(self.table), 10)
+        self.assertEqual(len(self.table.categories['host']), 2)
+        self.assertEqual(list(self.table.rows())[-1], {
+            'host': 'web2',
+            'file': 'sources.list.d/example.sources',
+            'name': 'Example',
+            'type': 'deb',
+            'uri': 'http://example.com/ubuntu',
+            'suite': 'focal',
+            'component': 'main',
+            'enabled': False,
+        })
+
+    def test_filter(self):
+        focal = self.table.filter(suite='focal', component='main')
+        self.assertEqual(len(focal), 3)
+        self.assertEqual(focal.unique('host'), ['web1', 'web2'])
+        self.assertEqual(
+            self.table.filter(True, suite='focal', component='main').unique('host'),
+            ['web1']
+        )
+        self.assertEqual(len(self.table.filter(False)), 1)
+        self.assertEqual(
+            len(self.table.filter(suite=['focal-updates', 'jammy'])), 5
+        )
+        self.assertEqual(
+            len(self.table.filter(uri=lambda uri: 'example' in uri)), 1
+        )
+        self.assertEqual(len(self.table.filter(suite='noble')), 0)
+        self.assertEqual(len(self.table.filter(host='web3')), 0)
+        with self.assertRaises(table.SourceTableError):
+            self.table.filter(release='focal')
+
+    def test_count(self):
+        self.assertEqual(
+            self.table.count('suite'),
+            {'focal': 5, 'focal-updates': 4, 'jammy': 1}
+        )
+        self.assertEqual(
+            self.table.filter(type='deb').count('host', 'suite'),
+            {('web1', 'focal'): 2, ('web1', 'focal-updates'): 2,
+             ('web2', 'jammy'): 1, ('web2', 'focal'): 1}
+        )
+
+    def test_dedupe(self):
+        self.assertEqual(len(self.table.dedupe()), 10)
+        hosts = self.table.dedupe('host', 'suite')
+        self.assertEqual(len(hosts), 4)
+        self.assertEqual(hosts.count('suite')['focal'], 2)
+        indexes = self.table.dedupe('type', 'uri', 'suite', 'component')
+        self.assertEqual(len(indexes), 10)
+
+    def test_many_values(self):
+        """ Columns with more values than fit in a byte are widened. """
+        def add_hosts(numbers):
+            for number in numbers:
+                self.table.add_record(dict(RECORDS[1], host=f'host{number}'))
+
+        add_hosts(range(10))
+        few = self.table.filter(host='host5')
+        self.assertEqual(few.get_column('host').typecode, 'B')
+        # The filtered table shares its categories, so it sees these too.
+        add_hosts(range(10, 300))
+        self.assertEqual(len(self.table.categories['host']), 302)
+        self.assertEqual(self.table.get_column('host').typecode, 'H')
+        self.assertEqual(len(self.table.filter(host='host299')), 1)
+        self.assertEqual(len(few.filter(host=['host5', 'host299'])), 1)
+        self.assertEqual(few.get_column('host').typecode, 'H')
+        self.assertEqual(self.table.count('host')['host250'], 1)
+
+    def test_from_ndjson(self):
+        lines = io.StringIO(
+            '\n'.join(json.dumps(record) for record in RECORDS) + '\n\n'
+        )
+        loaded = table.SourceTable.from_ndjson(lines)
+        self.assertEqual(list(loaded.rows()), list(self.table.rows()))
+
+        with self.assertRaises(table.SourceTableError):
+            table.SourceTable.from_ndjson(['{"host": "web1"', ''])
+        with self.assertRaises(table.SourceTableError):
+            table.SourceTable.from_ndjson(['[]'])
+
+    def test_from_index(self):
+        sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(sources_dir)
+        sources_dir = util.get_sources_dir(testing=True)
+        with open(sources_dir / 'example.sources', mode='w') as source_file:
+            source_file.write(
+                'X-Repolib-Name: Example\n'
+                'Types: deb\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal\n'
+                'Components: main universe\n'
+            )
+        with open(sources_dir / 'archive.list', mode='w') as source_file:
+            source_file.write('deb http://archive.ubuntu.com/ubuntu focal main\n')
+
+        local = table.SourceTable.from_index(SourcesIndex(), host='localhost')
+        self.assertEqual(len(local), 3)
+        self.assertEqual(local.unique('host'), ['localhost'])
+        self.assertEqual(
+            local.count('file'),
+            {'archive.list': 1, 'example.sources': 2}
+        )
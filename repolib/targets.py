@@ -0,0 +1,374 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Work out the index files apt fetches for the configured sources.
+
+Everything here is worked out offline, from the sources and the system's
+architectures and locale, so it can estimate the cost of ``apt update``
+without running it.
+"""
+
+import os
+import platform
+import subprocess
+from collections import namedtuple
+
+from . import util
+from .deb import DebLineSourceException
+from .duplicates import Location
+from .index import SourcesIndex, SourcesIndexError
+from .source import SourceError
+
+# The InRelease file fetched once for each URI and suite.
+RELEASE = 'Release'
+
+# The download targets apt knows about: the type of source each is fetched
+# for, whether it is fetched per architecture and per language, and its path
+# within a component.
+TARGETS = {
+    'Packages': ('deb', True, False, 'binary-{arch}/Packages'),
+    'Translations': ('deb', False, True, 'i18n/Translation-{lang}'),
+    'Sources': ('deb-src', False, False, 'source/Sources'),
+    'Contents-deb': ('deb', True, False, 'Contents-{arch}'),
+    'DEP-11': ('deb', True, False, 'dep11/Components-{arch}.yml'),
+}
+# The targets fetched when a source has no Targets option.
+DEFAULT_TARGETS = ('Packages', 'Translations', 'Sources')
+
+# Machine names which don't match the dpkg architecture name.
+MACHINE_ARCHS = {
+    'x86_64': 'amd64',
+    'aarch64': 'arm64',
+    'i686': 'i386',
+    'i586': 'i386',
+    'ppc64le': 'ppc64el',
+}
+
+class IndexTarget(namedtuple(
+        'IndexTarget', 'uri suite component target arch lang path')):
+    """ A single file apt fetches for a source.
+
+    Attributes:
+        uri (str): The normalized URI of the repository.
+        suite (str): The suite.
+        component (str): The component, or '' for flat repositories and
+            release files.
+        target (str): The name of the target, RELEASE or one of TARGETS.
+        arch (str): The architecture, or '' if not fetched per architecture.
+        lang (str): The language, or '' if not fetched per language.
+        path (str): The path of the file, relative to the URI.
+    """
+    __slots__ = ()
+
+    @property
+    def url(self):
+        """ str: The full URL of the file. """
+        return f'{self.uri}/{self.path}'
+
+class SourceEstimate:
+    """ The index files apt fetches for a single source.
+
+    Arguments:
+        location (duplicates.Location): The source.
+        targets ([IndexTarget]): The files fetched for it.
+        options (dict): The source's options.
+    """
+
+    def __init__(self, location, targets, options=None):
+        self.location = location
+        self.targets = targets
+        self.options = options or {}
+        self.shared = 0
+        self.recommendations = []
+
+    def count(self, target=None):
+        """ Count the files fetched for this source.
+
+        Arguments:
+            target (str): Only count this target (default: every target).
+
+        Returns:
+            int: The number of files.
+        """
+        if target is None:
+            return len(self.targets)
+        return sum(
+            1 for index_target in self.targets if index_target.target == target
+        )
+
+    def make_dict(self):
+        """ Makes a dict of the estimate, for machine-readable output.
+
+        Returns:
+            A dict with the data from the estimate.
+        """
+        counts = {}
+        for index_target in self.targets:
+            counts[index_target.target] = counts.get(index_target.target, 0) + 1
+        return {
+            'filename': self.location.filename,
+            'stanza': self.location.stanza,
+            'name': self.location.name,
+            'files': self.count(),
+            'targets': counts,
+            'shared': self.shared,
+            'pdiffs': get_bool_option(self.options, 'PDiffs'),
+            'by_hash': get_bool_option(self.options, 'By-Hash'),
+            'recommendations': self.recommendations,
+        }
+
+def get_architectures():
+    """ Get the architectures apt fetches packages for, by default.
+
+    Returns:
+        [str]: The native architecture, followed by any foreign ones.
+    """
+    archs = []
+    for option in ('--print-architecture', '--print-foreign-architectures'):
+        try:
+            output = subprocess.run(
+                ['dpkg', option],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            break
+        archs += output.split()
+    if not archs:
+        machine = platform.machine()
+        archs = [MACHINE_ARCHS.get(machine, machine)]
+    return archs
+
+def get_languages():
+    """ Get the languages apt fetches translations for, by default.
+
+    This follows apt's default of using the language from the environment,
+    as well as English.
+
+    Returns:
+        [str]: The language codes.
+    """
+    languages = []
+    for variable in ('LC_ALL', 'LC_MESSAGES', 'LANG'):
+        locale = os.environ.get(variable)
+        if locale:
+            locale = locale.split('.')[0].split('@')[0]
+            if locale not in ('C', 'POSIX'):
+                languages += [locale, locale.split('_')[0]]
+            break
+    languages.append('en')
+    return list(dict.fromkeys(languages))
+
+def get_bool_option(options, key):
+    """ Get the value of a yes/no option, which defaults to yes.
+
+    Arguments:
+        options (dict): The source's options.
+        key (str): The name of the option.
+
+    Returns:
+        bool: The value of the option.
+    """
+    return options.get(key, 'yes').strip().lower() not in ('no', 'false', '0')
+
+def make_targets(source, architectures, languages):
+    """ Enumerate the files apt fetches for a source.
+
+    Arguments:
+        source (Source): The source.
+        architectures ([str]): The architectures used if the source has no
+            Architectures option.
+        languages ([str]): The languages used if the source has no Languages
+            option.
+
+    Returns:
+        [IndexTarget]: The files fetched, with each release file first.
+    """
+    options = source.options or {}
+    archs = options.get('Architectures', '').split() or architectures
+    langs = options.get('Languages', '').split() or languages
+    langs = [lang for lang in langs if lang != 'none']
+    names = options.get('Targets', '').split() or DEFAULT_TARGETS
+    types = [dtype.value for dtype in source.types or []]
+
+    targets = []
+    for uri in source.uris or []:
+        uri = util.normalize_uri(uri)
+        for suite in source.suites or []:
+            targets.append(IndexTarget(
+                uri, suite, '', RELEASE, '', '', get_path(suite, '', 'InRelease')
+            ))
+            flat = suite.endswith('/')
+            components = [''] if flat else source.components or []
+            for name in names:
+                if name not in TARGETS:
+                    continue
+                target_type, per_arch, per_lang, path = TARGETS[name]
+                if target_type not in types:
+                    continue
+                target_archs = archs if per_arch and not flat else ['']
+                target_langs = langs if per_lang else ['']
+                for component in components:
+                    for arch in target_archs:
+                        for lang in target_langs:
+                            targets.append(IndexTarget(
+                                uri, suite, component, name, arch, lang,
+                                get_path(
+                                    suite,
+                                    component,
+                                    path.format(arch=arch, lang=lang)
+                                )
+                            ))
+    return targets
+
+def get_path(suite, component, path):
+    """ Get the path of a file within a repository.
+
+    Arguments:
+        suite (str): The suite. Suites ending in / are flat repositories,
+            which keep their files directly in the suite's directory.
+        component (str): The component, or '' for files of the whole suite.
+        path (str): The path of the file within the component.
+
+    Returns:
+        str: The path relative to the repository's URI.
+    """
+    if suite.endswith('/'):
+        return suite + path.split('/')[-1]
+    if component:
+        return f'dists/{suite}/{component}/{path}'
+    return f'dists/{suite}/{path}'
+
+def estimate(index=None, architectures=None, languages=None):
+    """ Estimate the files apt update fetches for each enabled source.
+
+    The sources dir is read in a single pass. Files fetched for more than one
+    source are only fetched once, so they are counted against each source
+    which fetches them, but only once in the total. Files which can't be
+    read are skipped.
+
+    Arguments:
+        index (SourcesIndex): The index to read from (default: the sources
+            dir).
+        architectures ([str]): The system's architectures (default: from
+            get_architectures()).
+        languages ([str]): The system's languages (default: from
+            get_languages()).
+
+    Returns:
+        ([SourceEstimate], int): The estimate for each source, and the total
+        number of distinct files fetched.
+    """
+    index = index or SourcesIndex()
+    architectures = architectures or get_architectures()
+    languages = languages or get_languages()
+
+    estimates = []
+    seen = {}
+    for entry in index.entries():
+        try:
+            for number, stanza in enumerate(index.stanzas(entry)):
+                if stanza.enabled == util.AptSourceEnabled.FALSE:
+                    continue
+                source_estimate = SourceEstimate(
+                    Location(entry.filename, number, stanza.name),
+                    make_targets(stanza, architectures, languages),
+                    stanza.options
+                )
+                for index_target in set(source_estimate.targets):
+                    if index_target in seen:
+                        source_estimate.shared += 1
+                    else:
+                        seen[index_target] = source_estimate
+                source_estimate.recommendations = recommend(
+                    source_estimate, architectures, languages
+                )
+                estimates.append(source_estimate)
+        except (
+                DebLineSourceException,
+                SourceError,
+                SourcesIndexError,
+                ValueError):
+            continue
+    return estimates, len(seen)
+
+def recommend(source_estimate, architectures, languages):
+    """ Recommend changes to a source which would reduce the files fetched.
+
+    Arguments:
+        source_estimate (SourceEstimate): The estimate for the source.
+        architectures ([str]): The system's architectures.
+        languages ([str]): The system's languages.
+
+    Returns:
+        [str]: The recommendations, with the number of files each saves.
+    """
+    recommendations = []
+    options = source_estimate.options
+
+    sources_count = source_estimate.count('Sources')
+    if sources_count:
+        recommendations.append(
+            f'Disable source code to save {sources_count} file(s).'
+        )
+
+    if 'Architectures' not in options and len(architectures) > 1:
+        saved = sum(
+            1 for index_target in source_estimate.targets
+            if index_target.arch and index_target.arch != architectures[0]
+        )
+        if saved:
+            recommendations.append(
+                f'Set Architectures to {architectures[0]} to save {saved} '
+                'file(s).'
+            )
+
+    if 'Languages' not in options and len(languages) > 1:
+        saved = sum(
+            1 for index_target in source_estimate.targets
+            if index_target.lang and index_target.lang != 'en'
+        )
+        if saved:
+            recommendations.append(
+                f'Set Languages to en to save {saved} file(s).'
+            )
+
+    if source_estimate.shared:
+        recommendations.append(
+            f'{source_estimate.shared} file(s) are also fetched for another '
+            'source; see apt-manage duplicates.'
+        )
+
+    if not get_bool_option(options, 'PDiffs'):
+        recommendations.append(
+            'Enable PDiffs to download changes to the indexes instead of the '
+            'whole files.'
+        )
+    return recommendations
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from . import targets
+from . import util
+from .deb import DebLine
+from .source import Source
+
+class TargetsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        with open(self.sources_dir / 'example.sources', mode='w') as source_file:
+            source_file.write(
+                'X-Repolib-Name: Example\n'
+                'Types: deb deb-src\n'
+                'URIs: http://example.com/ubuntu\n'
+                'Suites: focal focal-updates\n'
+                'Components: main universe\n'
+            )
+        with open(self.sources_dir / 'legacy.list', mode='w') as list_file:
+            list_file.write(
+                'deb http://example.com/ubuntu/ focal main\n'
+                '# deb http://example.com/disabled focal main\n'
+            )
+
+    def test_make_targets(self):
+        line = DebLine('deb [arch=arm64 lang=none] http://example.com/ubuntu focal main')
+        self.assertEqual(targets.make_targets(line, ['amd64'], ['en']), [
+            targets.IndexTarget(
+                'http://example.com/ubuntu', 'focal', '', targets.RELEASE,
+                '', '', 'dists/focal/InRelease'
+            ),
+            targets.IndexTarget(
+                'http://example.com/ubuntu', 'focal', 'main', 'Packages',
+                'arm64', '', 'dists/focal/main/binary-arm64/Packages'
+            ),
+        ])
+
+    def test_flat_and_targets(self):
+        source = Source()
+        source.load_from_dict({
+            'types': ['deb'],
+            'uris': ['http://example.com/repo'],
+            'suites': ['./'],
+            'options': {'Targets': 'Packages'},
+        })
+        self.assertEqual(
+            [target.url for target in targets.make_targets(source, ['amd64', 'i386'], ['en'])],
+            ['http://example.com/repo/./InRelease', 'http://example.com/repo/./Packages']
+        )
+
+    def test_estimate(self):
+        estimates, total = targets.estimate(
+            architectures=['amd64', 'i386'], languages=['de', 'en']
+        )
+        self.assertEqual(len(estimates), 2)
+        self.assertEqual(estimates[0].make_dict()['targets'], {
+            targets.RELEASE: 2, 'Packages': 8, 'Translations': 8, 'Sources': 4,
+        })
+        self.assertEqual(estimates[0].recommendations, [
+            'Disable source code to save 4 file(s).',
+            'Set Architectures to amd64 to save 4 file(s).',
+            'Set Languages to en to save 4 file(s).',
+        ])
+        self.assertEqual(estimates[1].count(), 5)
+        self.assertEqual(estimates[1].shared, 5)
+        self.assertEqual(total, 22)
+
+    def test_languages(self):
+        with mock.patch.dict(os.environ, {'LC_ALL': '', 'LC_MESSAGES': '', 'LANG': 'pt_BR.UTF-8'}):
+            self.assertEqual(targets.get_languages(), ['pt_BR', 'pt', 'en'])
+        with mock.patch.dict(os.environ, {'LC_ALL': 'C'}):
+            self.assertEqual(targets.get_languages(), ['en'])
@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+Lightweight timing of the phases of a RepoLib operation.
+
+Timing is enabled by setting the REPOLIB_PROFILE environment variable (or
+with apt-manage --profile). When it is enabled, each span records how long it
+took, and a tree of the spans is printed to stderr when the process exits. If
+REPOLIB_PROFILE_OUTPUT is also set, the whole run is profiled with cProfile
+and the stats are written to that file. When timing is disabled, span() only
+returns a shared no-op context manager.
+"""
+
+import atexit
+import contextlib
+import cProfile
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = 'REPOLIB_PROFILE'
+OUTPUT_ENV_VAR = 'REPOLIB_PROFILE_OUTPUT'
+
+class Span:
+    """ A timed phase of an operation.
+
+    Arguments:
+        name (str): The name of the phase.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.children = []
+
+    @property
+    def duration(self):
+        """ float: The time taken in seconds, so far if not yet finished. """
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+class _SpanContext:
+    """ Records a Span as a child of the current span on the thread. """
+
+    def __init__(self, name):
+        self.name = name
+        self.span = None
+
+    def __enter__(self):
+        self.span = Span(self.name)
+        stack = _get_stack()
+        stack[-1].children.append(self.span)
+        stack.append(self.span)
+        return self.span
+
+    def __exit__(self, *exc_info):
+        self.span.end = time.perf_counter()
+        stack = _get_stack()
+        if stack[-1] is self.span:
+            stack.pop()
+        return False
+
+ENABLED = False
+_NULL = contextlib.nullcontext()
+_ROOT = Span('total')
+_LOCAL = threading.local()
+_PROFILER = None
+_PROFILER_OUTPUT = None
+_REPORTED = False
+
+def _get_stack():
+    try:
+        return _LOCAL.stack
+    except AttributeError:
+        _LOCAL.stack = [_ROOT]
+        return _LOCAL.stack
+
+def span(name, always=False):
+    """ Time a phase of an operation.
+
+    Use this as a context manager around the phase::
+
+        with timing.span('write'):
+            source_file.write(contents)
+
+    Arguments:
+        name (str): The name of the phase.
+        always (bool): Record the span even if timing isn't enabled yet. This
+            is for the few phases which run before the command line has been
+            parsed (e.g. imports), and should only be used once per process.
+
+    Returns:
+        A context manager recording the span, or a no-op one if timing isn't
+        enabled.
+    """
+    if ENABLED or always:
+        return _SpanContext(name)
+    return _NULL
+
+def enable(output=None):
+    """ Enable timing for the rest of the process.
+
+    Arguments:
+        output (str): If given, also profile the process with cProfile and
+            write the stats to this file on exit.
+    """
+    # pylint: disable=global-statement
+    # Timing is deliberately process-wide.
+    global ENABLED, _PROFILER, _PROFILER_OUTPUT
+    if not ENABLED:
+        atexit.register(report)
+    ENABLED = True
+    if output and _PROFILER is None:
+        _PROFILER = cProfile.Profile()
+        _PROFILER_OUTPUT = output
+        _PROFILER.enable()
+
+def format_tree(root=None):
+    """ Format the recorded spans as an indented tree.
+
+    Sibling spans with the same name are merged, showing their total time
+    and how many times they ran.
+
+    Arguments:
+        root (Span): The span to start at. Default is the whole process.
+
+    Returns:
+        str: The tree, one span per line, with times in milliseconds.
+    """
+    lines = []
+    _format_spans([root or _ROOT], 0, lines)
+    width = max(len(label) for label, _ in lines)
+    return '\n'.join(f'{label:<{width}}  {value}' for label, value in lines)
+
+def _format_spans(spans, depth, lines):
+    merged = {}
+    for child in spans:
+        total, count, children = merged.get(child.name, (0.0, 0, []))
+        merged[child.name] = (
+            total + child.duration, count + 1, children + child.children
+        )
+    for name, (total, count, children) in merged.items():
+        label = '  ' * depth + name
+        value = f'{total * 1000:10.2f} ms'
+        if count > 1:
+            value += f'  (x{count})'
+        lines.append((label, value))
+        _format_spans(children, depth + 1, lines)
+
+def report(stream=None):
+    """ Print the timing tree, and write the cProfile stats if requested.
+
+    This is run automatically when the process exits if timing is enabled.
+
+    Arguments:
+        stream (file): Where to print the tree. Default is stderr.
+    """
+    # pylint: disable=global-statement
+    global _REPORTED
+    if _REPORTED:
+        return
+    _REPORTED = True
+    _ROOT.end = time.perf_counter()
+    print('repolib timing:', file=stream or sys.stderr)
+    print(format_tree(), file=stream or sys.stderr)
+    if _PROFILER is not None:
+        _PROFILER.disable()
+        _PROFILER.dump_stats(_PROFILER_OUTPUT)
+
+if os.environ.get(ENV_VAR, '') not in ('', '0'):
+    enable(os.environ.get(OUTPUT_ENV_VAR))
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import unittest
+
+from . import timing
+
+class TimingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.enabled = timing.ENABLED
+
+    def tearDown(self):
+        timing.ENABLED = self.enabled
+
+    def test_disabled(self):
+        timing.ENABLED = False
+        self.assertIs(timing.span('parse'), timing.span('write'))
+
+    def test_tree(self):
+        timing.ENABLED = True
+        with timing.span('add') as add:
+            with timing.span('parse'):
+                pass
+            with timing.span('parse'):
+                pass
+            with timing.span('write'):
+                pass
+        self.assertEqual([child.name for child in add.children], [
+            'parse', 'parse', 'write'
+        ])
+        self.assertGreaterEqual(add.duration, add.children[0].duration)
+
+        lines = timing.format_tree(add).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('add '))
+        self.assertTrue(lines[1].startswith('  parse '))
+        self.assertTrue(lines[1].endswith('(x2)'))
+        self.assertTrue(lines[2].startswith('  write '))
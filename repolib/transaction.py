@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Changes to several files in the sources dir, committed together.
+"""
+
+import difflib
+import os
+
+from . import completion
+from . import metrics
+from . import names
+from . import timing
+from . import util
+
+ADDED = 'added'
+MODIFIED = 'modified'
+REMOVED = 'removed'
+UNCHANGED = 'unchanged'
+
+class TransactionError(Exception):
+    """ Exceptions from a transaction. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception with a transaction
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+class Transaction:
+    """ A set of file writes and removals in the sources dir.
+
+    Changes are only recorded in memory until commit() is called. Files whose
+    new contents are identical to what is already on disk are skipped. On
+    commit, every new file is first written in full to a temporary file next
+    to its destination; only once all of them have been written are they
+    renamed into place (each rename is atomic) and the removals made. If
+    anything fails while staging, nothing in the sources dir is changed.
+    """
+
+    def __init__(self):
+        self.writes = {}
+        self.removals = []
+
+    def write(self, filename, contents):
+        """ Record new contents for a file.
+
+        Arguments:
+            filename (str): The name of the file in the sources dir.
+            contents (str): The full new contents of the file.
+        """
+        if filename in self.removals:
+            self.removals.remove(filename)
+        self.writes[filename] = contents
+
+    def remove(self, filename):
+        """ Record the removal of a file.
+
+        Arguments:
+            filename (str): The name of the file in the sources dir.
+        """
+        self.writes.pop(filename, None)
+        if filename not in self.removals:
+            self.removals.append(filename)
+
+    def changes(self):
+        """ Compare the recorded changes against the files on disk.
+
+        Returns:
+            [(str, str)]: A list of (change, filename) tuples, where change is
+            one of ADDED, MODIFIED, REMOVED or UNCHANGED.
+        """
+        sources_dir = util.get_sources_dir()
+        changes = []
+        for filename, contents in self.writes.items():
+            current = read_file(sources_dir / filename)
+            if current is None:
+                changes.append((ADDED, filename))
+            elif current == contents:
+                changes.append((UNCHANGED, filename))
+            else:
+                changes.append((MODIFIED, filename))
+        for filename in self.removals:
+            if (sources_dir / filename).exists():
+                changes.append((REMOVED, filename))
+        return changes
+
+    def diff(self):
+        """ Make a unified diff of the recorded changes against the disk.
+
+        Nothing is written; this only reads the files which would change.
+
+        Returns:
+            str: The diff, with a section for each added, modified or removed
+            file, or an empty string if nothing would change.
+        """
+        sources_dir = util.get_sources_dir()
+        output = []
+        for change, filename in self.changes():
+            if change == UNCHANGED:
+                continue
+            current = read_file(sources_dir / filename) or ''
+            new = self.writes.get(filename, '')
+            lines = difflib.unified_diff(
+                current.splitlines(keepends=True),
+                new.splitlines(keepends=True),
+                fromfile='/dev/null' if change == ADDED else f'a/{filename}',
+                tofile='/dev/null' if change == REMOVED else f'b/{filename}'
+            )
+            for line in lines:
+                if not line.endswith('\n'):
+                    line += '\n\\ No newline at end of file\n'
+                output.append(line)
+        return ''.join(output)
+
+    def commit(self):
+        """ Write the changes to disk.
+
+        Returns:
+            [(str, str)]: The changes made, as returned by changes().
+
+        Raises:
+            TransactionError: If the changes could not be staged.
+        """
+        sources_dir = util.get_sources_dir()
+        changes = self.changes()
+        staged = []
+        with timing.span('write'):
+            try:
+                for change, filename in changes:
+                    if change not in (ADDED, MODIFIED):
+                        continue
+                    temp_path = sources_dir / f'.{filename}~'
+                    with open(temp_path, mode='w') as temp_file:
+                        staged.append((temp_path, sources_dir / filename))
+                        written = temp_file.write(self.writes[filename])
+                        metrics.inc('repolib_bytes_written_total', written)
+                        temp_file.flush()
+                        os.fsync(temp_file.fileno())
+                    os.chmod(temp_path, 0o644)
+            except OSError as err:
+                for temp_path, _ in staged:
+                    if temp_path.exists():
+                        temp_path.unlink()
+                raise TransactionError(f'Could not save changes: {err}') from err
+
+            for temp_path, path in staged:
+                os.replace(temp_path, path)
+            for change, filename in changes:
+                if change == REMOVED:
+                    (sources_dir / filename).unlink()
+            sync_dir(sources_dir)
+        counts = {change: 0 for change in (ADDED, MODIFIED, REMOVED, UNCHANGED)}
+        for change, _ in changes:
+            counts[change] += 1
+        metrics.inc('repolib_files_written_total', counts[ADDED] + counts[MODIFIED])
+        metrics.inc('repolib_files_removed_total', counts[REMOVED])
+        metrics.inc('repolib_files_skipped_total', counts[UNCHANGED])
+        if any(change != UNCHANGED for change, _ in changes):
+            update_caches()
+
+        self.writes = {}
+        self.removals = []
+        return changes
+
+def update_caches():
+    """ Regenerate the completion cache and the name index.
+
+    Both are rebuilt from the whole sources dir, so this should be called
+    once after a set of changes, rather than after saving each source.
+    Transaction.commit() does this itself; callers which save sources
+    directly (e.g. with save_to_disk()) need to call it when done.
+    """
+    with timing.span('cache'):
+        completion.update_cache()
+        names.update_cache()
+
+def read_file(path):
+    """ Read the contents of a file, if it exists.
+
+    Arguments:
+        path (pathlib.Path): The path to read.
+
+    Returns:
+        str: The contents of the file, or None if it doesn't exist.
+    """
+    try:
+        with open(path, mode='r') as current_file:
+            return current_file.read()
+    except FileNotFoundError:
+        return None
+
+def sync_dir(path):
+    """ Make sure renames and removals within a directory are on disk.
+
+    Arguments:
+        path (pathlib.Path): The directory to sync.
+    """
+    dir_fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
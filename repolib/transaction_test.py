@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import shutil
+import unittest
+
+from . import names
+from . import source
+from . import transaction
+from . import util
+
+class TransactionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources_dir = util.get_sources_dir(testing=True)
+        shutil.rmtree(self.sources_dir)
+        self.sources_dir = util.get_sources_dir(testing=True)
+        for name in ('same', 'changed', 'old'):
+            with open(self.sources_dir / f'{name}.sources', mode='w') as source_file:
+                source_file.write(f'X-Repolib-Name: {name}\n')
+
+    def test_changes(self):
+        changes = transaction.Transaction()
+        changes.write('same.sources', 'X-Repolib-Name: same\n')
+        changes.write('changed.sources', 'X-Repolib-Name: new\n')
+        changes.write('new.sources', 'X-Repolib-Name: new\n')
+        changes.remove('old.sources')
+        changes.remove('missing.sources')
+        self.assertEqual(changes.changes(), [
+            (transaction.UNCHANGED, 'same.sources'),
+            (transaction.MODIFIED, 'changed.sources'),
+            (transaction.ADDED, 'new.sources'),
+            (transaction.REMOVED, 'old.sources'),
+        ])
+
+    def test_commit(self):
+        changes = transaction.Transaction()
+        changes.write('changed.sources', 'X-Repolib-Name: new\n')
+        changes.write('new.sources', 'X-Repolib-Name: new\n')
+        changes.remove('old.sources')
+        changes.commit()
+
+        self.assertFalse((self.sources_dir / 'old.sources').exists())
+        for name in ('changed', 'new'):
+            with open(self.sources_dir / f'{name}.sources') as source_file:
+                self.assertEqual(source_file.read(), 'X-Repolib-Name: new\n')
+        self.assertEqual(
+            sorted(path.name for path in self.sources_dir.iterdir()),
+            ['changed.sources', 'new.sources', 'same.sources']
+        )
+
+    def test_update_caches(self):
+        cache_dir = util.get_cache_dir()
+        shutil.rmtree(cache_dir)
+        new_source = source.Source(filename='saved.sources')
+        new_source.name = 'saved'
+        new_source.save_to_disk()
+        self.assertFalse(cache_dir.exists())
+
+        changes = transaction.Transaction()
+        changes.write('new.sources', 'X-Repolib-Name: new\n')
+        changes.commit()
+        self.assertTrue(names.get_cache_path().exists())
+        self.assertEqual(names.load()['saved'], ['saved.sources', 0])
+
+    def test_diff(self):
+        changes = transaction.Transaction()
+        changes.write('same.sources', 'X-Repolib-Name: same\n')
+        changes.write('changed.sources', 'X-Repolib-Name: new\n')
+        changes.write('new.sources', 'X-Repolib-Name: new')
+        changes.remove('old.sources')
+        self.assertEqual(changes.diff(), (
+            '--- a/changed.sources\n'
+            '+++ b/changed.sources\n'
+            '@@ -1 +1 @@\n'
+            '-X-Repolib-Name: changed\n'
+            '+X-Repolib-Name: new\n'
+            '--- /dev/null\n'
+            '+++ b/new.sources\n'
+            '@@ -0,0 +1 @@\n'
+            '+X-Repolib-Name: new\n'
+            '\\ No newline at end of file\n'
+            '--- a/old.sources\n'
+            '+++ /dev/null\n'
+            '@@ -1 +0,0 @@\n'
+            '-X-Repolib-Name: old\n'
+        ))
+        self.assertFalse((self.sources_dir / 'new.sources').exists())
+        self.assertTrue((self.sources_dir / 'old.sources').exists())
@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+A prefix trie of URIs, for longest-prefix matching of rewrite rules.
+"""
+
+from . import util
+
+class RulesError(Exception):
+    """ Exceptions from a rules file. """
+
+    def __init__(self, *args, code=1, **kwargs):
+        """Exception with a rules file
+
+        Arguments:
+            code (:obj:`int`, optional, default=1): Exception error code.
+    """
+        super().__init__(*args, **kwargs)
+        self.code = code
+
+def split_uri(uri):
+    """ Split a URI into the segments used as keys in the trie.
+
+    The first segment is the scheme and host, and then each part of the
+    path follows, so prefixes only ever match at a path boundary.
+
+    Arguments:
+        uri (str): The URI, which is normalized first.
+
+    Returns:
+        (str, [str]): The normalized URI, and its segments.
+    """
+    normalized = util.normalize_uri(uri)
+    scheme, separator, rest = normalized.partition('://')
+    if separator:
+        host, _, path = rest.partition('/')
+        segments = [f'{scheme}://{host}']
+    else:
+        path = normalized
+        segments = []
+    segments += [segment for segment in path.split('/') if segment]
+    return normalized, segments
+
+class _Node:
+    """ A node in the trie, holding the value of the URI ending there. """
+    __slots__ = ('children', 'key', 'value')
+
+    def __init__(self):
+        self.children = {}
+        self.key = None
+        self.value = None
+
+class URITrie:
+    """ A mapping of URI prefixes to values, with longest-prefix lookups.
+
+    Looking up a URI takes time in proportion to the number of segments in
+    it, however many prefixes there are.
+
+    Arguments:
+        items (dict): Prefixes and values to add to the trie.
+    """
+
+    def __init__(self, items=None):
+        self._root = _Node()
+        self._len = 0
+        for prefix, value in (items or {}).items():
+            self[prefix] = value
+
+    def __setitem__(self, prefix, value):
+        key, segments = split_uri(prefix)
+        node = self._root
+        for segment in segments:
+            node = node.children.setdefault(segment, _Node())
+        if node.key is None:
+            self._len += 1
+        node.key = key
+        node.value = value
+
+    def __getitem__(self, prefix):
+        _, segments = split_uri(prefix)
+        node = self._root
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                raise KeyError(prefix)
+        if node.key is None:
+            raise KeyError(prefix)
+        return node.value
+
+    def __contains__(self, prefix):
+        try:
+            self[prefix]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return self._len
+
+    def items(self):
+        """ Iterate over the prefixes and their values.
+
+        Yields:
+            (str, object): Each normalized prefix and its value.
+        """
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.key is not None:
+                yield node.key, node.value
+            stack.extend(node.children.values())
+
+    def longest_prefix(self, uri):
+        """ Find the longest prefix of a URI in the trie.
+
+        Arguments:
+            uri (str): The URI to look up.
+
+        Returns:
+            (str, object, str): The normalized prefix, its value, and the
+            normalized URI, or None if no prefix matches.
+        """
+        normalized, segments = split_uri(uri)
+        node = self._root
+        best = node if node.key is not None else None
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.key is not None:
+                best = node
+        if best is None:
+            return None
+        return best.key, best.value, normalized
+
+    def rewrite(self, uri):
+        """ Rewrite a URI, replacing its longest matching prefix.
+
+        Arguments:
+            uri (str): The URI to rewrite.
+
+        Returns:
+            str: The URI with the prefix replaced by its value, or the URI
+            unchanged if no prefix matches.
+        """
+        match = self.longest_prefix(uri)
+        if match is None:
+            return uri
+        prefix, replacement, normalized = match
+        return replacement.rstrip('/') + normalized[len(prefix):]
+
+def load_rules(rules_file):
+    """ Load rewrite rules from a file.
+
+    Each line holds a URI prefix and the URI to replace it with, separated
+    by whitespace. Blank lines and lines starting with # are ignored::
+
+        # Send the Ubuntu archive through the local cache.
+        http://archive.ubuntu.com/ubuntu  http://apt-cache.local/ubuntu
+
+    Arguments:
+        rules_file (file): The open rules file.
+
+    Returns:
+        URITrie: The replacement for each prefix.
+
+    Raises:
+        RulesError: If a line is malformed, or a prefix is given twice.
+    """
+    rules = URITrie()
+    for number, line in enumerate(rules_file, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split()
+        if len(fields) != 2:
+            raise RulesError(
+                f'Line {number}: expected a prefix and a replacement, got {line!r}'
+            )
+        prefix, replacement = fields
+        if prefix in rules:
+            raise RulesError(f'Line {number}: {prefix} has more than one rule')
+        rules[prefix] = replacement
+    return rules
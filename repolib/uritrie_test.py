@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+
+"""
+Copyright (c) 2019-2020, Ian Santopietro
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+# pylint: disable=missing-function-docstring, missing-class-docstring
+# These aren't really relevant for unit testing (which is mostly automatic.)
+
+import io
+import unittest
+
+from . import uritrie
+
+class URITrieTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.trie = uritrie.URITrie({
+            'http://archive.ubuntu.com/': 'http://apt-cache.local/archive/',
+            'http://archive.ubuntu.com/ubuntu': 'http://apt-cache.local/ubuntu',
+            'https://ppa.launchpadcontent.net/system76': 'http://apt-cache.local/s76',
+        })
+
+    def test_split_uri(self):
+        self.assertEqual(
+            uritrie.split_uri('HTTP://Example.com//ubuntu/'),
+            ('http://example.com/ubuntu', ['http://example.com', 'ubuntu'])
+        )
+        self.assertEqual(
+            uritrie.split_uri('file:///srv/repo'),
+            ('file:///srv/repo', ['file://', 'srv', 'repo'])
+        )
+
+    def test_mapping(self):
+        self.assertEqual(len(self.trie), 3)
+        self.assertIn('http://archive.ubuntu.com', self.trie)
+        self.assertNotIn('http://archive.ubuntu.com/ubuntu/dists', self.trie)
+        self.assertEqual(
+            self.trie['http://archive.ubuntu.com/ubuntu/'],
+            'http://apt-cache.local/ubuntu'
+        )
+        self.trie['http://archive.ubuntu.com'] = 'http://other'
+        self.assertEqual(len(self.trie), 3)
+        self.assertEqual(
+            sorted(self.trie.items())[0],
+            ('http://archive.ubuntu.com', 'http://other')
+        )
+
+    def test_longest_prefix(self):
+        self.assertEqual(
+            self.trie.longest_prefix('http://archive.ubuntu.com/ubuntu/'),
+            (
+                'http://archive.ubuntu.com/ubuntu',
+                'http://apt-cache.local/ubuntu',
+                'http://archive.ubuntu.com/ubuntu',
+            )
+        )
+        self.assertEqual(
+            self.trie.longest_prefix('http://archive.ubuntu.com/ubuntu-ports')[0],
+            'http://archive.ubuntu.com'
+        )
+        self.assertIsNone(self.trie.longest_prefix('http://example.com/ubuntu'))
+
+    def test_rewrite(self):
+        self.assertEqual(
+            self.trie.rewrite('http://archive.ubuntu.com/ubuntu'),
+            'http://apt-cache.local/ubuntu'
+        )
+        self.assertEqual(
+            self.trie.rewrite('https://ppa.launchpadcontent.net/system76/pop/ubuntu/'),
+            'http://apt-cache.local/s76/pop/ubuntu'
+        )
+        self.assertEqual(
+            self.trie.rewrite('https://ppa.launchpadcontent.net/system76-dev/pre/ubuntu'),
+            'https://ppa.launchpadcontent.net/system76-dev/pre/ubuntu'
+        )
+
+    def test_load_rules(self):
+        rules = uritrie.load_rules(io.StringIO(
+            '# Local caches\n'
+            '\n'
+            'http://archive.ubuntu.com/ubuntu   http://apt-cache.local/ubuntu\n'
+        ))
+        self.assertEqual(list(rules.items()), [
+            ('http://archive.ubuntu.com/ubuntu', 'http://apt-cache.local/ubuntu')
+        ])
+        with self.assertRaises(uritrie.RulesError):
+            uritrie.load_rules(io.StringIO('http://archive.ubuntu.com/ubuntu\n'))
+        with self.assertRaises(uritrie.RulesError):
+            uritrie.load_rules(io.StringIO(
+                'http://archive.ubuntu.com/ubuntu http://a\n'
+                'http://archive.ubuntu.com/ubuntu/ http://b\n'
+            ))
@@ -26,10 +26,21 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import re
 from enum import Enum
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from . import timing
 
 SOURCES_DIR = '/etc/apt/sources.list.d'
+SOCKET_PATH = '/run/repolib/apt-manage.sock'
+CACHE_DIR = '/var/cache/repolib'
+LISTS_DIR = '/var/lib/apt/lists'
+SOURCES_LIST = '/etc/apt/sources.list'
+SYSTEM_FILENAME = 'system.sources'
+KEYRINGS_DIR = '/etc/apt/keyrings'
+TRUSTED_DIR = '/etc/apt/trusted.gpg.d'
 TESTING = False
 
 class RepoError(Exception):
@@ -44,11 +55,12 @@ class RepoError(Exception):
         super().__init__(*args, **kwargs)
         self.code = code
 
-try:
-    import lsb_release
-    DISTRO_CODENAME = lsb_release.get_distro_information()['CODENAME']
-except ImportError:
-    raise RepoError("The system can't find version information!")
+with timing.span('lsb_release', always=True):
+    try:
+        import lsb_release
+        DISTRO_CODENAME = lsb_release.get_distro_information()['CODENAME']
+    except ImportError:
+        raise RepoError("The system can't find version information!")
 
 class AptSourceType(Enum):
     """ Helper Enum to simplify saving data. """
@@ -111,13 +123,69 @@ def get_sources_dir(testing=False):
     # We want to stop using the old dir and use the testing dir on subsequent
     # calls.
     if testing:
-        global SOURCES_DIR
+        global SOURCES_DIR, CACHE_DIR
         SOURCES_DIR = '/tmp/repolib_testing'
+        CACHE_DIR = '/tmp/repolib_testing_cache'
     # pylint: enable=global-statement
     sources_dir = Path(SOURCES_DIR)
     sources_dir.mkdir(parents=True, exist_ok=True)
     return sources_dir
 
+def get_cache_dir(create=True):
+    """ Get the path to the cache dir.
+
+    The cache dir holds data derived from the sources dir, which can be
+    regenerated at any time. It uses a testing dir whenever the sources dir
+    does.
+
+    Arguments:
+        create (bool): Whether to create the dir if it doesn't exist. Pass
+            False when only reading from it.
+
+    Returns:
+        pathlib.Path: The cache dir.
+    """
+    cache_dir = Path(CACHE_DIR)
+    if create:
+        cache_dir.mkdir(mode=0o755, parents=True, exist_ok=True)
+    return cache_dir
+
+def get_lists_dir():
+    """ Get the path to apt's lists dir, where downloaded indexes are kept.
+
+    Returns:
+        pathlib.Path: The lists dir.
+    """
+    return Path(LISTS_DIR)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443, 'ftp': 21}
+
+def normalize_uri(uri):
+    """ Normalize a URI, so that URIs which apt treats as equal compare equal.
+
+    The scheme and host are lowercased, default ports are dropped, repeated
+    slashes in the path are collapsed, and trailing slashes are removed. Any
+    login is kept as it is, since it may be case-sensitive.
+
+    Arguments:
+        uri (str): The URI to normalize.
+
+    Returns:
+        str: The normalized URI.
+    """
+    parts = urlsplit(uri.strip())
+    scheme = parts.scheme.lower()
+    login, at_sign, host = parts.netloc.rpartition('@')
+    host = host.lower()
+    try:
+        if parts.port and parts.port == DEFAULT_PORTS.get(scheme):
+            host = host.rsplit(':', 1)[0]
+    except ValueError:
+        pass
+    netloc = f'{login}{at_sign}{host}'
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+    return urlunsplit((scheme, netloc, path, parts.query, ''))
+
 def validate_debline(valid):
     """ Basic checks to see if a given debline is valid or not.
 